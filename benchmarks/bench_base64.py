@@ -0,0 +1,68 @@
+"""Peak memory and time to base64-encode a large audio file for inline delivery.
+
+Usage: python benchmarks/bench_base64.py [--megabytes N]
+
+"read" is the previous approach (read the whole file, b64encode, decode);
+"chunked" is encoding.b64encode_file. Peaks are Python heap allocations
+traced by tracemalloc; mmap'd pages are not counted as they belong to the page cache.
+"""
+import argparse
+import base64
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from elevenlabs_mcp.encoding import b64encode_file
+
+
+def read_and_encode(path: Path) -> str:
+    with open(path, "rb") as f:
+        audio_bytes = f.read()
+        return base64.b64encode(audio_bytes).decode("utf-8")
+
+
+def measure(encode, path: Path) -> dict:
+    tracemalloc.start()
+    start = time.perf_counter()
+    encoded = encode(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = path.stat().st_size
+    del encoded
+    return {
+        "seconds": round(elapsed, 3),
+        "peak_mb": round(peak / 2**20, 1),
+        "peak_x_file_size": round(peak / size, 2),
+    }
+
+
+def run(megabytes: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "audio.mp3"
+        with open(path, "wb") as f:
+            for _ in range(megabytes):
+                f.write(os.urandom(2**20))
+        read = measure(read_and_encode, path)
+        chunked = measure(b64encode_file, path)
+
+    return {
+        "benchmark": "base64",
+        "file_mb": megabytes,
+        "read": read,
+        "chunked": chunked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--megabytes", type=int, default=100)
+    args = parser.parse_args()
+    print(json.dumps(run(args.megabytes), indent=2))
+
+
+if __name__ == "__main__":
+    main()
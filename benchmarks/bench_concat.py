@@ -0,0 +1,54 @@
+"""Cost of joining rendered MP3 segments into one file.
+
+Usage: python benchmarks/bench_concat.py [--segments 10 100 500] [--seconds-per-segment S]
+
+Measures audio.concat_mp3, the frame-level join generate_full_audio uses, on
+canned segments of the given length.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from elevenlabs_mcp.audio import concat_mp3
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_server import make_mp3  # noqa: E402
+
+
+def measure(segment_count: int, seconds_per_segment: float, output: Path) -> dict:
+    segments = [make_mp3(seconds_per_segment) for _ in range(segment_count)]
+    start = time.perf_counter()
+    written = concat_mp3(segments, output)
+    elapsed = time.perf_counter() - start
+    return {
+        "segments": segment_count,
+        "output_mb": round(written / 2**20, 2),
+        "ms": round(elapsed * 1000, 2),
+        "mb_per_second": round(written / 2**20 / elapsed, 1),
+    }
+
+
+def run(segment_counts, seconds_per_segment: float = 10.0) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / "joined.mp3"
+        results = [measure(count, seconds_per_segment, output) for count in segment_counts]
+    return {
+        "benchmark": "concat",
+        "seconds_per_segment": seconds_per_segment,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--segments", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--seconds-per-segment", type=float, default=10.0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.segments, args.seconds_per_segment), indent=2))
+
+
+if __name__ == "__main__":
+    main()
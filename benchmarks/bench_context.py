@@ -0,0 +1,56 @@
+"""Cost of building previous_text/next_text for every part of a long script.
+
+Usage: python benchmarks/bench_context.py [--parts N] [--budget CHARS]
+
+"join" rebuilds both sides from every other part for each part, as
+generate_full_audio did before; "windows" is text.context_windows.
+"""
+import argparse
+import json
+import time
+
+from elevenlabs_mcp.text import context_windows
+
+SENTENCE = "This is one sentence of a long narrated script, about as long as a typical line. "
+
+
+def join_contexts(texts):
+    return [
+        (" ".join(texts[:i]) if i else None, " ".join(texts[i + 1:]) if i < len(texts) - 1 else None)
+        for i in range(len(texts))
+    ]
+
+
+def measure(build, texts) -> dict:
+    start = time.perf_counter()
+    contexts = build(texts)
+    elapsed = time.perf_counter() - start
+    sizes = [len(previous or "") + len(following or "") for previous, following in contexts]
+    return {
+        "ms": round(elapsed * 1000, 2),
+        "total_context_chars": sum(sizes),
+        "max_context_chars_per_part": max(sizes),
+    }
+
+
+def run(parts: int, budget: int) -> dict:
+    texts = [SENTENCE * 3 for _ in range(parts)]
+    return {
+        "benchmark": "context_windows",
+        "parts": parts,
+        "budget": budget,
+        "join": measure(join_contexts, texts),
+        "windows": measure(lambda texts: context_windows(texts, budget), texts),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, default=2000)
+    parser.add_argument("--budget", type=int, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.parts, args.budget), indent=2))
+
+
+if __name__ == "__main__":
+    main()
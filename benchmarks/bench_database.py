@@ -0,0 +1,90 @@
+"""Job-history throughput with a connection per call vs the shared tuned connection.
+
+Usage: python benchmarks/bench_database.py [--jobs N]
+
+"per_call" opens (and closes) a fresh connection for every operation with SQLite's
+default rollback journal, as Database did before it kept a connection open;
+"persistent" is the current Database with WAL and synchronous=NORMAL.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+from elevenlabs_mcp.database import Database
+from elevenlabs_mcp.models import AudioJob
+
+
+class PerCallDatabase(Database):
+    """Database that connects afresh for every operation, without tuning."""
+
+    def __init__(self, db_path: str):
+        super().__init__(db_path)
+        self._opened = []
+
+    async def _connection(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self.db_path)
+        db.row_factory = aiosqlite.Row
+        self._opened.append(db)
+        return db
+
+    async def release(self) -> None:
+        while self._opened:
+            await self._opened.pop().close()
+
+
+async def measure(db: Database, jobs: int) -> dict:
+    release = getattr(db, "release", None)
+
+    async def op(coro):
+        await coro
+        if release:
+            await release()
+
+    await op(db.initialize())
+    results = {}
+    job_list = [AudioJob(id=f"job-{i}", status="pending", script_parts=[{"text": f"Part {i}"}]) for i in range(jobs)]
+
+    for name, make in (
+        ("insert_job", lambda job: db.insert_job(job)),
+        ("update_job", lambda job: db.update_job(job)),
+        ("get_job", lambda job: db.get_job(job.id)),
+    ):
+        start = time.perf_counter()
+        for job in job_list:
+            await op(make(job))
+        results[f"{name}_ops_per_second"] = round(jobs / (time.perf_counter() - start), 1)
+
+    await db.close()
+    return results
+
+
+async def run(jobs: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        per_call = await measure(PerCallDatabase(str(Path(tmp) / "per_call.db")), jobs)
+        persistent = await measure(Database(str(Path(tmp) / "persistent.db")), jobs)
+
+    return {
+        "benchmark": "database",
+        "jobs": jobs,
+        "per_call": per_call,
+        "persistent": persistent,
+        "speedup": {
+            key.replace("_ops_per_second", ""): round(persistent[key] / per_call[key], 2)
+            for key in per_call
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.jobs)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""generate_full_audio wall-clock time and throughput as the part count grows.
+
+Usage: python benchmarks/bench_full_audio.py [--parts 1 5 20 50] [--latency S] [--jitter S]
+
+Runs against the local fake server with the segment cache off, once with a
+stitching model (parts render one after another) and once with a model that
+renders parts in parallel.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_server import FakeElevenLabsServer  # noqa: E402
+
+MODELS = {"sequential": "eleven_multilingual_v2", "parallel": "eleven_flash_v2_5"}
+
+
+async def measure(api, model_id: str, parts: int, output_dir: Path) -> dict:
+    api.model_id = model_id
+    script_parts = [{"text": f"This is sentence number {i} of the benchmark script."} for i in range(parts)]
+    start = time.perf_counter()
+    _, _, completed = await api.generate_full_audio(script_parts, output_dir, use_cache=False)
+    elapsed = time.perf_counter() - start
+    return {
+        "parts": parts,
+        "completed": completed,
+        "seconds": round(elapsed, 3),
+        "parts_per_second": round(parts / elapsed, 2),
+    }
+
+
+async def run(part_counts, latency: float = 0.05, jitter: float = 0.01, error_rate: float = 0.0) -> dict:
+    with FakeElevenLabsServer(latency=latency, jitter=jitter, error_rate=error_rate) as server, \
+            tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+        os.environ["ELEVENLABS_BASE_URL"] = server.base_url
+        os.environ["ELEVENLABS_CACHE_ENABLED"] = "false"
+        os.environ.setdefault("ELEVENLABS_MAX_CONCURRENT_REQUESTS", "8")
+        os.environ.setdefault("ELEVENLABS_MAX_CONCURRENCY", "8")
+        os.environ.setdefault("ELEVENLABS_REQUESTS_PER_SECOND", "0")
+        from elevenlabs_mcp.elevenlabs_api import ElevenLabsAPI
+        api = ElevenLabsAPI()
+
+        # Warm up the connection pool so the first measurement isn't skewed
+        await measure(api, MODELS["parallel"], 2, Path(tmp))
+        results = {}
+        for mode, model_id in MODELS.items():
+            results[mode] = [await measure(api, model_id, parts, Path(tmp)) for parts in part_counts]
+        await api.aclose()
+
+    return {
+        "benchmark": "full_audio",
+        "latency_seconds": latency,
+        "jitter_seconds": jitter,
+        "error_rate": error_rate,
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--parts", type=int, nargs="+", default=[1, 5, 20, 50])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.parts, args.latency, args.jitter, args.error_rate)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
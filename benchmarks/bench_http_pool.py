@@ -0,0 +1,62 @@
+"""Per-segment request overhead with and without the pooled HTTP client.
+
+Usage: python benchmarks/bench_http_pool.py [--requests N]
+
+"fresh" closes the client after every segment, paying a new TCP connection each
+time (the behaviour before pooling); "pooled" reuses keep-alive connections.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_server import FakeElevenLabsServer  # noqa: E402
+
+
+async def measure(api, requests: int, reuse: bool) -> float:
+    start = time.perf_counter()
+    for i in range(requests):
+        await api.generate_audio_segment(f"Segment {i}", "voice0", use_cache=False)
+        if not reuse:
+            await api.aclose()
+    elapsed = time.perf_counter() - start
+    await api.aclose()
+    return elapsed / requests * 1000
+
+
+async def run(requests: int) -> dict:
+    with FakeElevenLabsServer() as server, tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+        os.environ["ELEVENLABS_BASE_URL"] = server.base_url
+        os.environ["ELEVENLABS_CACHE_DIR"] = tmp
+        from elevenlabs_mcp.elevenlabs_api import ElevenLabsAPI
+        api = ElevenLabsAPI()
+
+        # Warm up imports and the server thread pool
+        await measure(api, 5, reuse=True)
+        fresh_ms = await measure(api, requests, reuse=False)
+        pooled_ms = await measure(api, requests, reuse=True)
+
+    return {
+        "benchmark": "http_pool",
+        "requests": requests,
+        "fresh_connection_ms_per_segment": round(fresh_ms, 3),
+        "pooled_connection_ms_per_segment": round(pooled_ms, 3),
+        "speedup": round(fresh_ms / pooled_ms, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Cold-start time of the server entry point, up to its first tools/list response.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--latency S] [--budget-ms MS]
+
+Each run spawns a fresh `elevenlabs-mcp-server` process over stdio, sends the
+MCP initialize handshake and a tools/list request, and times spawn to response.
+The fake API answers the startup voice fetch after --latency seconds, so a
+server that blocks on it shows up immediately. Bare `import elevenlabs_mcp.server`
+time is reported alongside, and each figure is checked against --budget-ms.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_server import FakeElevenLabsServer  # noqa: E402
+
+HANDSHAKE = [
+    {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+        "protocolVersion": "2024-11-05", "capabilities": {},
+        "clientInfo": {"name": "bench_startup", "version": "0"},
+    }},
+    {"jsonrpc": "2.0", "method": "notifications/initialized"},
+    {"jsonrpc": "2.0", "id": 2, "method": "tools/list"},
+]
+
+
+def summarize(samples: list) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def time_import(env: dict, cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import elevenlabs_mcp.server"], env=env, cwd=cwd, check=True)
+    return time.perf_counter() - start
+
+
+def time_first_list_tools(env: dict, cwd: str) -> float:
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from elevenlabs_mcp.server import main; main()"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=env, cwd=cwd, text=True
+    )
+    try:
+        for message in HANDSHAKE:
+            process.stdin.write(json.dumps(message) + "\n")
+        process.stdin.flush()
+        for line in process.stdout:
+            response = json.loads(line)
+            if response.get("id") == 2:
+                if "result" not in response:
+                    raise RuntimeError(f"tools/list failed: {response}")
+                return time.perf_counter() - start
+        raise RuntimeError("Server exited before answering tools/list")
+    finally:
+        process.stdin.close()
+        process.wait(timeout=10)
+
+
+def run(runs: int, latency: float = 1.0, budget_ms: float = 1000) -> dict:
+    with FakeElevenLabsServer(latency=latency) as fake, tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "ELEVENLABS_API_KEY": "benchmark", "ELEVENLABS_BASE_URL": fake.base_url}
+        imports = [time_import(env, tmp) for _ in range(runs)]
+        startups = []
+        for _ in range(runs):
+            # A fresh, empty directory per run: no stored voices, no .env
+            cwd = tempfile.mkdtemp(dir=tmp)
+            startups.append(time_first_list_tools({**env, "ELEVENLABS_OUTPUT_DIR": cwd}, cwd))
+
+    first_list_tools = summarize(startups)
+    return {
+        "benchmark": "startup",
+        "runs": runs,
+        "voices_latency_seconds": latency,
+        "budget_ms": budget_ms,
+        "import": summarize(imports),
+        "first_list_tools": first_list_tools,
+        "within_budget": first_list_tools["median_ms"] <= budget_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.runs, args.latency, args.budget_ms), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""End-to-end MCP tool-call latency through the server's request handlers.
+
+Usage: python benchmarks/bench_tool_calls.py [--calls N] [--latency S]
+
+Drives ElevenLabsServer in-process against the local fake API and reports
+mean/p50/p95 latency per tool.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import mcp.types as types
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from fake_server import FakeElevenLabsServer  # noqa: E402
+
+
+def summarize(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "calls": len(samples),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 3),
+    }
+
+
+async def time_calls(call_tool, name: str, arguments: dict, calls: int) -> dict:
+    request = types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name=name, arguments=arguments)
+    )
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await call_tool(request)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+async def run(calls: int, latency: float = 0.05, history_jobs: int = 1000) -> dict:
+    with FakeElevenLabsServer(latency=latency) as fake, tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("ELEVENLABS_API_KEY", "benchmark")
+        os.environ["ELEVENLABS_BASE_URL"] = fake.base_url
+        os.environ["ELEVENLABS_CACHE_ENABLED"] = "false"
+        os.environ.setdefault("ELEVENLABS_REQUESTS_PER_SECOND", "0")
+        from elevenlabs_mcp.database import Database
+        from elevenlabs_mcp.models import AudioJob
+        from elevenlabs_mcp.server import ElevenLabsServer
+
+        server = ElevenLabsServer()
+        server.output_dir = Path(tmp)
+        server.parts_dir = server.output_dir / "parts"
+        server.db = Database(str(Path(tmp) / "history.db"))
+        server.voices.db = server.db
+        await server.db.initialize()
+        for i in range(history_jobs):
+            await server.db.insert_job(AudioJob(
+                id=str(uuid.uuid4()), status="completed", script_parts=[{"text": f"Historic job {i}"}]
+            ))
+        call_tool = server.server.request_handlers[types.CallToolRequest]
+
+        results = {
+            "list_voices": await time_calls(call_tool, "list_voices", {}, calls),
+            "get_voiceover_history": await time_calls(call_tool, "get_voiceover_history", {"limit": 20}, calls),
+            "generate_audio_simple": await time_calls(
+                call_tool, "generate_audio_simple",
+                {"text": "A short benchmark sentence.", "delivery": "reference"}, max(1, calls // 10)
+            ),
+        }
+        await server.shutdown()
+
+    return {
+        "benchmark": "tool_calls",
+        "api_latency_seconds": latency,
+        "history_jobs": history_jobs,
+        **results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.calls, args.latency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Time to sync a large voice library into the database.
+
+Usage: python benchmarks/bench_voice_sync.py [--voices N]
+
+Reports the initial sync, a re-sync where nothing changed, and a re-sync where
+a handful of voices changed, were added or were removed upstream.
+"""
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from elevenlabs_mcp.database import Database
+
+
+def make_voices(count: int, renamed: int = 0) -> list:
+    return [
+        {
+            "voice_id": f"voice{i}",
+            "name": f"Voice {i}" + (" (edited)" if i < renamed else ""),
+            "category": "cloned",
+            "labels": {"accent": "american", "age": "young", "gender": "female"},
+            "description": "A cloned voice used for benchmarking",
+            "preview_url": f"https://example.com/previews/voice{i}.mp3",
+            "high_quality_base_model_ids": ["eleven_multilingual_v2", "eleven_turbo_v2_5"],
+        }
+        for i in range(count)
+    ]
+
+
+async def timed_sync(db: Database, voices: list) -> dict:
+    start = time.perf_counter()
+    counts = await db.upsert_voices(voices)
+    return {"ms": round((time.perf_counter() - start) * 1000, 3), **counts}
+
+
+async def run(count: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(str(Path(tmp) / "voices.db"))
+        await db.initialize()
+        initial = await timed_sync(db, make_voices(count))
+        unchanged = await timed_sync(db, make_voices(count))
+        # 10 renamed, 5 removed from the end, 5 new ones appended
+        edited = make_voices(count - 5, renamed=10) + make_voices(count + 5)[count:]
+        partial = await timed_sync(db, edited)
+        await db.close()
+
+    return {
+        "benchmark": "voice_sync",
+        "voices": count,
+        "initial": initial,
+        "unchanged": unchanged,
+        "partial_change": partial,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--voices", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.voices)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
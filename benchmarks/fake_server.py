@@ -0,0 +1,126 @@
+"""Local stand-in for the ElevenLabs API used by the benchmarks.
+
+Serves `GET /v1/voices` and `POST /v1/text-to-speech/{voice_id}[/stream]` over
+HTTP/1.1 with keep-alive so connection reuse can be measured without network
+noise. Latency, jitter and an error rate can be injected to emulate the real
+service, and audio responses are canned MP3 payloads.
+"""
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# One MPEG-1 Layer III frame at 128 kbps / 44.1 kHz: header plus silent payload
+_MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x44]) + bytes(413)
+_MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def make_mp3(seconds: float) -> bytes:
+    """A canned MP3 payload of roughly the given duration."""
+    return _MP3_FRAME * max(1, round(seconds / _MP3_FRAME_SECONDS))
+
+VOICES = [
+    {"voice_id": f"voice{i}", "name": f"Voice {i}", "category": "premade", "labels": {},
+     "description": "", "preview_url": "", "high_quality_base_model_ids": []}
+    for i in range(20)
+]
+
+
+class FakeElevenLabsHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str, headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _delay_or_fail(self) -> bool:
+        """Apply the configured latency; return True if an error response was sent instead."""
+        server = self.server
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            headers = {"Retry-After": "0"} if server.error_status == 429 else {}
+            self._send(server.error_status, b'{"detail": "injected error"}', "application/json", headers)
+            return True
+        return False
+
+    def do_GET(self):
+        if self._delay_or_fail():
+            return
+        if self.path == "/v1/voices":
+            self._send(200, json.dumps({"voices": VOICES}).encode(), "application/json")
+        else:
+            self._send(404, b'{"detail": "not found"}', "application/json")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        with self.server.requests_lock:
+            self.server.requests += 1
+        if self._delay_or_fail():
+            return
+        if self.path.startswith("/v1/text-to-speech/"):
+            self._send(200, self.server.audio_payload, "audio/mpeg", {"request-id": uuid.uuid4().hex})
+        else:
+            self._send(404, b'{"detail": "not found"}', "application/json")
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # Clients that hang up before their (delayed) response arrives are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeElevenLabsServer:
+    """
+    Run the stand-in API on a background thread; use as a context manager.
+
+    latency and jitter are in seconds (each request sleeps latency ± jitter);
+    error_rate is the fraction of requests answered with error_status instead
+    (429 responses carry `Retry-After: 0`).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, audio_payload: bytes = None,
+                 latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0, error_status: int = 500):
+        self.httpd = _QuietHTTPServer((host, port), FakeElevenLabsHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.audio_payload = make_mp3(1.0) if audio_payload is None else audio_payload
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.error_rate = error_rate
+        self.httpd.error_status = error_status
+        self.httpd.requests = 0
+        self.httpd.requests_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def requests(self) -> int:
+        """Number of text-to-speech requests received."""
+        return self.httpd.requests
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def __enter__(self) -> "FakeElevenLabsServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,98 @@
+"""Run the benchmark suite and write one machine-readable results file.
+
+Usage: python benchmarks/run_all.py [--output results.json] [--quick] [--only NAME ...]
+
+Each benchmark's JSON result is collected under "results" together with the
+package version, git commit, Python version and platform, so runs can be
+compared across releases. --quick shrinks every workload for a smoke run.
+"""
+import argparse
+import asyncio
+import datetime
+import importlib.metadata
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import bench_base64  # noqa: E402
+import bench_concat  # noqa: E402
+import bench_context  # noqa: E402
+import bench_database  # noqa: E402
+import bench_full_audio  # noqa: E402
+import bench_http_pool  # noqa: E402
+import bench_startup  # noqa: E402
+import bench_tool_calls  # noqa: E402
+import bench_voice_sync  # noqa: E402
+
+# name -> (full workload, quick workload); each returns a JSON-serializable dict
+BENCHMARKS = {
+    "full_audio": (lambda: asyncio.run(bench_full_audio.run([1, 5, 20, 50])),
+                   lambda: asyncio.run(bench_full_audio.run([1, 5], latency=0.01, jitter=0.0))),
+    "concat": (lambda: bench_concat.run([10, 100, 500]),
+               lambda: bench_concat.run([10, 50], seconds_per_segment=2.0)),
+    "database": (lambda: asyncio.run(bench_database.run(500)),
+                 lambda: asyncio.run(bench_database.run(50))),
+    "voice_sync": (lambda: asyncio.run(bench_voice_sync.run(500)),
+                   lambda: asyncio.run(bench_voice_sync.run(50))),
+    "tool_calls": (lambda: asyncio.run(bench_tool_calls.run(200)),
+                   lambda: asyncio.run(bench_tool_calls.run(20, latency=0.01, history_jobs=100))),
+    "http_pool": (lambda: asyncio.run(bench_http_pool.run(200)),
+                  lambda: asyncio.run(bench_http_pool.run(20))),
+    "context": (lambda: bench_context.run(2000, 1000),
+                lambda: bench_context.run(200, 1000)),
+    "base64": (lambda: bench_base64.run(100),
+               lambda: bench_base64.run(5)),
+    "startup": (lambda: bench_startup.run(10),
+                lambda: bench_startup.run(2, latency=0.5)),
+}
+
+
+def environment() -> dict:
+    try:
+        version = importlib.metadata.version("elevenlabs-mcp-server")
+    except importlib.metadata.PackageNotFoundError:
+        version = None
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "package_version": version,
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", type=Path, help="Write results here instead of stdout")
+    parser.add_argument("--quick", action="store_true", help="Use small workloads")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Run only these benchmarks")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        full, quick = BENCHMARKS[name]
+        print(f"Running {name}...", file=sys.stderr)
+        start = time.perf_counter()
+        results[name] = quick() if args.quick else full()
+        results[name]["wall_seconds"] = round(time.perf_counter() - start, 3)
+
+    report = json.dumps({"environment": environment(), "quick": args.quick, "results": results}, indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -84,6 +84,22 @@ export class ElevenLabsClient {
     });
   }
 
+  private parseNextCursor(response: ReadResourceResult): string | null {
+    for (const content of response.contents) {
+      if (content.mimeType === 'text/plain' && typeof content.text === 'string') {
+        try {
+          const parsed = JSON.parse(content.text);
+          if (parsed && typeof parsed.next_cursor === 'string') {
+            return parsed.next_cursor;
+          }
+        } catch {
+          // Not a paginated listing
+        }
+      }
+    }
+    return null;
+  }
+
   private parseHistoryResponse(response: ReadResourceResult): JobHistory[] {
     console.log('Raw history response:', response);
 
@@ -95,6 +111,9 @@ export class ElevenLabsClient {
           const parsed = JSON.parse(cleanText);
           if (Array.isArray(parsed)) {
             return parsed as JobHistory[];
+          } else if (parsed && Array.isArray(parsed.jobs)) {
+            // Paginated listing: { jobs, next_cursor }
+            return parsed.jobs as JobHistory[];
           } else if (typeof parsed === 'object' && parsed !== null) {
             // If we got a single job object, wrap it in an array
             return [parsed as JobHistory];
@@ -218,15 +237,23 @@ export class ElevenLabsClient {
     try {
       await this.connectionPromise;
 
-      const request: ReadResourceRequest = {
-        method: 'resources/read',
-        params: {
-          uri: 'voiceover://history',
-        },
-      };
+      // The server returns at most 200 jobs per page; follow next_cursor to the end
+      const jobs: JobHistory[] = [];
+      let cursor: string | null = null;
+      do {
+        const query = cursor ? `&cursor=${encodeURIComponent(cursor)}` : '';
+        const request: ReadResourceRequest = {
+          method: 'resources/read',
+          params: {
+            uri: `voiceover://history?include_script=true&limit=200${query}`,
+          },
+        };
 
-      const response = await this.client.request(request, ReadResourceResultSchema);
-      return this.parseHistoryResponse(response);
+        const response = await this.client.request(request, ReadResourceResultSchema);
+        jobs.push(...this.parseHistoryResponse(response));
+        cursor = this.parseNextCursor(response);
+      } while (cursor);
+      return jobs;
     } catch (error) {
       console.error('Error fetching job history:', error);
       return [];
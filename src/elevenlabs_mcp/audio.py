@@ -0,0 +1,194 @@
+"""Frame-level MP3 handling used to join segments without decoding them."""
+import mmap
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Union
+
+# Layer III bitrates in kbps, indexed by the 4-bit bitrate field
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_SAMPLE_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+# How far past any ID3 tag to look for the first frame before giving up
+_MAX_SYNC_SCAN = 64 * 1024
+# Anything the frame parsers can index and slice, including a memory-mapped file
+_Buffer = Union[bytes, memoryview, mmap.mmap]
+
+
+@dataclass(frozen=True)
+class Mp3FrameHeader:
+    version: int  # raw 2-bit version field: 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5
+    bitrate: int  # kbps
+    sample_rate: int
+    padding: int
+    channel_mode: int  # 3 = mono
+    frame_length: int
+    samples_per_frame: int
+
+    @property
+    def channels(self) -> int:
+        return 1 if self.channel_mode == 3 else 2
+
+
+def parse_frame_header(data: _Buffer, offset: int = 0) -> Optional[Mp3FrameHeader]:
+    """Parse a Layer III frame header at offset. Returns None if it isn't one."""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset], data[offset + 1], data[offset + 2], data[offset + 3]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = (b1 >> 3) & 0x03
+    layer = (b1 >> 1) & 0x03
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    bitrate = (_BITRATES_V1 if version == 3 else _BITRATES_V2)[bitrate_index]
+    sample_rate = _SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    samples_per_frame = 1152 if version == 3 else 576
+    frame_length = samples_per_frame // 8 * bitrate * 1000 // sample_rate + padding
+    return Mp3FrameHeader(
+        version=version,
+        bitrate=bitrate,
+        sample_rate=sample_rate,
+        padding=padding,
+        channel_mode=b3 >> 6,
+        frame_length=frame_length,
+        samples_per_frame=samples_per_frame,
+    )
+
+
+def _id3v2_size(data: _Buffer) -> int:
+    """Size of a leading ID3v2 tag including its header, or 0 if there is none."""
+    if len(data) < 10 or bytes(data[:3]) != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _xing_offset(offset: int, header: Mp3FrameHeader) -> int:
+    """Where a Xing/Info tag would start in the frame at offset (after the side info)."""
+    if header.version == 3:
+        side_info = 17 if header.channels == 1 else 32
+    else:
+        side_info = 9 if header.channels == 1 else 17
+    return offset + 4 + side_info
+
+
+def _is_info_frame(data: _Buffer, offset: int, header: Mp3FrameHeader) -> bool:
+    """Whether the frame at offset is a Xing/Info/VBRI header rather than audio."""
+    tag_offset = _xing_offset(offset, header)
+    tag = bytes(data[tag_offset:tag_offset + 4])
+    return tag in (b"Xing", b"Info") or bytes(data[offset + 36:offset + 40]) == b"VBRI"
+
+
+def find_audio_frames(data: bytes) -> tuple[int, int, Mp3FrameHeader]:
+    """
+    Locate the span of MPEG audio frames in an MP3 payload.
+
+    Skips ID3v2/ID3v1 tags and a leading Xing/Info/VBRI frame, whose frame counts
+    would be wrong once segments are joined. Returns (start, end, first_header).
+    Raises ValueError if the payload does not look like Layer III MP3.
+    """
+    end = len(data)
+    if end >= 128 and bytes(data[end - 128:end - 125]) == b"TAG":
+        end -= 128
+
+    offset = _id3v2_size(data)
+    scan_limit = min(end - 4, offset + _MAX_SYNC_SCAN)
+    while 0 <= offset < scan_limit:
+        header = parse_frame_header(data, offset)
+        if header is not None:
+            following = offset + header.frame_length
+            # Require a second frame (or the end of data) to rule out false syncs
+            if following >= end or parse_frame_header(data, following) is not None:
+                if _is_info_frame(data, offset, header):
+                    offset = following
+                    continue
+                return offset, end, header
+        offset = data.find(b"\xff", offset + 1, scan_limit)
+    raise ValueError("No MPEG Layer III frames found")
+
+
+def concat_mp3(segments: Iterable[bytes], output: Union[str, Path, BinaryIO]) -> int:
+    """
+    Join MP3 segments by copying their audio frames straight into output.
+
+    Runs in time linear in the total size and never holds more than the segment
+    being copied. All segments must share MPEG version, sample rate and channel
+    count; otherwise ValueError is raised so the caller can fall back to a
+    decode/re-encode path. Returns the number of bytes written.
+    """
+    if isinstance(output, (str, Path)):
+        with open(output, "wb") as f:
+            return concat_mp3(segments, f)
+
+    reference: Optional[Mp3FrameHeader] = None
+    written = 0
+    for segment in segments:
+        start, end, header = find_audio_frames(segment)
+        if reference is None:
+            reference = header
+        elif (header.version, header.sample_rate, header.channels) != (
+            reference.version, reference.sample_rate, reference.channels
+        ):
+            raise ValueError(
+                f"Cannot join MP3 segments with different formats: "
+                f"{reference.sample_rate} Hz/{reference.channels} ch vs {header.sample_rate} Hz/{header.channels} ch"
+            )
+        output.write(memoryview(segment)[start:end])
+        written += end - start
+    if reference is None:
+        raise ValueError("No MP3 segments to join")
+    return written
+
+
+def mp3_duration(data: Union[bytes, mmap.mmap]) -> float:
+    """
+    Duration in seconds of an MP3 payload.
+
+    Uses the frame count from a leading Xing/Info header when there is one and
+    otherwise walks the frame headers, reading 4 bytes per frame, so it is cheap
+    on a memory-mapped file. Raises ValueError if the payload is not Layer III MP3.
+    """
+    offset = _id3v2_size(data)
+    scan_limit = min(len(data) - 4, offset + _MAX_SYNC_SCAN)
+    header = None
+    while 0 <= offset < scan_limit:
+        header = parse_frame_header(data, offset)
+        if header is not None:
+            break
+        offset = data.find(b"\xff", offset + 1, scan_limit)
+    if header is None:
+        raise ValueError("No MPEG Layer III frames found")
+
+    sample_rate = header.sample_rate
+    if _is_info_frame(data, offset, header):
+        tag_offset = _xing_offset(offset, header)
+        flags = int.from_bytes(data[tag_offset + 4:tag_offset + 8], "big")
+        if bytes(data[tag_offset:tag_offset + 4]) in (b"Xing", b"Info") and flags & 0x01:
+            frames = int.from_bytes(data[tag_offset + 8:tag_offset + 12], "big")
+            return frames * header.samples_per_frame / sample_rate
+        offset += header.frame_length
+        header = parse_frame_header(data, offset)
+
+    samples = 0
+    while header is not None:
+        samples += header.samples_per_frame
+        offset += header.frame_length
+        header = parse_frame_header(data, offset)
+    return samples / sample_rate
+
+
+def mp3_file_duration(path: Union[str, Path]) -> float:
+    """mp3_duration for a file on disk, memory-mapped rather than read."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return mp3_duration(data)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def segment_cache_key(voice_id: str, data: Dict) -> str:
+    """
+    Build a content-addressed cache key for a text-to-speech request.
+
+    The key covers everything that shapes the rendered audio: the voice, the text,
+    the model, the voice settings and any stitching context sent with the request.
+    `previous_request_ids` are excluded because they identify earlier renders rather
+    than describe the content; including them would turn every re-run into a miss.
+    """
+    payload = {key: value for key, value in data.items() if key != "previous_request_ids"}
+    payload["voice_id"] = voice_id
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class SegmentCache:
+    """
+    Disk-backed LRU cache of rendered audio segments.
+
+    Each entry is stored as a single file named after its key. The file holds the
+    ElevenLabs request-id on the first line followed by the raw audio bytes, so a
+    cache hit can still feed `previous_request_ids` for request stitching.
+    """
+
+    SUFFIX = ".seg"
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}{self.SUFFIX}"
+
+    def _load(self) -> None:
+        """Build the in-memory LRU index from the cache directory on first use."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not self.cache_dir.is_dir():
+            return
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.SUFFIX):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name[:-len(self.SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[tuple[bytes, Optional[str]]]:
+        """Return (audio_bytes, request_id) for a cached segment, or None on a miss."""
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    request_id = f.readline().rstrip(b"\n").decode("utf-8")
+                    audio = f.read()
+                # Bump mtime so recency survives a restart
+                os.utime(path)
+            except OSError as e:
+                logging.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            # An empty line means the API sent no request-id
+            return audio, request_id or None
+
+    def put(self, key: str, audio: bytes, request_id: Optional[str]) -> None:
+        """Store a rendered segment and evict least-recently-used entries over the size limit."""
+        with self._lock:
+            self._load()
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write((request_id or "").encode("utf-8") + b"\n")
+                f.write(audio)
+            os.replace(tmp_path, path)
+
+            size = path.stat().st_size
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            logging.debug(f"Evicted segment cache entry {key} ({size} bytes)")
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current cache occupancy."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
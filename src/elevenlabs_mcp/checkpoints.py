@@ -0,0 +1,61 @@
+import asyncio
+import logging
+import shutil
+from pathlib import Path
+from typing import Dict, Optional
+
+from .database import Database
+from .formats import get_output_format
+
+
+class JobCheckpoint:
+    """
+    Per-part progress of one audio job, persisted so an interrupted or partially
+    failed job can resume without paying for parts that already rendered.
+
+    Each completed part's audio is written as the API returned it to
+    `<parts_dir>/<job_id>/<index>.<codec>` (e.g. `3.mp3`, `3.pcm`) and recorded in the `job_parts` table together with its ElevenLabs request-id,
+    which a resumed run feeds back into `previous_request_ids` for stitching.
+    """
+
+    def __init__(self, db: Database, job_id: str, parts_dir: Path, output_format: Optional[str] = None):
+        self.db = db
+        self.job_id = job_id
+        self.job_dir = Path(parts_dir) / job_id
+        self.part_extension = get_output_format(output_format).part_extension
+
+    async def load(self) -> Dict[int, tuple[bytes, str]]:
+        """Return {part_index: (audio_bytes, request_id)} for parts that can be reused."""
+        completed = {}
+        for row in await self.db.get_job_parts(self.job_id):
+            if row["status"] != "completed" or not row["audio_file"]:
+                continue
+            try:
+                audio = await asyncio.to_thread(Path(row["audio_file"]).read_bytes)
+            except OSError:
+                logging.warning(f"Checkpoint audio for part {row['part_index']} of job {self.job_id} is missing")
+                continue
+            completed[row["part_index"]] = (audio, row["request_id"])
+        return completed
+
+    async def save_part(self, index: int, audio: bytes, request_id: Optional[str]) -> None:
+        """Persist a freshly rendered part."""
+        path = self.job_dir / f"{index}{self.part_extension}"
+
+        def write():
+            self.job_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(audio)
+            tmp_path.replace(path)
+
+        await asyncio.to_thread(write)
+        await self.db.upsert_job_part(self.job_id, index, "completed", request_id=request_id, audio_file=str(path))
+
+    async def fail_part(self, index: int, error: str) -> None:
+        """Record that a part failed so it is retried on resume."""
+        await self.db.upsert_job_part(self.job_id, index, "failed", error=error)
+
+    async def clear(self) -> None:
+        """Drop stored parts once the job no longer needs them."""
+        await asyncio.to_thread(shutil.rmtree, self.job_dir, True)
+        await self.db.delete_job_parts(self.job_id)
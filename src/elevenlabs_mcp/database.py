@@ -1,26 +1,25 @@
 import aiosqlite
+import asyncio
+import base64
+import hashlib
 import json
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Sequence
 
+from .metrics import REGISTRY
 from .models import AudioJob
 
 def get_database_path() -> str:
-    """Get the database path, ensuring it's in the output directory."""
+    """Get the database path inside the output directory. The directory is created on first connect."""
     # First try to get the output directory from the server instance
     output_dir = os.getenv("ELEVENLABS_OUTPUT_DIR")
     if not output_dir:
         # Fall back to default output directory in project root
         output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "output")
-    
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
-    
     return os.path.join(output_dir, "voiceover_history.db")
 
-DATABASE_PATH = get_database_path()
-
 CREATE_VOICES_TABLE = """
 CREATE TABLE IF NOT EXISTS voices (
     voice_id TEXT PRIMARY KEY,
@@ -30,10 +29,21 @@ CREATE TABLE IF NOT EXISTS voices (
     description TEXT,
     preview_url TEXT,
     high_quality_base_model_ids TEXT,  -- JSON string
-    last_updated TEXT NOT NULL
+    last_updated TEXT NOT NULL,
+    content_hash TEXT
+)
+"""
+
+CREATE_METADATA_TABLE = """
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
 )
 """
 
+# metadata key holding when the voice catalogue was last synced with ElevenLabs
+VOICES_SYNCED_AT = "voices_synced_at"
+
 CREATE_JOBS_TABLE = """
 CREATE TABLE IF NOT EXISTS audio_jobs (
     id TEXT PRIMARY KEY,
@@ -44,33 +54,174 @@ CREATE TABLE IF NOT EXISTS audio_jobs (
     created_at TEXT NOT NULL,
     updated_at TEXT NOT NULL,
     total_parts INTEGER NOT NULL DEFAULT 1,
-    completed_parts INTEGER NOT NULL DEFAULT 0
+    completed_parts INTEGER NOT NULL DEFAULT 0,
+    options TEXT,  -- JSON string
+    render_key TEXT
+)
+"""
+
+# Final outputs are stored once per distinct content and shared by every job producing it
+CREATE_OUTPUTS_TABLE = """
+CREATE TABLE IF NOT EXISTS outputs (
+    content_hash TEXT PRIMARY KEY,
+    output_file TEXT NOT NULL UNIQUE,
+    size_bytes INTEGER NOT NULL,
+    refcount INTEGER NOT NULL,
+    created_at TEXT NOT NULL
+)
+"""
+
+CREATE_JOB_PARTS_TABLE = """
+CREATE TABLE IF NOT EXISTS job_parts (
+    job_id TEXT NOT NULL,
+    part_index INTEGER NOT NULL,
+    status TEXT NOT NULL,  -- 'completed', 'failed'
+    request_id TEXT,
+    audio_file TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (job_id, part_index)
 )
 """
 
+# History is listed newest first with a keyset cursor on (created_at, id), optionally per status
+CREATE_JOB_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_audio_jobs_created ON audio_jobs (created_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audio_jobs_status_created ON audio_jobs (status, created_at, id)",
+    "CREATE INDEX IF NOT EXISTS idx_audio_jobs_render_key ON audio_jobs (render_key)",
+)
+
+# Job columns returned by history listings unless the full script is asked for
+JOB_SUMMARY_COLUMNS = (
+    "id", "status", "output_file", "error", "created_at", "updated_at", "total_parts", "completed_parts"
+)
+
+# Columns added after the first release, applied to existing databases on startup
+COLUMN_MIGRATIONS = {
+    "audio_jobs": {
+        "options": "ALTER TABLE audio_jobs ADD COLUMN options TEXT",
+        "render_key": "ALTER TABLE audio_jobs ADD COLUMN render_key TEXT",
+    },
+    "voices": {
+        "content_hash": "ALTER TABLE voices ADD COLUMN content_hash TEXT",
+    },
+}
+
+VOICE_FIELDS = ("voice_id", "name", "category", "labels", "description", "preview_url", "high_quality_base_model_ids")
+
+def voice_content_hash(voice: dict) -> str:
+    """Hash of the stored fields of a voice, used to skip rewriting unchanged rows."""
+    content = json.dumps([voice.get(name) for name in VOICE_FIELDS], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def encode_cursor(created_at: str, job_id: str) -> str:
+    """Opaque history cursor pointing just past the given job."""
+    return base64.urlsafe_b64encode(json.dumps([created_at, job_id]).encode("utf-8")).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        datetime.fromisoformat(created_at)
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return created_at, str(job_id)
+
+def _row_to_job(row: aiosqlite.Row) -> AudioJob:
+    return AudioJob.from_dict({
+        "id": row["id"],
+        "status": row["status"],
+        "script_parts": json.loads(row["script_parts"]),
+        "output_file": row["output_file"],
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+        "total_parts": row["total_parts"],
+        "completed_parts": row["completed_parts"],
+        "options": json.loads(row["options"]) if row["options"] else {},
+        "render_key": row["render_key"]
+    })
+
 class Database:
     CACHE_DURATION_SECONDS = 24 * 60 * 60  # 24 hours
-    def __init__(self, db_path: str = DATABASE_PATH):
-        self.db_path = db_path
-        # Ensure output directory exists
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+    # Applied to the long-lived connection: WAL lets readers proceed during writes,
+    # and synchronous=NORMAL is durable under WAL without an fsync per commit
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA cache_size=-8000",  # 8 MB page cache
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or get_database_path()
+        self._db: Optional[aiosqlite.Connection] = None
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+
+    async def _connection(self) -> aiosqlite.Connection:
+        """Return the shared connection, opening and tuning it on first use."""
+        if self._db is None:
+            async with self._connect_lock:
+                if self._db is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                    db = await aiosqlite.connect(self.db_path)
+                    db.row_factory = aiosqlite.Row
+                    for pragma in self.PRAGMAS:
+                        await db.execute(pragma)
+                    self._db = db
+        return self._db
+
+    @asynccontextmanager
+    async def _transaction(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Run writes on the shared connection as one transaction.
+
+        Writers are serialized so one caller's commit never includes another
+        caller's half-finished statements.
+        """
+        db = await self._connection()
+        async with self._write_lock:
+            try:
+                yield db
+            except BaseException:
+                await db.rollback()
+                raise
+            await db.commit()
+
+    async def close(self) -> None:
+        """Close the shared connection. It is reopened on next use."""
+        if self._db is not None:
+            db, self._db = self._db, None
+            await db.close()
         
     async def initialize(self):
         """Initialize database and create tables if they don't exist."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._transaction() as db:
             # Create tables one at a time
             await db.execute(CREATE_VOICES_TABLE)
             await db.execute(CREATE_JOBS_TABLE)
-            await db.commit()
+            await db.execute(CREATE_JOB_PARTS_TABLE)
+            await db.execute(CREATE_METADATA_TABLE)
+            await db.execute(CREATE_OUTPUTS_TABLE)
+            for table, migrations in COLUMN_MIGRATIONS.items():
+                async with db.execute(f"PRAGMA table_info({table})") as cursor:
+                    columns = {row[1] for row in await cursor.fetchall()}
+                for column, statement in migrations.items():
+                    if column not in columns:
+                        await db.execute(statement)
+            for statement in CREATE_JOB_INDEXES:
+                await db.execute(statement)
 
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="insert_job")
     async def insert_job(self, job: AudioJob) -> None:
         """Insert a new audio job into the database."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._transaction() as db:
             await db.execute(
                 """
                 INSERT INTO audio_jobs 
-                (id, status, script_parts, output_file, error, created_at, updated_at, total_parts, completed_parts)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (id, status, script_parts, output_file, error, created_at, updated_at, total_parts, completed_parts, options,
+                 render_key)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     job.id,
@@ -81,20 +232,22 @@ class Database:
                     job.created_at.isoformat(),
                     job.updated_at.isoformat(),
                     job.total_parts,
-                    job.completed_parts
+                    job.completed_parts,
+                    json.dumps(job.options),
+                    job.render_key
                 )
             )
-            await db.commit()
 
-    async def update_job(self, job: AudioJob) -> None:
-        """Update an existing audio job in the database."""
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="update_job")
+    async def update_job(self, job: AudioJob) -> bool:
+        """Update an existing audio job in the database. Returns False if the job no longer exists."""
         job.updated_at = datetime.utcnow()
-        async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
+        async with self._transaction() as db:
+            cursor = await db.execute(
                 """
                 UPDATE audio_jobs 
                 SET status = ?, script_parts = ?, output_file = ?, error = ?, 
-                    updated_at = ?, total_parts = ?, completed_parts = ?
+                    updated_at = ?, total_parts = ?, completed_parts = ?, options = ?, render_key = ?
                 WHERE id = ?
                 """,
                 (
@@ -105,75 +258,336 @@ class Database:
                     job.updated_at.isoformat(),
                     job.total_parts,
                     job.completed_parts,
+                    json.dumps(job.options),
+                    job.render_key,
                     job.id
                 )
             )
-            await db.commit()
+            return cursor.rowcount > 0
 
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_job")
     async def get_job(self, job_id: str) -> Optional[AudioJob]:
         """Get a specific audio job by ID."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute(
-                "SELECT * FROM audio_jobs WHERE id = ?", (job_id,)
-            ) as cursor:
-                row = await cursor.fetchone()
-                if row is None:
-                    return None
-                return AudioJob.from_dict({
-                    "id": row["id"],
-                    "status": row["status"],
-                    "script_parts": json.loads(row["script_parts"]),
-                    "output_file": row["output_file"],
-                    "error": row["error"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                    "total_parts": row["total_parts"],
-                    "completed_parts": row["completed_parts"]
-                })
+        db = await self._connection()
+        async with db.execute(
+            "SELECT * FROM audio_jobs WHERE id = ?", (job_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            return _row_to_job(row)
 
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_all_jobs")
     async def get_all_jobs(self) -> List[AudioJob]:
         """Get all audio jobs."""
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute("SELECT * FROM audio_jobs ORDER BY created_at DESC") as cursor:
-                rows = await cursor.fetchall()
-                return [AudioJob.from_dict({
-                    "id": row["id"],
-                    "status": row["status"],
-                    "script_parts": json.loads(row["script_parts"]),
-                    "output_file": row["output_file"],
-                    "error": row["error"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                    "total_parts": row["total_parts"],
-                    "completed_parts": row["completed_parts"]
-                }) for row in rows]
+        db = await self._connection()
+        async with db.execute("SELECT * FROM audio_jobs ORDER BY created_at DESC") as cursor:
+            rows = await cursor.fetchall()
+            return [_row_to_job(row) for row in rows]
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="list_jobs")
+    async def list_jobs(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        statuses: Optional[Sequence[str]] = None,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        include_script: bool = False,
+    ) -> tuple[List[dict], Optional[str]]:
+        """
+        Get one page of job history, newest first.
+
+        Pages are keyed on (created_at, id) so each page is an index range scan no
+        matter how deep it is. Unless include_script is set, only the summary
+        columns are read and script_parts is never decoded.
+        Returns (jobs, next_cursor); next_cursor is None on the last page.
+        """
+        conditions, params = [], []
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        if statuses:
+            conditions.append(f"status IN ({', '.join('?' for _ in statuses)})")
+            params.extend(statuses)
+        if created_after:
+            conditions.append("created_at >= ?")
+            params.append(created_after.isoformat())
+        if created_before:
+            conditions.append("created_at < ?")
+            params.append(created_before.isoformat())
+
+        columns = "*" if include_script else ", ".join(JOB_SUMMARY_COLUMNS)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        db = await self._connection()
+        async with db.execute(
+            f"SELECT {columns} FROM audio_jobs {where} ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit + 1)
+        ) as result:
+            rows = list(await result.fetchall())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+        if include_script:
+            return [_row_to_job(row).to_dict() for row in rows], next_cursor
+        return [dict(row) for row in rows], next_cursor
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_jobs_by_status")
+    async def get_jobs_by_status(self, statuses: List[str]) -> List[AudioJob]:
+        """Get jobs in any of the given statuses, oldest first."""
+        placeholders = ", ".join("?" for _ in statuses)
+        db = await self._connection()
+        async with db.execute(
+            f"SELECT * FROM audio_jobs WHERE status IN ({placeholders}) ORDER BY created_at ASC",
+            tuple(statuses)
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [_row_to_job(row) for row in rows]
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="claim_job")
+    async def claim_job(self, job_id: str) -> bool:
+        """Move a pending job to 'processing'. Returns False if another worker or process got there first."""
+        async with self._transaction() as db:
+            cursor = await db.execute(
+                "UPDATE audio_jobs SET status = 'processing', updated_at = ? WHERE id = ? AND status = 'pending'",
+                (datetime.utcnow().isoformat(), job_id)
+            )
+            return cursor.rowcount > 0
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="touch_jobs")
+    async def touch_jobs(self, job_ids: Sequence[str]) -> None:
+        """Refresh updated_at on processing jobs, marking them as still owned by a live process."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        placeholders = ", ".join("?" for _ in job_ids)
+        async with self._transaction() as db:
+            await db.execute(
+                f"UPDATE audio_jobs SET updated_at = ? WHERE status = 'processing' AND id IN ({placeholders})",
+                (datetime.utcnow().isoformat(), *job_ids)
+            )
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="requeue_stale_jobs")
+    async def requeue_stale_jobs(self, stale_before: datetime) -> int:
+        """Reset processing jobs not updated since stale_before to 'pending'. Returns how many were reset."""
+        async with self._transaction() as db:
+            cursor = await db.execute(
+                "UPDATE audio_jobs SET status = 'pending', updated_at = ? WHERE status = 'processing' AND updated_at < ?",
+                (datetime.utcnow().isoformat(), stale_before.isoformat())
+            )
+            return cursor.rowcount
 
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="upsert_job_part")
+    async def upsert_job_part(self, job_id: str, part_index: int, status: str, request_id: Optional[str] = None,
+                              audio_file: Optional[str] = None, error: Optional[str] = None) -> None:
+        """Record the state of one script part and refresh the job's completed_parts count."""
+        async with self._transaction() as db:
+            await db.execute(
+                """
+                INSERT INTO job_parts (job_id, part_index, status, request_id, audio_file, error, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(job_id, part_index) DO UPDATE SET
+                    status = excluded.status,
+                    request_id = excluded.request_id,
+                    audio_file = excluded.audio_file,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (job_id, part_index, status, request_id, audio_file, error, datetime.utcnow().isoformat())
+            )
+            await db.execute(
+                """
+                UPDATE audio_jobs SET completed_parts = (
+                    SELECT COUNT(*) FROM job_parts WHERE job_id = ? AND status = 'completed'
+                )
+                WHERE id = ?
+                """,
+                (job_id, job_id)
+            )
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_job_parts")
+    async def get_job_parts(self, job_id: str) -> List[dict]:
+        """Get the recorded parts of a job ordered by part index."""
+        db = await self._connection()
+        async with db.execute(
+            "SELECT * FROM job_parts WHERE job_id = ? ORDER BY part_index", (job_id,)
+        ) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="delete_job_parts")
+    async def delete_job_parts(self, job_id: str) -> None:
+        """Delete all recorded parts of a job."""
+        async with self._transaction() as db:
+            await db.execute("DELETE FROM job_parts WHERE job_id = ?", (job_id,))
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="delete_job")
     async def delete_job(self, job_id: str) -> bool:
         """Delete an audio job by ID. Returns True if job was deleted."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._transaction() as db:
+            await db.execute("DELETE FROM job_parts WHERE job_id = ?", (job_id,))
             cursor = await db.execute("DELETE FROM audio_jobs WHERE id = ?", (job_id,))
             deleted = cursor.rowcount > 0
-            await db.commit()
-            return deleted
+        return deleted
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_job_statuses")
+    async def get_job_statuses(self, job_ids: Sequence[str]) -> Dict[str, str]:
+        """Map each of job_ids that still exists to its status."""
+        job_ids = list(job_ids)
+        statuses = {}
+        db = await self._connection()
+        # Stay well under SQLite's limit on bound parameters
+        for start in range(0, len(job_ids), 500):
+            batch = job_ids[start:start + 500]
+            async with db.execute(
+                f"SELECT id, status FROM audio_jobs WHERE id IN ({', '.join('?' for _ in batch)})", batch
+            ) as cursor:
+                statuses.update({row["id"]: row["status"] for row in await cursor.fetchall()})
+        return statuses
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_output_files")
+    async def get_output_files(self) -> Dict[str, tuple[str, str]]:
+        """Map every stored output_file to the (job_id, status) of the job that owns it."""
+        db = await self._connection()
+        async with db.execute(
+            "SELECT id, status, output_file FROM audio_jobs WHERE output_file IS NOT NULL"
+        ) as cursor:
+            return {row["output_file"]: (row["id"], row["status"]) for row in await cursor.fetchall()}
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="detach_output_files")
+    async def detach_output_files(self, output_files: Sequence[str], reason: str) -> int:
+        """
+        Clear output_file (recording reason as the job error) on jobs pointing at
+        any of output_files, and forget those files as shared outputs.
+        """
+        if not output_files:
+            return 0
+        now = datetime.utcnow().isoformat()
+        async with self._transaction() as db:
+            cursor = await db.executemany(
+                "UPDATE audio_jobs SET output_file = NULL, error = ?, updated_at = ? WHERE output_file = ?",
+                [(reason, now, output_file) for output_file in output_files]
+            )
+            await db.executemany("DELETE FROM outputs WHERE output_file = ?", [(f,) for f in output_files])
+            return cursor.rowcount
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="acquire_output")
+    async def acquire_output(self, content_hash: str, output_file: str, size_bytes: int) -> int:
+        """Register one more reference to the output with this content. Returns its refcount."""
+        async with self._transaction() as db:
+            await db.execute(
+                """
+                INSERT INTO outputs (content_hash, output_file, size_bytes, refcount, created_at)
+                VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET refcount = refcount + 1
+                """,
+                (content_hash, output_file, size_bytes, datetime.utcnow().isoformat())
+            )
+            async with db.execute("SELECT refcount FROM outputs WHERE content_hash = ?", (content_hash,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                # Only possible if the upsert above silently did nothing
+                raise RuntimeError(f"Output {content_hash} was not recorded")
+            return row[0]
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_shared_outputs")
+    async def get_shared_outputs(self) -> List[str]:
+        """Every output_file registered as a shared output."""
+        db = await self._connection()
+        async with db.execute("SELECT output_file FROM outputs") as cursor:
+            return [row["output_file"] for row in await cursor.fetchall()]
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="add_output_reference")
+    async def add_output_reference(self, output_file: str) -> bool:
+        """Add a reference to an existing shared output. False if output_file isn't one."""
+        async with self._transaction() as db:
+            cursor = await db.execute(
+                "UPDATE outputs SET refcount = refcount + 1 WHERE output_file = ?", (output_file,)
+            )
+            return cursor.rowcount > 0
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="release_output")
+    async def release_output(self, output_file: str) -> Optional[int]:
+        """
+        Drop one reference to a shared output and return how many remain; at 0
+        the output is forgotten and its file can be removed. Returns None if
+        output_file isn't a shared output.
+        """
+        async with self._transaction() as db:
+            async with db.execute("SELECT refcount FROM outputs WHERE output_file = ?", (output_file,)) as cursor:
+                row = await cursor.fetchone()
+            if row is None:
+                return None
+            if row[0] <= 1:
+                await db.execute("DELETE FROM outputs WHERE output_file = ?", (output_file,))
+                return 0
+            await db.execute("UPDATE outputs SET refcount = refcount - 1 WHERE output_file = ?", (output_file,))
+            return row[0] - 1
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="find_output")
+    async def find_output(self, render_key: str) -> Optional[str]:
+        """Output file of the latest fully rendered job with this render_key, if any."""
+        db = await self._connection()
+        async with db.execute(
+            """
+            SELECT output_file FROM audio_jobs
+            WHERE render_key = ? AND status = 'completed' AND output_file IS NOT NULL
+                AND completed_parts >= total_parts
+            ORDER BY updated_at DESC LIMIT 1
+            """,
+            (render_key,)
+        ) as cursor:
+            row = await cursor.fetchone()
+            return row["output_file"] if row else None
 
     async def cleanup(self) -> None:
         """Delete the database file. Useful for testing."""
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
-
-    async def upsert_voices(self, voices: List[dict]) -> None:
-        """Insert or update voice data in the database."""
-        async with aiosqlite.connect(self.db_path) as db:
-            now = datetime.utcnow().isoformat()
-            for voice in voices:
-                await db.execute(
+        await self.close()
+        for path in (self.db_path, f"{self.db_path}-wal", f"{self.db_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="upsert_voices")
+    async def upsert_voices(self, voices: List[dict]) -> Dict[str, int]:
+        """
+        Sync the stored voice catalogue with the full list fetched from ElevenLabs.
+
+        Runs as one transaction: only voices whose content hash changed are
+        written, in a single batched statement, and voices no longer listed
+        upstream are deleted. Records the sync time for get_voices.
+        Returns counts of added, changed, removed and unchanged voices.
+        """
+        now = datetime.utcnow().isoformat()
+        incoming = {voice["voice_id"]: (voice, voice_content_hash(voice)) for voice in voices}
+        async with self._transaction() as db:
+            async with db.execute("SELECT voice_id, content_hash FROM voices") as cursor:
+                stored = {row[0]: row[1] for row in await cursor.fetchall()}
+
+            rows = [
+                (
+                    voice_id,
+                    voice["name"],
+                    voice["category"],
+                    json.dumps(voice["labels"]),
+                    voice["description"],
+                    voice["preview_url"],
+                    json.dumps(voice["high_quality_base_model_ids"]),
+                    now,
+                    content_hash
+                )
+                for voice_id, (voice, content_hash) in incoming.items()
+                if stored.get(voice_id) != content_hash
+            ]
+            removed = [(voice_id,) for voice_id in stored.keys() - incoming.keys()]
+
+            if rows:
+                await db.executemany(
                     """
                     INSERT INTO voices 
                     (voice_id, name, category, labels, description, preview_url, 
-                     high_quality_base_model_ids, last_updated)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                     high_quality_base_model_ids, last_updated, content_hash)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                     ON CONFLICT(voice_id) DO UPDATE SET
                         name = excluded.name,
                         category = excluded.category,
@@ -181,55 +595,61 @@ class Database:
                         description = excluded.description,
                         preview_url = excluded.preview_url,
                         high_quality_base_model_ids = excluded.high_quality_base_model_ids,
-                        last_updated = excluded.last_updated
+                        last_updated = excluded.last_updated,
+                        content_hash = excluded.content_hash
                     """,
-                    (
-                        voice["voice_id"],
-                        voice["name"],
-                        voice["category"],
-                        json.dumps(voice["labels"]),
-                        voice["description"],
-                        voice["preview_url"],
-                        json.dumps(voice["high_quality_base_model_ids"]),
-                        now
-                    )
+                    rows
                 )
-            await db.commit()
+            if removed:
+                await db.executemany("DELETE FROM voices WHERE voice_id = ?", removed)
+            await db.execute(
+                "INSERT INTO metadata (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (VOICES_SYNCED_AT, now)
+            )
+
+        added = sum(1 for row in rows if row[0] not in stored)
+        return {
+            "added": added,
+            "changed": len(rows) - added,
+            "removed": len(removed),
+            "unchanged": len(incoming) - len(rows),
+        }
 
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_voices_synced_at")
+    async def get_voices_synced_at(self) -> Optional[datetime]:
+        """When the voice catalogue was last synced with ElevenLabs, or None if never."""
+        db = await self._connection()
+        async with db.execute("SELECT value FROM metadata WHERE key = ?", (VOICES_SYNCED_AT,)) as cursor:
+            row = await cursor.fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    @REGISTRY.timed("elevenlabs_db_operation_seconds", operation="get_voices")
     async def get_voices(self, max_age_seconds: Optional[int] = None) -> tuple[List[dict], bool]:
         """
         Get all voices from the database.
         Returns tuple of (voices, needs_refresh) where needs_refresh indicates if cache is stale.
         """
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            async with db.execute("SELECT * FROM voices ORDER BY name") as cursor:
-                rows = await cursor.fetchall()
-                
-                voices = []
-                needs_refresh = False
-                
-                if not rows:
-                    needs_refresh = True
-                else:
-                    max_age = max_age_seconds or self.CACHE_DURATION_SECONDS
-                    now = datetime.utcnow()
-                    
-                    for row in rows:
-                        last_updated = datetime.fromisoformat(row["last_updated"])
-                        age = (now - last_updated).total_seconds()
-                        
-                        if age > max_age:
-                            needs_refresh = True
-                            
-                        voices.append({
-                            "voice_id": row["voice_id"],
-                            "name": row["name"],
-                            "category": row["category"],
-                            "labels": json.loads(row["labels"]),
-                            "description": row["description"],
-                            "preview_url": row["preview_url"],
-                            "high_quality_base_model_ids": json.loads(row["high_quality_base_model_ids"])
-                        })
-                
-                return voices, needs_refresh
+        synced_at = await self.get_voices_synced_at()
+        db = await self._connection()
+        async with db.execute("SELECT * FROM voices ORDER BY name") as cursor:
+            rows = await cursor.fetchall()
+
+        if synced_at is None:
+            needs_refresh = True
+        else:
+            max_age = max_age_seconds or self.CACHE_DURATION_SECONDS
+            needs_refresh = (datetime.utcnow() - synced_at).total_seconds() > max_age
+
+        voices = [
+            {
+                "voice_id": row["voice_id"],
+                "name": row["name"],
+                "category": row["category"],
+                "labels": json.loads(row["labels"]),
+                "description": row["description"],
+                "preview_url": row["preview_url"],
+                "high_quality_base_model_ids": json.loads(row["high_quality_base_model_ids"])
+            }
+            for row in rows
+        ]
+        return voices, needs_refresh
@@ -1,23 +1,29 @@
+import asyncio
+import hashlib
+import importlib.util
+import io
+import json
 import logging
 import os
 import time
-import requests
+import uuid
+import httpx
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, TypedDict
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Dict, List, Optional, TypedDict
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
-load_dotenv()
+from .audio import concat_mp3
+from .cache import SegmentCache, segment_cache_key
+from .formats import DEFAULT_OUTPUT_FORMAT, OutputFormat, get_output_format, write_wav
+from .metrics import REGISTRY
+from .scheduler import ElevenLabsAPIError, RequestScheduler, parse_retry_after
+from .text import context_windows, split_text
+from .tracing import Trace
 
-log_level = os.getenv("ELEVENLABS_LOG_LEVEL", "ERROR").upper()
-valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
-if log_level not in valid_levels:
-    log_level = "ERROR"
-    print(f"Invalid log level {log_level}. Using ERROR. Valid levels are: {', '.join(valid_levels)}")
+if TYPE_CHECKING:
+    from .checkpoints import JobCheckpoint
 
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
 
 class VoiceData(TypedDict):
     voice_id: str
@@ -27,34 +33,60 @@ class VoiceData(TypedDict):
     description: str
     preview_url: str
     high_quality_base_model_ids: List[str]
-from pydub import AudioSegment
-import io
-from datetime import datetime
-from tenacity import retry, stop_after_attempt, wait_exponential
+
+
+# Longest a single retry may wait, whatever Retry-After asks for
+MAX_RETRY_WAIT_SECONDS = 10.0
+_backoff = wait_exponential(multiplier=1, min=1, max=MAX_RETRY_WAIT_SECONDS)
+
+
+def _is_retryable(e: BaseException) -> bool:
+    """Retry rate limits, server errors and network failures; never bad requests."""
+    return isinstance(e, ElevenLabsAPIError) and e.retryable
+
+
+def _wait_for_retry(retry_state) -> float:
+    """Wait as long as the API asked via Retry-After (capped), else back off exponentially."""
+    e = retry_state.outcome.exception()
+    if isinstance(e, ElevenLabsAPIError) and e.retry_after is not None:
+        return min(e.retry_after, MAX_RETRY_WAIT_SECONDS)
+    return _backoff(retry_state)
+
+
+# Applied to every API call
+api_retry = retry(stop=stop_after_attempt(3), wait=_wait_for_retry, retry=retry_if_exception(_is_retryable), reraise=True)
 
 class ElevenLabsAPI:
     # Add model list as class constant
+    # max_chars is the model's per-request character limit
     MODELS = {
         "eleven_multilingual_v2": {"description": "Our most lifelike model with rich emotional expression", "languages": "32",
-                                   "supports_stitching": True, "supports_style": True, "wait_time": 0.1},
+                                   "supports_stitching": True, "supports_style": True, "max_chars": 10000},
         "eleven_flash_v2_5": {"description": "Ultra-fast model optimized for real-time use (~75ms†)", "languages": "32",
-                              "supports_stitching": False, "supports_style": False, "wait_time": 0.1},
+                              "supports_stitching": False, "supports_style": False, "max_chars": 40000},
         "eleven_flash_v2": {"description": "Ultra-fast model optimized for real-time use (~75ms†)", "languages": "English",
-                             "supports_stitching": False, "supports_style": False, "wait_time": 0.1}
+                             "supports_stitching": False, "supports_style": False, "max_chars": 30000}
     }
 
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def get_voices(self) -> List[VoiceData]:
+    @api_retry
+    async def get_voices(self) -> List[VoiceData]:
         """Fetch available voices from ElevenLabs API"""
         headers = {
             "Accept": "application/json",
             "xi-api-key": self.api_key
         }
         
-        response = requests.get(
-            f"{self.base_url}/voices",
-            headers=headers
-        )
+        try:
+            async with self.scheduler.slot():
+                with REGISTRY.timer("elevenlabs_api_request_seconds", endpoint="voices", model="",
+                                    status="network_error") as labels:
+                    response = await self._get_client().get(
+                        f"{self.base_url}/voices",
+                        headers=headers
+                    )
+                    labels["status"] = str(response.status_code)
+        except httpx.HTTPError as e:
+            raise ElevenLabsAPIError(f"Network error during API call: {str(e)}")
         
         if response.status_code == 200:
             voices_data = response.json()["voices"]
@@ -71,13 +103,14 @@ class ElevenLabsAPI:
                 for voice in voices_data
             ]
         else:
-            raise Exception(f"Failed to fetch voices: {response.text}")
+            raise self._api_error(f"Failed to fetch voices: {response.text}", response.status_code, response.headers)
 
     def __init__(self):
-        self.api_key = os.getenv("ELEVENLABS_API_KEY")
-        if not self.api_key:
+        api_key = os.getenv("ELEVENLABS_API_KEY")
+        if not api_key:
             logging.error("ELEVENLABS_API_KEY environment variable not set")
             raise ValueError("ELEVENLABS_API_KEY environment variable not set")
+        self.api_key = api_key
             
         self.voice_id = os.getenv("ELEVENLABS_VOICE_ID") or "iEw1wkYocsNy7I7pteSN"
         self.model_id = os.getenv("ELEVENLABS_MODEL_ID") or "eleven_multilingual_v2"
@@ -91,13 +124,85 @@ class ElevenLabsAPI:
         self.stability = float(os.getenv("ELEVENLABS_STABILITY", "0.5"))
         self.similarity_boost = float(os.getenv("ELEVENLABS_SIMILARITY_BOOST", "0.75"))
         self.style = float(os.getenv("ELEVENLABS_STYLE", "0.1"))
-        self.base_url = "https://api.elevenlabs.io/v1"
+        self.base_url = os.getenv("ELEVENLABS_BASE_URL") or "https://api.elevenlabs.io/v1"
+        # Format requested from the API unless a call asks for another one
+        self.output_format = get_output_format(os.getenv("ELEVENLABS_OUTPUT_FORMAT")).name
+        # Characters of neighbouring text sent as previous_text/next_text (0 disables)
+        self.context_chars = int(os.getenv("ELEVENLABS_CONTEXT_CHARS", "1000"))
+        # Target chunk size for long plain text; smaller chunks render in parallel on non-stitching models
+        self.chunk_chars = int(os.getenv("ELEVENLABS_CHUNK_CHARS", "2500"))
+        # Budget shared by every request made with this API key
+        self.max_concurrent_requests = int(os.getenv("ELEVENLABS_MAX_CONCURRENT_REQUESTS", "2"))
+        self.requests_per_second = float(os.getenv("ELEVENLABS_REQUESTS_PER_SECOND", "10"))
+        # Parts of one job rendered at once; more than the request budget would only queue in the scheduler
+        self.max_concurrency = int(os.getenv("ELEVENLABS_MAX_CONCURRENCY") or self.max_concurrent_requests)
+
+        # Content-addressed cache of rendered segments
+        self.cache_enabled = os.getenv("ELEVENLABS_CACHE_ENABLED", "true").lower() not in {"0", "false", "no"}
+        cache_dir = os.getenv("ELEVENLABS_CACHE_DIR") or os.path.join(os.getenv("ELEVENLABS_OUTPUT_DIR") or "output", "segment_cache")
+        cache_max_bytes = int(os.getenv("ELEVENLABS_CACHE_MAX_BYTES", str(500 * 1024 * 1024)))
+        self.cache = SegmentCache(Path(cache_dir), cache_max_bytes)
+
+        # Connection pool shared by every API call; created on first use so it
+        # binds to the running event loop
+        self.pool_size = int(os.getenv("ELEVENLABS_HTTP_POOL_SIZE", "10"))
+        self.keepalive_expiry = float(os.getenv("ELEVENLABS_HTTP_KEEPALIVE_SECONDS", "30"))
+        self.http2 = os.getenv("ELEVENLABS_HTTP2", "false").lower() in {"1", "true", "yes"}
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the pooled keep-alive HTTP client, creating it on first use."""
+        if self._client is None or self._client.is_closed:
+            http2 = self.http2
+            if http2 and importlib.util.find_spec("h2") is None:
+                logging.warning("ELEVENLABS_HTTP2 is set but the 'h2' package is not installed; using HTTP/1.1")
+                http2 = False
+            self._client = httpx.AsyncClient(
+                http2=http2,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size,
+                    keepalive_expiry=self.keepalive_expiry
+                ),
+                timeout=httpx.Timeout(120.0, connect=10.0)
+            )
+        return self._client
+
+    @property
+    def scheduler(self) -> RequestScheduler:
+        """Request scheduler for this API key in the running event loop."""
+        return RequestScheduler.for_api_key(self.api_key, self.max_concurrent_requests, self.requests_per_second)
+
+    def _api_error(self, message: str, status_code: int, headers: httpx.Headers) -> ElevenLabsAPIError:
+        """Build the error for a non-200 response, pausing the scheduler on rate limits."""
+        retry_after = parse_retry_after(headers.get("retry-after"))
+        if status_code == 429:
+            self.scheduler.defer(min(retry_after, MAX_RETRY_WAIT_SECONDS) if retry_after is not None else 1.0)
+        return ElevenLabsAPIError(message, status_code=status_code, retry_after=retry_after)
+
+    async def aclose(self) -> None:
+        """Close pooled connections. Safe to call more than once."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def generate_audio_segment(self, text: str, voice_id: str, output_file: Optional[str] = None,
+    @api_retry
+    async def generate_audio_segment(self, text: str, voice_id: str, output_file: Optional[str] = None,
                       previous_text: Optional[str] = None, next_text: Optional[str] = None,
-                      previous_request_ids: Optional[List[str]] = None, debug_info: Optional[List[str]] = None) -> tuple[bytes, str]:
-        """Generate audio using specified voice with context conditioning"""
+                      previous_request_ids: Optional[List[Optional[str]]] = None, trace: Optional[Trace] = None,
+                      use_cache: bool = True, stream: bool = False,
+                      output_format: Optional[str] = None) -> tuple[bytes, Optional[str]]:
+        """Generate audio using specified voice with context conditioning.
+
+        Segments are served from the segment cache when an identical request was
+        rendered before; pass use_cache=False to force a fresh render. With
+        stream=True the streaming endpoint is used and chunks are written to
+        output_file as they arrive. output_format is sent to the API as-is (see
+        formats.OUTPUT_FORMATS) and defaults to the client's output_format.
+        Latency (time to first byte when streaming, time to the complete
+        response otherwise) and total time are logged and recorded on trace.
+        """
+        output_format = get_output_format(output_format or self.output_format).name
         headers = {
             "Accept": "application/json",
             "xi-api-key": self.api_key,
@@ -122,140 +227,398 @@ class ElevenLabsAPI:
                 data["previous_text"] = previous_text
             if next_text is not None:
                 data["next_text"] = next_text
-            if previous_request_ids:
-                data["previous_request_ids"] = previous_request_ids[-3:]  # Maximum of 3 previous IDs
+            # Parts rendered without a request-id can't be referenced
+            request_ids = [request_id for request_id in previous_request_ids or [] if request_id]
+            if request_ids:
+                data["previous_request_ids"] = request_ids[-3:]  # Maximum of 3 previous IDs
         
+        cache_key = None
+        if use_cache and self.cache_enabled:
+            # The default format keeps the keys of segments cached before formats were selectable
+            cache_key = segment_cache_key(
+                voice_id, data if output_format == DEFAULT_OUTPUT_FORMAT else {**data, "output_format": output_format}
+            )
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            REGISTRY.inc("elevenlabs_segment_cache_requests_total", result="miss" if cached is None else "hit")
+            if cached is not None:
+                logging.info(f"Segment cache hit for voice_id: {voice_id}")
+                if trace is not None:
+                    trace.debug("Segment cache hit (voice %s)", voice_id)
+                audio_content, request_id = cached
+                if output_file:
+                    with open(output_file, 'wb') as f:
+                        f.write(audio_content)
+                return audio_content, request_id
+
         logging.info(f"Generating audio for text length: {len(text)} chars using voice_id: {voice_id}")
         logging.debug(f"Generation parameters: stability={self.stability}, similarity_boost={self.similarity_boost}, model={self.model_id}")
         
+        url = f"{self.base_url}/text-to-speech/{voice_id}"
+        status = "network_error"
         try:
-            response = requests.post(
-                f"{self.base_url}/text-to-speech/{voice_id}",
-                json=data,
-                headers=headers
-            )
-            
-            logging.debug(f"API response status: {response.status_code}")
-            
-            if response.status_code == 200:
-                logging.info("Audio generation successful")
-                if output_file:
-                    with open(output_file, 'wb') as f:
-                        f.write(response.content)
-                return response.content, response.headers["request-id"]
-            else:
-                debug_info.append(response.text)
-                error_message = f"Failed to generate audio: {response.text} \n\n{debug_info} \n\n{data}"
-                logging.error(f"API error response: {response.status_code}")
-                logging.error(f"API error details: {response.text}")
-                logging.error(f"Request data: {data}")
-                raise Exception(error_message)
-        except requests.exceptions.RequestException as e:
+            async with self.scheduler.slot():
+                started = time.perf_counter()
+                try:
+                    if stream:
+                        audio_content, request_id, latency = await self._stream_segment(
+                            f"{url}/stream", data, headers, output_file, trace, output_format
+                        )
+                    else:
+                        response = await self._get_client().post(
+                            url,
+                            params={"output_format": output_format},
+                            json=data,
+                            headers=headers
+                        )
+                        # post() returns once the whole body is read, so this is not a first-byte time
+                        latency = time.perf_counter() - started
+
+                        logging.debug(f"API response status: {response.status_code}")
+
+                        if response.status_code != 200:
+                            self._raise_api_error(response.status_code, response.text, response.headers, data, trace)
+
+                        audio_content = response.content
+                        request_id = response.headers.get("request-id")
+                        if output_file:
+                            with open(output_file, 'wb') as f:
+                                f.write(audio_content)
+                    status = "200"
+                except ElevenLabsAPIError as e:
+                    if e.status_code is not None:
+                        status = str(e.status_code)
+                    raise
+                finally:
+                    REGISTRY.observe("elevenlabs_api_request_seconds", time.perf_counter() - started,
+                                     endpoint="stream" if stream else "tts", model=self.model_id, status=status)
+        except httpx.HTTPError as e:
             error_message = f"Network error during API call: {str(e)}"
             logging.error(error_message)
-            raise Exception(error_message)
+            raise ElevenLabsAPIError(error_message)
+
+        total = time.perf_counter() - started
+        REGISTRY.observe("elevenlabs_segment_bytes", len(audio_content), model=self.model_id)
+        mode, latency_name = ("stream", "ttfb") if stream else ("buffered", "response_time")
+        logging.info(
+            f"Audio generation successful. Segment timing ({mode}): "
+            f"{latency_name}={latency * 1000:.0f}ms total={total * 1000:.0f}ms size={len(audio_content)} bytes"
+        )
+        if trace is not None:
+            trace.debug("Segment timing (%s): %s=%.0fms total=%.0fms size=%d bytes",
+                        mode, latency_name, latency * 1000, total * 1000, len(audio_content))
+
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.put, cache_key, audio_content, request_id)
+        return audio_content, request_id
+
+    async def _stream_segment(self, url: str, data: Dict, headers: Dict, output_file: Optional[str],
+                              trace: Optional[Trace], output_format: str) -> tuple[bytes, Optional[str], float]:
+        """POST to the streaming endpoint, writing chunks to output_file as they arrive.
+
+        Returns (audio_content, request_id, time_to_first_byte_seconds).
+        """
+        started = time.perf_counter()
+        ttfb = None
+        chunks = []
+        f = open(output_file, 'wb') if output_file else None
+        try:
+            async with self._get_client().stream("POST", url, params={"output_format": output_format},
+                                                 json=data, headers=headers) as response:
+                logging.debug(f"API response status: {response.status_code}")
+                if response.status_code != 200:
+                    body = (await response.aread()).decode("utf-8", errors="replace")
+                    self._raise_api_error(response.status_code, body, response.headers, data, trace)
+
+                async for chunk in response.aiter_bytes():
+                    if ttfb is None:
+                        ttfb = time.perf_counter() - started
+                    chunks.append(chunk)
+                    if f is not None:
+                        f.write(chunk)
+                        f.flush()
+                request_id = response.headers.get("request-id")
+        except BaseException:
+            # Don't leave a truncated file behind that looks playable
+            if f is not None:
+                f.close()
+                Path(f.name).unlink(missing_ok=True)
+            raise
+        if f is not None:
+            f.close()
+        if ttfb is None:
+            ttfb = time.perf_counter() - started
+        return b"".join(chunks), request_id, ttfb
+
+    def _raise_api_error(self, status_code: int, body: str, headers: httpx.Headers, data: Dict,
+                         trace: Optional[Trace]) -> None:
+        if trace is not None:
+            trace.error("API error %s: %s", status_code, body)
+        logging.error(f"API error response: {status_code}")
+        logging.error(f"API error details: {body}")
+        logging.debug(f"Request data: {data}")
+        raise self._api_error(f"Failed to generate audio: {body}", status_code, headers)
+
+    @property
+    def max_chars(self) -> int:
+        """Per-request character limit of the configured model."""
+        return self.MODELS[self.model_id]["max_chars"]
+
+    def chunk_text(self, text: str) -> List[str]:
+        """Split long text at sentence/paragraph boundaries into chunks the model accepts."""
+        return split_text(text, min(self.chunk_chars, self.max_chars) if self.chunk_chars > 0 else self.max_chars)
 
-    def generate_full_audio(self, script_parts: List[Dict], output_dir: Path) -> tuple[str, List[str], int]:
-        """Generate audio for multiple parts using request stitching. Returns tuple of (output_file_path, debug_info, completed_parts)"""
+    def split_oversized_parts(self, script_parts: List[Dict]) -> List[Dict]:
+        """Split script parts longer than the model's limit, keeping each part's voice and actor."""
+        parts = []
+        for part in script_parts:
+            text = str(part.get("text", ""))
+            if len(text) <= self.max_chars:
+                parts.append(part)
+                continue
+            parts.extend(dict(part, text=chunk) for chunk in split_text(text, self.max_chars))
+        return parts
+
+    def render_key(self, script_parts: List[Dict], output_format: Optional[str] = None) -> str:
+        """
+        Key identifying the audio a script renders to with the current settings.
+
+        Covers each part's text and effective voice, the model, the voice
+        settings, the stitching context size and the output format, i.e.
+        everything that shapes the output. Jobs with equal keys can share one rendered file.
+        """
+        stitching = self.MODELS[self.model_id]["supports_stitching"]
+        payload = {
+            "parts": [[str(part.get("text", "")), part.get("voice_id") or self.voice_id] for part in script_parts],
+            "model_id": self.model_id,
+            "stability": self.stability,
+            "similarity_boost": self.similarity_boost,
+            "style": self.style if self.MODELS[self.model_id]["supports_style"] else None,
+            "context_chars": self.context_chars if stitching else None,
+            "output_format": get_output_format(output_format or self.output_format).name,
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    async def generate_full_audio(self, script_parts: List[Dict], output_dir: Path,
+                                  use_cache: bool = True, parallel: bool = True,
+                                  max_concurrency: Optional[int] = None,
+                                  stream: bool = False,
+                                  checkpoint: Optional["JobCheckpoint"] = None,
+                                  trace: Optional[Trace] = None,
+                                  output_format: Optional[str] = None) -> tuple[str, Trace, int]:
+        """Generate audio for multiple parts. Returns tuple of (output_file_path, trace, completed_parts)
+
+        Models with request stitching render parts one after another so each part can
+        reference the request ids before it. Models without stitching fan all parts out
+        at once (bounded by max_concurrency) and reassemble them in script order;
+        pass parallel=False to force sequential rendering.
+
+        With stream=True segments use the streaming endpoint; a single-part script is
+        then written straight to the output file as audio arrives.
+
+        Every segment is requested in output_format, so the final file is produced
+        without decoding: MP3 frames are joined as they are, PCM and mu-law are
+        wrapped in a WAV header, and a single Opus segment is written unchanged.
+
+        With a checkpoint, parts it already holds are reused instead of re-rendered
+        (their stored request ids still feed stitching) and every newly rendered or
+        failed part is recorded on it as soon as it finishes.
+
+        Diagnostics are recorded on trace (a new info-level Trace if none is given).
+        """
         # Create output directory if it doesn't exist
         output_dir.mkdir(exist_ok=True)
         
         # Final output file path with unique file name
+        fmt = get_output_format(output_format or self.output_format)
         timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        output_file = output_dir / f"full_audio_{timestamp}.mp3"
+        output_file = output_dir / f"full_audio_{timestamp}_{uuid.uuid4().hex[:8]}{fmt.extension}"
         
-        debug_info = []
-        debug_info.append("ElevenLabsAPI - Starting generate_full_audio")
-        debug_info.append(f"Input script_parts: {script_parts}")
+        if trace is None:
+            trace = Trace()
+        trace.info("Generating %d parts with %s", len(script_parts), self.model_id)
+        cache_before = self.cache.stats()
         
-        # Initialize segments list and request IDs tracking
-        segments = []
+        # Initialize segments and request IDs tracking; segments are keyed by
+        # part index so parts from a checkpoint slot back into script order
+        segments: Dict[int, bytes] = {}
         previous_request_ids = []
         failed_parts = []
         completed_parts = 0
         
-        debug_info.append("Processing all_texts")
-        all_texts = []
-        for part in script_parts:
-            debug_info.append(f"Processing text from part: {part}")
-            text = str(part.get('text', ''))
-            debug_info.append(f"Extracted text: {text}")
-            all_texts.append(text)
-        debug_info.append(f"Final all_texts: {all_texts}")
+        all_texts = [str(part.get('text', '')) for part in script_parts]
+        contexts = context_windows(all_texts, self.context_chars)
         
-        for i, part in enumerate(script_parts):
-            debug_info.append(f"Processing part {i}: {part}")
+        model_info = self.MODELS[self.model_id]
+        # Request stitching chains each part to the request ids of the parts before
+        # it, so only models without stitching can render parts independently
+        parallel = parallel and not model_info["supports_stitching"]
+        concurrency = max(1, max_concurrency or self.max_concurrency)
+
+        async def render_part(i: int, part: Dict, previous_request_ids: List[Optional[str]],
+                              segment_file: Optional[Path] = None) -> tuple[bytes, Optional[str]]:
             part_voice_id = part.get('voice_id')
             if not part_voice_id:
                 part_voice_id = self.voice_id
             text = str(part.get('text', ''))
-            if not text:
-                continue
-                
-            debug_info.append(f"Using voice ID: {part_voice_id}")
-            
-            # Determine previous and next text for context
-            is_first = i == 0
-            is_last = i == len(script_parts) - 1
-            
-            previous_text = None if is_first else " ".join(all_texts[:i])
-            next_text = None if is_last else " ".join(all_texts[i + 1:])
-            
-            try:
-                logging.info(f"Processing part {i+1}/{len(script_parts)}")
-                logging.info(f"Text length: {len(text)} chars")
-                logging.debug(f"Context - Previous text: {'Yes' if previous_text else 'No'}, Next text: {'Yes' if next_text else 'No'}")
-                
-                # Generate audio with context conditioning
-                audio_content, request_id = self.generate_audio_segment(
-                    text=text,
-                    voice_id=part_voice_id,
-                    previous_text=previous_text,
-                    next_text=next_text,
-                    previous_request_ids=previous_request_ids,
-                    debug_info=debug_info
-                )
-                
-                debug_info.append(f"Successfully generated audio for part {i}")
+
+            trace.debug("Part %d: %d chars, voice %s", i, len(text), part_voice_id)
+
+            # Bounded context from the neighbouring parts
+            previous_text, next_text = contexts[i]
+
+            logging.info(f"Processing part {i+1}/{len(script_parts)}")
+            logging.info(f"Text length: {len(text)} chars")
+            logging.debug(f"Context - Previous text: {'Yes' if previous_text else 'No'}, Next text: {'Yes' if next_text else 'No'}")
+
+            # Generate audio with context conditioning
+            audio_content, request_id = await self.generate_audio_segment(
+                text=text,
+                voice_id=part_voice_id,
+                previous_text=previous_text,
+                next_text=next_text,
+                previous_request_ids=previous_request_ids,
+                trace=trace,
+                use_cache=use_cache,
+                stream=stream,
+                output_file=str(segment_file) if segment_file else None,
+                output_format=fmt.name
+            )
+
+            return audio_content, request_id
+
+        reused = await checkpoint.load() if checkpoint is not None else {}
+        if reused:
+            trace.info("Reusing %d checkpointed parts", len(reused))
+
+        async def part_succeeded(i: int, audio_content: bytes, request_id: Optional[str]) -> None:
+            nonlocal completed_parts
+            # Checkpoint first, so a part that can't be saved counts as failed and is retried on resume
+            if checkpoint is not None:
+                await checkpoint.save_part(i, audio_content, request_id)
+            segments[i] = audio_content
+            completed_parts += 1
+
+        async def part_failed(i: int, part: Dict, error: BaseException) -> None:
+            trace.error("Part %d failed: %s", i, error)
+            failed_parts.append(part)
+            if checkpoint is not None:
+                await checkpoint.fail_part(i, str(error))
+
+        pending = [(i, part) for i, part in enumerate(script_parts) if str(part.get('text', ''))]
+        # A lone streamed part needs no joining, so write it directly to its final path
+        direct_to_file = stream and fmt.streamable and len(pending) == 1 and not reused
+
+        if parallel and len(pending) > 1:
+            trace.info("Rendering %d parts in parallel (max %d concurrent)", len(pending), concurrency)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def render_bounded(i: int, part: Dict) -> None:
+                async with semaphore:
+                    try:
+                        audio_content, request_id = await render_part(i, part, [])
+                    except Exception as e:
+                        await part_failed(i, part, e)
+                        return
+                try:
+                    await part_succeeded(i, audio_content, request_id)
+                except Exception as e:
+                    await part_failed(i, part, e)
+
+            for i, (audio_content, _) in reused.items():
+                segments[i] = audio_content
                 completed_parts += 1
-                
-                # Add request ID to history
-                previous_request_ids.append(request_id)
-                
-                # Convert audio content to AudioSegment and add to segments
-                audio_segment = AudioSegment.from_mp3(io.BytesIO(audio_content))
-                segments.append(audio_segment)
-
-                # Wait for the specified wait_time
-                time.sleep(self.MODELS[self.model_id]["wait_time"])
-            except Exception as e:
-                debug_info.append(f"Error generating audio: {e}")
-                failed_parts.append(part)
-                continue
+            await asyncio.gather(*(render_bounded(i, part) for i, part in pending if i not in reused))
+        else:
+            for i, part in pending:
+                if i in reused:
+                    audio_content, request_id = reused[i]
+                    segments[i] = audio_content
+                    completed_parts += 1
+                    previous_request_ids.append(request_id)
+                    continue
+                try:
+                    audio_content, request_id = await render_part(
+                        i, part, previous_request_ids,
+                        segment_file=output_file if direct_to_file else None
+                    )
+                    # Add request ID to history
+                    previous_request_ids.append(request_id)
+                    await part_succeeded(i, audio_content, request_id)
+                except Exception as e:
+                    await part_failed(i, part, e)
+                    continue
         
         # Combine all segments
         if segments:
-            final_audio = segments[0]
-            for segment in segments[1:]:
-                final_audio = final_audio + segment
-            
-            # Export combined audio
-            final_audio.export(output_file, format="mp3")
+            if not direct_to_file:
+                # Join and export off the event loop; ffmpeg can take a while
+                ordered = [segments[i] for i in sorted(segments)]
+                await asyncio.to_thread(self._combine_segments, ordered, output_file, fmt)
 
             if failed_parts:
-                debug_info.append(f"Failed parts: {failed_parts}")
+                trace.warning("%d of %d parts failed", len(failed_parts), len(script_parts))
             else:
                 logging.debug("All parts generated successfully")
-                debug_info.append("All parts generated successfully")
+                trace.info("All %d parts generated successfully", len(script_parts))
             
-            debug_info.append(f"Model: {self.model_id}")
             logging.debug(f"Model: {self.model_id}")
+
+            cache_after = self.cache.stats()
+            trace.info("Segment cache: %d hits, %d misses",
+                       cache_after['hits'] - cache_before['hits'], cache_after['misses'] - cache_before['misses'])
+            scheduler_stats = self.scheduler.stats()
+            trace.debug("Request scheduler: %d in flight, %d queued (limit %d)",
+                        scheduler_stats['in_flight'], scheduler_stats['queue_depth'], scheduler_stats['max_concurrent'])
             
-            return str(output_file), debug_info, completed_parts
+            return str(output_file), trace, completed_parts
         else:
-            error_msg = "\n".join([
-                "No audio segments were generated. Debug info:",
-                *debug_info
-            ])
-            logging.error("No audio segments were generated. Debug info: %s", debug_info)
-            raise Exception(error_msg)
+            logging.error("No audio segments were generated. Trace: %s", trace.lines())
+            raise Exception("No audio segments were generated")
+
+    @staticmethod
+    def _combine_segments(segments: List[bytes], output_file: Path,
+                          fmt: Optional[OutputFormat] = None) -> None:
+        """Join segments in the format the API returned into a single file.
+
+        PCM and mu-law are wrapped in a WAV header and a single Opus segment is
+        copied as-is. MP3 segments are joined at the frame level without decoding;
+        if they can't be (unparseable data or mismatched sample rates), and for
+        several Opus segments, fall back to decoding with pydub and re-encoding
+        through ffmpeg.
+        """
+        fmt = fmt or get_output_format(DEFAULT_OUTPUT_FORMAT)
+        if fmt.codec in ("pcm", "ulaw"):
+            with REGISTRY.timer("elevenlabs_combine_seconds", method="wav"):
+                write_wav(segments, output_file, fmt.sample_rate, fmt.codec)
+            return
+        if fmt.codec == "opus":
+            if len(segments) == 1:
+                with REGISTRY.timer("elevenlabs_combine_seconds", method="copy"):
+                    Path(output_file).write_bytes(segments[0])
+                return
+            ElevenLabsAPI._reencode(segments, output_file, fmt)
+            return
+
+        try:
+            with REGISTRY.timer("elevenlabs_combine_seconds", method="frames"):
+                concat_mp3(segments, output_file)
+            return
+        except ValueError as e:
+            logging.warning(f"Frame-level MP3 join failed, re-encoding with pydub: {e}")
+
+        ElevenLabsAPI._reencode(segments, output_file, fmt)
+
+    @staticmethod
+    def _reencode(segments: List[bytes], output_file: Path, fmt: OutputFormat) -> None:
+        """Decode segments with pydub, join them and encode the result through ffmpeg."""
+        # pydub is only needed for this fallback; importing it probes PATH for ffmpeg
+        from pydub import AudioSegment
+
+        source, target = ("ogg", "opus") if fmt.codec == "opus" else ("mp3", "mp3")
+        with REGISTRY.timer("elevenlabs_combine_seconds", method="reencode"):
+            decoded = [AudioSegment.from_file(io.BytesIO(segment), format=source) for segment in segments]
+            final_audio = decoded[0]
+            for segment in decoded[1:]:
+                final_audio = final_audio + segment
+            final_audio.export(output_file, format=target, bitrate=f"{fmt.bitrate}k")
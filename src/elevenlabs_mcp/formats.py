@@ -0,0 +1,125 @@
+"""Output formats offered by the ElevenLabs API, and writing their segments to a file without re-encoding."""
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterable, Optional, Union
+
+from .audio import mp3_file_duration
+
+# The API's own default; requests for it leave segment cache keys unchanged
+DEFAULT_OUTPUT_FORMAT = "mp3_44100_128"
+
+MIME_TYPES = {".mp3": "audio/mpeg", ".wav": "audio/wav", ".opus": "audio/ogg"}
+_EXTENSIONS = {"mp3": ".mp3", "pcm": ".wav", "ulaw": ".wav", "opus": ".opus"}
+# WAVE format tags
+_WAVE_PCM = 1
+_WAVE_MULAW = 7
+
+
+@dataclass(frozen=True)
+class OutputFormat:
+    name: str  # the API's output_format value, e.g. "mp3_44100_128"
+    codec: str  # "mp3", "pcm" (16-bit little-endian mono), "ulaw" or "opus"
+    sample_rate: int
+    bitrate: Optional[int] = None  # kbps, for compressed codecs
+
+    @property
+    def extension(self) -> str:
+        """Suffix of the final file; raw PCM and mu-law are wrapped in WAV."""
+        return _EXTENSIONS[self.codec]
+
+    @property
+    def part_extension(self) -> str:
+        """Suffix for a single segment as the API returns it, before any WAV wrapping."""
+        return f".{self.codec}"
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.extension]
+
+    @property
+    def streamable(self) -> bool:
+        """Whether the API's bytes are already a playable file, so they can be written as they arrive."""
+        return self.codec in ("mp3", "opus")
+
+
+OUTPUT_FORMATS = {
+    fmt.name: fmt for fmt in (
+        OutputFormat("mp3_22050_32", "mp3", 22050, 32),
+        OutputFormat("mp3_44100_32", "mp3", 44100, 32),
+        OutputFormat("mp3_44100_64", "mp3", 44100, 64),
+        OutputFormat("mp3_44100_96", "mp3", 44100, 96),
+        OutputFormat("mp3_44100_128", "mp3", 44100, 128),
+        OutputFormat("mp3_44100_192", "mp3", 44100, 192),
+        OutputFormat("opus_48000_32", "opus", 48000, 32),
+        OutputFormat("opus_48000_64", "opus", 48000, 64),
+        OutputFormat("opus_48000_96", "opus", 48000, 96),
+        OutputFormat("opus_48000_128", "opus", 48000, 128),
+        OutputFormat("opus_48000_192", "opus", 48000, 192),
+        OutputFormat("pcm_8000", "pcm", 8000),
+        OutputFormat("pcm_16000", "pcm", 16000),
+        OutputFormat("pcm_22050", "pcm", 22050),
+        OutputFormat("pcm_24000", "pcm", 24000),
+        OutputFormat("pcm_44100", "pcm", 44100),
+        OutputFormat("pcm_48000", "pcm", 48000),
+        OutputFormat("ulaw_8000", "ulaw", 8000),
+    )
+}
+
+
+def get_output_format(name: Optional[str]) -> OutputFormat:
+    """Look up an output format by its API name; None means the default."""
+    fmt = OUTPUT_FORMATS.get(name or DEFAULT_OUTPUT_FORMAT)
+    if fmt is None:
+        raise ValueError(f"Unsupported output_format {name!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+    return fmt
+
+
+def mime_type(path: Union[str, Path]) -> str:
+    return MIME_TYPES.get(Path(path).suffix, "application/octet-stream")
+
+
+def wav_header(data_size: int, sample_rate: int, codec: str = "pcm") -> bytes:
+    """Canonical 44-byte WAV header for mono 16-bit PCM or 8-bit mu-law data."""
+    format_tag, bits = (_WAVE_MULAW, 8) if codec == "ulaw" else (_WAVE_PCM, 16)
+    block_align = bits // 8
+    return (
+        b"RIFF" + struct.pack("<I", 36 + data_size) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, format_tag, 1, sample_rate, sample_rate * block_align, block_align, bits)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def write_wav(segments: Iterable[bytes], output: Union[str, Path, BinaryIO], sample_rate: int,
+              codec: str = "pcm") -> int:
+    """Wrap raw PCM/mu-law segments in one WAV file; no decoding is needed. Returns bytes written."""
+    segments = list(segments)
+    size = sum(len(segment) for segment in segments)
+    if isinstance(output, (str, Path)):
+        with open(output, "wb") as f:
+            return write_wav(segments, f, sample_rate, codec)
+    output.write(wav_header(size, sample_rate, codec))
+    for segment in segments:
+        output.write(segment)
+    return 44 + size
+
+
+def wav_duration(path: Union[str, Path]) -> float:
+    """Duration of a WAV file written by write_wav, from its header."""
+    with open(path, "rb") as f:
+        header = f.read(44)
+    if len(header) < 44 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    byte_rate = struct.unpack_from("<I", header, 28)[0]
+    data_size = struct.unpack_from("<I", header, 40)[0]
+    return data_size / byte_rate
+
+
+def audio_file_duration(path: Union[str, Path]) -> Optional[float]:
+    """Duration of an output file in seconds, or None where it can't be read without decoding."""
+    suffix = Path(path).suffix
+    if suffix == ".mp3":
+        return mp3_file_duration(path)
+    if suffix == ".wav":
+        return wav_duration(path)
+    return None
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Iterator, List, Optional, Set
+
+from .database import Database
+from .models import AudioJob
+
+
+class JobQueue:
+    """
+    Background worker pool for audio jobs.
+
+    The `audio_jobs` table is the persistent queue: a job is enqueued by inserting
+    it with status 'pending', and a worker claims it by moving it to 'processing'
+    before running it through to 'completed' or 'failed'. Several server processes
+    may share one database, so the claim is atomic and only one of them runs a job.
+
+    A process refreshes `updated_at` on the jobs it is running every
+    stale_after_seconds / 4. On start, 'processing' jobs that have gone
+    stale_after_seconds without that heartbeat belong to a process that died;
+    they are reset to 'pending', and every pending job is queued, oldest first.
+    A job interrupted by stop() is put back to 'pending' straight away.
+    """
+
+    def __init__(self, db: Database, runner: Callable[[AudioJob], Awaitable[object]], workers: int = 2,
+                 stale_after_seconds: float = 300.0):
+        self.db = db
+        self.runner = runner
+        self.worker_count = max(1, workers)
+        self.stale_after_seconds = stale_after_seconds
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+        # Jobs this process is rendering, inline or in a worker
+        self._running: Set[str] = set()
+        self._active = 0
+
+    @property
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    @property
+    def active(self) -> int:
+        """Number of jobs currently being processed by the workers."""
+        return self._active
+
+    @property
+    def running(self) -> int:
+        """Number of jobs this process is rendering, inline calls included."""
+        return len(self._running)
+
+    @contextmanager
+    def owned(self, job_id: str) -> Iterator[None]:
+        """Keep job_id's heartbeat going while the caller renders it."""
+        self._running.add(job_id)
+        try:
+            yield
+        finally:
+            self._running.discard(job_id)
+
+    async def start(self) -> None:
+        """Recover unfinished jobs from the database and start the workers."""
+        if self._workers:
+            return
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after_seconds)
+        reset = await self.db.requeue_stale_jobs(stale_before)
+        if reset:
+            logging.info(f"Reset {reset} jobs abandoned while processing")
+        pending = await self.db.get_jobs_by_status(["pending"])
+        for job in pending:
+            self._queue.put_nowait(job.id)
+        if pending:
+            logging.info(f"Re-queued {len(pending)} unfinished jobs")
+
+        self._workers = [
+            asyncio.create_task(self._worker(n), name=f"audio-job-worker-{n}")
+            for n in range(self.worker_count)
+        ]
+        self._heartbeat = asyncio.create_task(self._beat(), name="audio-job-heartbeat")
+
+    async def submit(self, job: AudioJob) -> None:
+        """Persist a new pending job and hand it to the workers."""
+        job.status = "pending"
+        await self.db.insert_job(job)
+        self._queue.put_nowait(job.id)
+
+    async def enqueue(self, job_id: str) -> None:
+        """Hand an already stored pending job to the workers."""
+        self._queue.put_nowait(job_id)
+
+    async def stop(self) -> None:
+        """Cancel the workers. Interrupted jobs are picked up again on next start."""
+        tasks = self._workers + ([self._heartbeat] if self._heartbeat is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat = None
+
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(self.stale_after_seconds / 4)
+            try:
+                await self.db.touch_jobs(list(self._running))
+            except Exception as e:
+                logging.warning(f"Job heartbeat failed: {e}")
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job: Optional[AudioJob] = await self.db.get_job(job_id)
+                if job is None or not await self.db.claim_job(job_id):
+                    # Deleted, already handled, or taken by another process since it was queued
+                    continue
+                job.status = "processing"
+                self._active += 1
+                try:
+                    await self.runner(job)
+                except asyncio.CancelledError:
+                    # Stopped mid-job: queue it again for the next start
+                    job.status = "pending"
+                    job.error = None
+                    await asyncio.shield(self.db.update_job(job))
+                    raise
+                finally:
+                    self._active -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Worker {n} failed job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
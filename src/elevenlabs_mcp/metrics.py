@@ -0,0 +1,209 @@
+"""In-process metrics: counters, histograms and callback gauges with JSON and Prometheus output."""
+import functools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of named metrics keyed by label set.
+
+    Counters and histograms are created on first use; gauges are callbacks read
+    at collection time, so values such as queue depths are never stale. A gauge
+    whose callback raises is left out of that collection.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help: Dict[str, Tuple[str, str]] = {}  # name -> (type, help)
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+
+    def describe_counter(self, name: str, help: str) -> None:
+        self._help[name] = ("counter", help)
+
+    def describe_histogram(self, name: str, help: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self._help[name] = ("histogram", help)
+        self._buckets[name] = buckets
+
+    def gauge(self, name: str, help: str, callback: Callable[[], float]) -> None:
+        """Register (or replace) a gauge whose value is read from callback."""
+        with self._lock:
+            self._help[name] = ("gauge", help)
+            self._gauges[name] = callback
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(self._buckets.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[Dict[str, str]]:
+        """Observe the duration of the block. Labels can be added to the yielded dict before it exits."""
+        labels = dict(labels)
+        started = time.perf_counter()
+        try:
+            yield labels
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name: str, **labels: str):
+        """Decorator observing the duration of an async function."""
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return await func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self) -> None:
+        """Drop all recorded values (registered gauges are kept)."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """All metrics as {name: {"type", "help", "series": [...]}} for JSON output."""
+        with self._lock:
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            histograms = {
+                name: {key: (h.buckets, list(h.counts), h.sum, h.count) for key, h in series.items()}
+                for name, series in self._histograms.items()
+            }
+            gauges = dict(self._gauges)
+
+        result = {}
+        for name, series in counters.items():
+            result[name] = self._entry(name, "counter", [
+                {"labels": dict(key), "value": value} for key, value in sorted(series.items())
+            ])
+        for name, series in histograms.items():
+            entries = []
+            for key, (buckets, counts, total, count) in sorted(series.items()):
+                cumulative, running = {}, 0
+                for bound, bucket_count in zip((*buckets, float("inf")), counts):
+                    running += bucket_count
+                    cumulative["+Inf" if bound == float("inf") else str(bound)] = running
+                entries.append({"labels": dict(key), "count": count, "sum": total, "buckets": cumulative})
+            result[name] = self._entry(name, "histogram", entries)
+        for name, callback in gauges.items():
+            try:
+                value = float(callback())
+            except Exception as e:
+                logging.debug(f"Skipping gauge {name}: {e}")
+                continue
+            result[name] = self._entry(name, "gauge", [{"labels": {}, "value": value}])
+        return result
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name, metric in sorted(self.snapshot().items()):
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for series in metric["series"]:
+                if metric["type"] == "histogram":
+                    for bound, count in series["buckets"].items():
+                        lines.append(f"{name}_bucket{self._labels(series['labels'], le=bound)} {count}")
+                    lines.append(f"{name}_sum{self._labels(series['labels'])} {series['sum']}")
+                    lines.append(f"{name}_count{self._labels(series['labels'])} {series['count']}")
+                else:
+                    lines.append(f"{name}{self._labels(series['labels'])} {series['value']}")
+        return "\n".join(lines) + "\n"
+
+    def _entry(self, name: str, kind: str, series: List[Dict]) -> Dict:
+        return {"type": kind, "help": self._help.get(name, (kind, ""))[1], "series": series}
+
+    @staticmethod
+    def _key(labels: Dict[str, str]) -> LabelKey:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    @staticmethod
+    def _labels(labels: Dict[str, str], **extra: str) -> str:
+        labels = {**labels, **extra}
+        if not labels:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe_histogram("elevenlabs_api_request_seconds", "ElevenLabs API request latency by endpoint, model and status")
+REGISTRY.describe_histogram("elevenlabs_segment_bytes", "Size of rendered audio segments", SIZE_BUCKETS)
+REGISTRY.describe_histogram("elevenlabs_combine_seconds", "Time to join segments into the output file, by method")
+REGISTRY.describe_histogram("elevenlabs_db_operation_seconds", "SQLite operation latency by operation")
+REGISTRY.describe_histogram("elevenlabs_tool_call_seconds", "MCP tool call latency by tool")
+REGISTRY.describe_counter("elevenlabs_segment_cache_requests_total", "Segment cache lookups by result")
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve /metrics (Prometheus) and /metrics.json on a daemon thread. Call shutdown() to stop."""
+    # Imported here: the endpoint is opt-in and http.server is slow to import
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = REGISTRY.render_prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = json.dumps(REGISTRY.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer((host, port), MetricsHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    logging.info(f"Serving metrics on http://{host}:{httpd.server_address[1]}/metrics")
+    return httpd
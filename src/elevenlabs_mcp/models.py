@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -15,10 +15,12 @@ class AudioJob:
     script_parts: List[Dict]
     output_file: Optional[str] = None
     error: Optional[str] = None
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
     total_parts: int = 1
     completed_parts: int = 0
+    options: Dict = field(default_factory=dict)  # generation options, e.g. use_cache/parallel/stream
+    render_key: Optional[str] = None  # identifies the rendered content; equal keys produce the same audio
 
     def to_dict(self) -> Dict:
         return {
@@ -30,7 +32,9 @@ class AudioJob:
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
             "total_parts": self.total_parts,
-            "completed_parts": self.completed_parts
+            "completed_parts": self.completed_parts,
+            "options": self.options,
+            "render_key": self.render_key
         }
 
     @staticmethod
@@ -44,5 +48,7 @@ class AudioJob:
             created_at=datetime.fromisoformat(data["created_at"]) if isinstance(data["created_at"], str) else data["created_at"],
             updated_at=datetime.fromisoformat(data["updated_at"]) if isinstance(data["updated_at"], str) else data["updated_at"],
             total_parts=data.get("total_parts", 1),
-            completed_parts=data.get("completed_parts", 0)
+            completed_parts=data.get("completed_parts", 0),
+            options=data.get("options") or {},
+            render_key=data.get("render_key")
         )
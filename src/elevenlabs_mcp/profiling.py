@@ -0,0 +1,123 @@
+"""Opt-in cProfile and tracemalloc capture around a single tool call.
+
+The profilers are imported when a call is actually profiled, so the server
+doesn't pay for them at startup.
+"""
+import io
+import logging
+import re
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from .metrics import REGISTRY
+
+# Set by the tool handler once a call has a job, so the profile can be named after it
+current_job_id: ContextVar[Optional[str]] = ContextVar("current_job_id", default=None)
+
+# Histograms whose totals are diffed across the call to split wall time by phase
+PHASES = {
+    "api": "elevenlabs_api_request_seconds",
+    "combine": "elevenlabs_combine_seconds",
+    "database": "elevenlabs_db_operation_seconds",
+}
+
+
+def _phase_seconds() -> Dict[str, float]:
+    snapshot = REGISTRY.snapshot()
+    return {
+        phase: sum(series["sum"] for series in snapshot.get(name, {}).get("series", []))
+        for phase, name in PHASES.items()
+    }
+
+
+class ToolProfiler:
+    """
+    Profile one tool call: CPU via cProfile, allocations via tracemalloc.
+
+    cProfile only sees the event-loop thread, so work pushed to threads (ffmpeg
+    exports, cache reads) shows up as time spent awaiting. The report therefore
+    also splits wall time into API, combine and database phases from the
+    metrics registry; those totals include any calls running concurrently.
+    Only one call is profiled at a time; a call that starts while another is
+    being profiled runs unprofiled (active is False).
+    """
+
+    _busy = False
+
+    def __init__(self, output_dir: Path, tool: str, top: int = 40):
+        self.output_dir = output_dir
+        self.tool = tool
+        self.top = top
+        self.active = False
+        self._profile = None
+        self._started_tracing = False
+
+    def __enter__(self) -> "ToolProfiler":
+        if ToolProfiler._busy:
+            logging.warning(f"Another tool call is being profiled; not profiling {self.tool}")
+            return self
+        import cProfile
+        import tracemalloc
+
+        ToolProfiler._busy = self.active = True
+        self._profile = cProfile.Profile()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        self._phases_before = _phase_seconds()
+        self._started = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if not self.active:
+            return
+        import tracemalloc
+
+        assert self._profile is not None
+        self._profile.disable()
+        self.wall_seconds = time.perf_counter() - self._started
+        after = _phase_seconds()
+        self.phases = {phase: after[phase] - self._phases_before[phase] for phase in PHASES}
+        self._memory = tracemalloc.take_snapshot()
+        _, self.peak_bytes = tracemalloc.get_traced_memory()
+        if self._started_tracing:
+            tracemalloc.stop()
+        ToolProfiler._busy = False
+
+    def write(self, job_id: Optional[str] = None) -> Optional[Path]:
+        """Write <stamp>_<tool>_<job>.prof (pstats) and a .txt summary; returns the .prof path."""
+        if not self.active:
+            return None
+        import pstats
+        import tracemalloc
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        label = re.sub(r"[^A-Za-z0-9_.-]", "_", job_id or "nojob")
+        base = self.output_dir / f"{stamp}_{self.tool}_{label}"
+        assert self._profile is not None
+        self._profile.dump_stats(f"{base}.prof")
+
+        cpu = io.StringIO()
+        pstats.Stats(self._profile, stream=cpu).sort_stats("cumulative").print_stats(self.top)
+        memory = "\n".join(
+            str(stat) for stat in self._memory.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ]).statistics("lineno")[:self.top]
+        )
+        phases = "\n".join(f"  {phase}: {seconds:.3f}s" for phase, seconds in self.phases.items())
+        Path(f"{base}.txt").write_text(
+            f"tool: {self.tool}\njob_id: {job_id}\nwall: {self.wall_seconds:.3f}s\n"
+            f"peak traced memory: {self.peak_bytes} bytes\n"
+            f"time recorded by phase (includes concurrent calls):\n{phases}\n\n"
+            f"== CPU (cumulative) ==\n{cpu.getvalue()}\n"
+            f"== Allocations live at end of call (by line) ==\n{memory}\n"
+        )
+        logging.info(f"Wrote profile for {self.tool} to {base}.prof")
+        return Path(f"{base}.prof")
@@ -0,0 +1,137 @@
+import asyncio
+import hashlib
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Dict, Optional
+
+
+class ElevenLabsAPIError(Exception):
+    """An ElevenLabs API call failed. status_code is None for network errors."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RequestScheduler:
+    """
+    Admission control for calls against one ElevenLabs API key.
+
+    Enforces a concurrent-request limit and a requests-per-second budget (token
+    bucket), and pauses every caller when the API answers 429 until the
+    Retry-After deadline has passed. Schedulers are shared per API key within an
+    event loop, so every ElevenLabsAPI instance using the same key draws from the
+    same budget.
+    """
+
+    _registry: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, RequestScheduler]]" = weakref.WeakKeyDictionary()
+
+    def __init__(self, max_concurrent: int, requests_per_second: float = 0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests_per_second = requests_per_second
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        self._rate_lock = asyncio.Lock()
+        self._tokens = max(1.0, requests_per_second)
+        self._last_refill = time.monotonic()
+        self._resume_at = 0.0
+        self._waiting = 0
+        self._in_flight = 0
+
+    @classmethod
+    def for_api_key(cls, api_key: str, max_concurrent: int, requests_per_second: float = 0) -> "RequestScheduler":
+        """Return the scheduler shared by every caller using api_key in the running loop."""
+        loop = asyncio.get_running_loop()
+        schedulers = cls._registry.setdefault(loop, {})
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        if key not in schedulers:
+            schedulers[key] = cls(max_concurrent, requests_per_second)
+        return schedulers[key]
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a slot."""
+        return self._waiting
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "in_flight": self._in_flight,
+            "queue_depth": self._waiting,
+            "max_concurrent": self.max_concurrent,
+            "requests_per_second": self.requests_per_second,
+            "paused_for_seconds": max(0.0, self._resume_at - time.monotonic()),
+        }
+
+    def defer(self, seconds: float) -> None:
+        """Hold back every new request for the given number of seconds (e.g. after a 429)."""
+        resume_at = time.monotonic() + seconds
+        if resume_at > self._resume_at:
+            logging.warning(f"Rate limited by ElevenLabs; pausing requests for {seconds:.1f}s")
+            self._resume_at = resume_at
+
+    async def _wait_for_rate(self) -> None:
+        async with self._rate_lock:
+            while True:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    await asyncio.sleep(self._resume_at - now)
+                    continue
+                if self.requests_per_second <= 0:
+                    return
+                capacity = max(1.0, self.requests_per_second)
+                self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.requests_per_second)
+                self._last_refill = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.requests_per_second)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for both a concurrency slot and a rate token, then hold the slot."""
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+            try:
+                await self._wait_for_rate()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
@@ -3,42 +3,71 @@ import base64
 import os
 from pathlib import Path
 import uuid
+import anyio
 import mcp.types as types
-from mcp.server import Server, NotificationOptions
+from mcp.server import Server, NotificationOptions, request_ctx
 from mcp.server.models import InitializationOptions
+from mcp.server.session import ServerSession
+from mcp.shared.context import RequestContext
+from mcp.shared.exceptions import McpError
+from mcp.shared.session import RequestResponder
 import mcp.server.stdio
-from dotenv import load_dotenv
 import json
-from datetime import datetime
+from datetime import datetime, timezone
 import logging
-from urllib.parse import unquote
+from typing import Optional
+from urllib.parse import parse_qsl, unquote, urlsplit
 
 from .elevenlabs_api import ElevenLabsAPI
+from .encoding import b64encode_file
+from .formats import OUTPUT_FORMATS, audio_file_duration, get_output_format, mime_type
 from .database import Database
+from .checkpoints import JobCheckpoint
+from .jobs import JobQueue
+from .metrics import REGISTRY, start_http_server
 from .models import AudioJob
+from .profiling import current_job_id
+from .storage import StorageManager, file_digest
+from .tracing import LEVELS, Trace
+from .voices import VoiceCatalogue
 
-load_dotenv()
-
-log_level = os.getenv("ELEVENLABS_LOG_LEVEL", "ERROR").upper()
-valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
-if log_level not in valid_levels:
-    log_level = "ERROR"
-    print(f"Invalid log level {log_level}. Using ERROR. Valid levels are: {', '.join(valid_levels)}")
-
-logging.basicConfig(
-    level=getattr(logging, log_level),
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Jobs per page returned by get_voiceover_history and voiceover://history
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 200
 
 class ElevenLabsServer:
     def __init__(self):
         self.server = Server("elevenlabs-server")
-        self.api = ElevenLabsAPI()
-        self.output_dir = Path("output")
-        self.output_dir.mkdir(exist_ok=True)
-        # Set output directory for database
+        # Created on first write; nothing touches the filesystem until then
+        self.output_dir = Path(os.getenv("ELEVENLABS_OUTPUT_DIR") or "output")
+        # Set output directory for the database and segment cache
         os.environ["ELEVENLABS_OUTPUT_DIR"] = str(self.output_dir.absolute())
+        self.api = ElevenLabsAPI()
+        self.parts_dir = self.output_dir / "parts"
         self.db = Database()
+        self.jobs = JobQueue(
+            self.db,
+            self.run_job,
+            workers=int(os.getenv("ELEVENLABS_WORKERS", "2")),
+            stale_after_seconds=float(os.getenv("ELEVENLABS_JOB_STALE_SECONDS", "300"))
+        )
+        self.voices = VoiceCatalogue(
+            self.db,
+            self.api,
+            ttl_seconds=float(os.getenv("ELEVENLABS_VOICES_TTL_SECONDS", str(Database.CACHE_DURATION_SECONDS)))
+        )
+        self.storage = StorageManager(
+            self.db,
+            self.output_dir,
+            max_bytes=int(os.getenv("ELEVENLABS_STORAGE_MAX_BYTES", "0")),
+            max_age_seconds=float(os.getenv("ELEVENLABS_STORAGE_MAX_AGE_DAYS", "0")) * 24 * 60 * 60,
+            interval_seconds=float(os.getenv("ELEVENLABS_STORAGE_INTERVAL_SECONDS", "300"))
+        )
+        # Serializes moving outputs into place against releasing them
+        self._outputs_lock = asyncio.Lock()
+        self._metrics_http = None
+        # Profile every tool call; a call can also opt in with profile=true
+        self.profile_calls = os.getenv("ELEVENLABS_PROFILE", "false").lower() in {"1", "true", "yes"}
         
         # Set up handlers
         self.setup_tools()
@@ -48,19 +77,44 @@ class ElevenLabsServer:
     async def initialize(self):
         """Initialize server components."""
         await self.db.initialize()
-        
-        # Initialize voices cache
-        try:
-            voices, needs_refresh = await self.db.get_voices()
-            if needs_refresh:
-                logging.info("Fetching initial voices data")
-                fresh_voices = await asyncio.to_thread(self.api.get_voices)
-                await self.db.upsert_voices(fresh_voices)
-                logging.info(f"Cached {len(fresh_voices)} voices")
-        except Exception as e:
-            logging.error(f"Error initializing voices cache: {e}")
+        await self.jobs.start()
+        await self.storage.start()
+        self.register_metrics()
+        # Warm the voice catalogue without holding up the first client request
+        self.voices.prefetch()
 
-    def parse_script(self, script_json: str) -> tuple[list[dict], list[str]]:
+    def register_metrics(self) -> None:
+        """Publish live queue and cache state as gauges, and start the scrape endpoint if configured."""
+        # Captured here, inside the event loop, so gauges can be read from the scrape thread
+        scheduler = self.api.scheduler
+        cache = self.api.cache
+        REGISTRY.gauge("elevenlabs_jobs_in_flight", "Jobs being rendered, inline or in the background",
+                       lambda: self.jobs.running)
+        REGISTRY.gauge("elevenlabs_jobs_queued", "Background jobs waiting for a worker", lambda: self.jobs.depth)
+        REGISTRY.gauge("elevenlabs_api_requests_in_flight", "API requests holding a scheduler slot",
+                       lambda: scheduler.in_flight)
+        REGISTRY.gauge("elevenlabs_api_requests_queued", "API requests waiting for a scheduler slot",
+                       lambda: scheduler.queue_depth)
+        REGISTRY.gauge("elevenlabs_segment_cache_bytes", "Bytes held by the segment cache",
+                       lambda: cache.stats()["bytes"])
+        REGISTRY.gauge("elevenlabs_segment_cache_hit_ratio", "Segment cache hits / lookups since start",
+                       lambda: self._hit_ratio(cache.stats()))
+        REGISTRY.gauge("elevenlabs_output_bytes", "Bytes counted toward the storage quota (outputs, parts, profiles)",
+                       lambda: self.storage.stats()["bytes"])
+
+        port = os.getenv("ELEVENLABS_METRICS_PORT")
+        if port and self._metrics_http is None:
+            try:
+                self._metrics_http = start_http_server(int(port), os.getenv("ELEVENLABS_METRICS_HOST", "127.0.0.1"))
+            except (OSError, ValueError) as e:
+                logging.error(f"Could not start metrics endpoint on port {port}: {e}")
+
+    @staticmethod
+    def _hit_ratio(stats: dict) -> float:
+        lookups = stats["hits"] + stats["misses"]
+        return stats["hits"] / lookups if lookups else 0.0
+
+    def parse_script(self, script_json: str, trace: Optional[Trace] = None) -> tuple[list[dict], Trace]:
         """
         Parse the input into a list of script parts and collect debug information.
         Accepts:
@@ -74,14 +128,16 @@ class ElevenLabsServer:
         
         Args:
             script_json: Input text or JSON string
+            trace: Trace to record on; a new info-level one if omitted
             
         Returns:
             tuple containing:
                 - list of parsed script parts
-                - list of debug information strings
+                - the trace
         """
-        debug_info = []
-        debug_info.append(f"Raw input: {script_json}")
+        if trace is None:
+            trace = Trace()
+        trace.debug("Raw input: %d chars", len(script_json))
         
         script_array = []
         
@@ -103,21 +159,21 @@ class ElevenLabsServer:
         except json.JSONDecodeError as e:
             # If JSON parsing fails and input looks like JSON, raise error
             if script_json.startswith('{') or script_json.startswith('['):
-                debug_info.append(f"JSON parsing failed: {str(e)}")
+                trace.error("JSON parsing failed: %s", e)
                 raise Exception("Invalid JSON format")
             # Otherwise treat as plain text
-            debug_info.append("Input is plain text")
+            trace.debug("Input is plain text")
             script_array = [{"text": script_json}]
         
         script_parts = []
         for part in script_array:
             if not isinstance(part, dict):
-                debug_info.append(f"Skipping non-dict part: {part}")
+                trace.warning("Skipping non-dict part of type %s", type(part).__name__)
                 continue
                 
             text = part.get("text", "").strip()
             if not text:
-                debug_info.append("Missing or empty text field")
+                trace.error("Missing or empty text field")
                 raise Exception("Missing required field 'text'")
                 
             new_part = {
@@ -125,11 +181,229 @@ class ElevenLabsServer:
                 "voice_id": part.get("voice_id"),
                 "actor": part.get("actor")
             }
-            debug_info.append(f"Created part: {new_part}")
             script_parts.append(new_part)
         
-        debug_info.append(f"Final script_parts: {script_parts}")
-        return script_parts, debug_info
+        trace.info("Parsed %d script parts", len(script_parts))
+        return script_parts, trace
+
+    async def run_job(self, job: AudioJob, trace: Optional[Trace] = None) -> str:
+        """Render a stored job and record the outcome. Returns the output file path."""
+        checkpoint = JobCheckpoint(
+            self.db, job.id, self.parts_dir, job.options.get("output_format") or self.api.output_format
+        )
+        with self.jobs.owned(job.id):
+            try:
+                reused = await self._reuse_output(job, trace)
+                if reused is not None:
+                    return reused
+
+                job.status = "processing"
+                job.error = None
+                await self.db.update_job(job)
+
+                output_file, _, completed_parts = await self.api.generate_full_audio(
+                    job.script_parts,
+                    self.output_dir,
+                    checkpoint=checkpoint,
+                    trace=trace,
+                    **job.options
+                )
+
+                # A resumed job replaces the output of its previous run
+                previous_output = job.output_file
+                stored = await self._store_output(output_file)
+                job.status = "completed"
+                job.output_file = stored
+                job.completed_parts = completed_parts
+                if completed_parts < job.total_parts:
+                    job.error = f"{job.total_parts - completed_parts} parts failed; call resume_job to retry them"
+                if not await self.db.update_job(job):
+                    # Deleted while rendering; delete_job already released the previous output
+                    await self._release_output(stored)
+                    await checkpoint.clear()
+                    raise ValueError(f"Job {job.id} was deleted while it was being rendered")
+
+                if previous_output:
+                    await self._release_output(previous_output)
+                self.storage.record(stored)
+                if completed_parts >= job.total_parts:
+                    await checkpoint.clear()
+                return stored
+            except asyncio.CancelledError:
+                # Client cancelled or server shutting down; don't leave the job stuck in processing
+                job.status = "failed"
+                job.error = "Cancelled before it finished; call resume_job to continue"
+                await asyncio.shield(self.db.update_job(job))
+                raise
+            except Exception as e:
+                job.status = "failed"
+                job.error = str(e)
+                await self.db.update_job(job)
+                raise
+
+    async def _reuse_output(self, job: AudioJob, trace: Optional[Trace] = None) -> Optional[str]:
+        """Complete job with the output of an identical earlier job, if one is still stored. Returns its path."""
+        if not job.render_key or job.output_file or not job.options.get("use_cache", True):
+            return None
+        output_file = await self.db.find_output(job.render_key)
+        if output_file is None or not Path(output_file).is_file():
+            return None
+        async with self._outputs_lock:
+            if not await self.db.add_output_reference(output_file):
+                return None
+        job.status = "completed"
+        job.output_file = output_file
+        job.completed_parts = job.total_parts
+        job.error = None
+        if not await self.db.update_job(job):
+            await self._release_output(output_file)
+            raise ValueError(f"Job {job.id} was deleted while it was being rendered")
+        self.storage.touch(output_file)
+        if trace is not None:
+            trace.info("Reused the stored output of an identical earlier job")
+        return output_file
+
+    async def _store_output(self, output_file: str) -> str:
+        """Move a freshly rendered file to its content-addressed name and take a reference to it."""
+        path = Path(output_file)
+        content_hash = await asyncio.to_thread(file_digest, path)
+        stored = path.with_name(f"full_audio_{content_hash}{path.suffix}")
+        async with self._outputs_lock:
+            # An identical file may already be stored; replacing it with the same bytes is harmless
+            await asyncio.to_thread(os.replace, path, stored)
+            await self.db.acquire_output(content_hash, str(stored), stored.stat().st_size)
+        return str(stored)
+
+    async def _release_output(self, output_file: str) -> None:
+        """Drop a job's reference to its output, removing the file once nothing else uses it."""
+        async with self._outputs_lock:
+            remaining = await self.db.release_output(output_file)
+            # None: stored before outputs were shared, so the job owns it outright
+            if not remaining:
+                Path(output_file).unlink(missing_ok=True)
+
+    def _audio_path(self, name: str) -> Path:
+        """Resolve an audio:// resource name to a generated output directly inside the output directory."""
+        output_dir = self.output_dir.resolve()
+        path = (output_dir / name).resolve()
+        # Only final outputs: the history database and anything else kept alongside them is not served
+        if not self.storage.is_output(name) or Path(name).name != name or path.parent != output_dir \
+                or not path.is_file():
+            raise ValueError(f"Audio file not found: {name}")
+        return path
+
+    async def _audio_metadata(self, path: Path) -> dict:
+        """Resource URI plus size and duration of an output file, for reference delivery."""
+        try:
+            duration = await asyncio.to_thread(audio_file_duration, path)
+            if duration is not None:
+                duration = round(duration, 3)
+        except ValueError:
+            duration = None
+        return {
+            "uri": f"audio://{path.name}",
+            "name": path.name,
+            "mime_type": mime_type(path),
+            "size_bytes": path.stat().st_size,
+            "duration_seconds": duration,
+            "read_hint": "Read the uri with resources/read; add ?offset=N&length=M to fetch a byte range",
+        }
+
+    @staticmethod
+    def _read_range(path: Path, offset: int = 0, length: Optional[int] = None) -> bytes:
+        if offset < 0 or (length is not None and length < 0):
+            raise ValueError("offset and length must not be negative")
+        with open(path, "rb") as f:
+            f.seek(offset)
+            return f.read() if length is None else f.read(length)
+
+    async def _audio_response(self, output_file: str, trace: Trace, delivery: str = "inline") -> list[types.TextContent | types.EmbeddedResource]:
+        """Build the tool result for a finished generation: status text plus the audio inline or by reference."""
+        if delivery == "reference":
+            metadata = await self._audio_metadata(Path(output_file))
+            return [
+                types.TextContent(
+                    type="text",
+                    text="\n".join([
+                        "Audio generation successful. Debug info:",
+                        *trace
+                    ])
+                ),
+                types.TextContent(type="text", text=json.dumps(metadata, indent=2))
+            ]
+
+        # Encode the generated audio file as base64 without reading it into memory first
+        audio_base64 = await asyncio.to_thread(b64encode_file, output_file)
+
+        # Generate unique URI for the resource
+        filename = Path(output_file).name
+        resource_uri = f"audio://{filename}"
+
+        # Return both a status message and the audio file content
+        return [
+            types.TextContent(
+                type="text",
+                text="\n".join([
+                    "Audio generation successful. Debug info:",
+                    *trace
+                ])
+            ),
+            types.EmbeddedResource(
+                type="resource",
+                resource=types.BlobResourceContents(
+                    uri=resource_uri,
+                    name=filename,
+                    blob=audio_base64,
+                    mimeType=mime_type(filename)
+                )
+            )
+        ]
+
+    async def _job_history(self, params: dict) -> dict:
+        """
+        One page of job history for the history tool and resource.
+
+        params may come straight from tool arguments or from resource query
+        parameters, so numbers, booleans and status lists are also accepted as strings.
+        """
+        limit = max(1, min(int(params.get("limit") or HISTORY_PAGE_SIZE), HISTORY_MAX_PAGE_SIZE))
+        statuses = params.get("status")
+        if isinstance(statuses, str):
+            statuses = [status.strip() for status in statuses.split(",") if status.strip()]
+        include_script = params.get("include_script", False)
+        if isinstance(include_script, str):
+            include_script = include_script.lower() in ("1", "true", "yes")
+
+        def parse_date(name: str) -> Optional[datetime]:
+            value = params.get(name)
+            if not value:
+                return None
+            parsed = datetime.fromisoformat(value)
+            if parsed.tzinfo is not None:
+                # Jobs are stored as naive UTC
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+
+        jobs, next_cursor = await self.db.list_jobs(
+            limit=limit,
+            cursor=params.get("cursor"),
+            statuses=statuses,
+            created_after=parse_date("created_after"),
+            created_before=parse_date("created_before"),
+            include_script=include_script,
+        )
+        return {"jobs": jobs, "next_cursor": next_cursor}
+
+    def _job_submitted_response(self, job: AudioJob) -> list[types.TextContent | types.EmbeddedResource]:
+        return [types.TextContent(
+            type="text",
+            text=json.dumps({
+                "job_id": job.id,
+                "status": job.status,
+                "total_parts": job.total_parts,
+                "message": "Job queued. Poll get_voiceover_history with this job_id and fetch the audio with get_audio_file once it is completed."
+            }, indent=2)
+        )]
 
     def setup_resources(self):
         """Set up MCP resources."""
@@ -139,65 +413,82 @@ class ElevenLabsServer:
                 types.ResourceTemplate(
                     uriTemplate="voiceover://history/{job_id}",
                     name="Voiceover Job History",
-                    description="Access voiceover job history. Provide job_id for specific job or omit for all jobs.",
+                    description=(
+                        "Access voiceover job history. Provide job_id for a specific job, or omit it for a page of "
+                        "job summaries, newest first. The listing accepts the query parameters limit, cursor, "
+                        "status (comma-separated), created_after, created_before and include_script, and returns "
+                        "{\"jobs\": [...], \"next_cursor\": ...}."
+                    ),
                     mimeType="application/json"
                 ),
+                types.ResourceTemplate(
+                    uriTemplate="audio://{filename}",
+                    name="Generated Audio",
+                    description=(
+                        "Raw bytes of a generated audio file. Add ?offset=N&length=M to read only a byte range. "
+                        "Returned by tools called with delivery='reference'. MP3 by default; "
+                        "other output formats are .wav or .opus files."
+                    ),
+                    mimeType="audio/mpeg"
+                ),
                 types.ResourceTemplate(
                     uriTemplate="voiceover://voices",
                     name="Available Voices",
                     description="Access list of available ElevenLabs voices with metadata",
                     mimeType="application/json"
+                ),
+                types.ResourceTemplate(
+                    uriTemplate="voiceover://metrics",
+                    name="Server Metrics",
+                    description=(
+                        "API latency by model and status, segment sizes, join time, database latency, cache "
+                        "hit rates and in-flight jobs. Add ?format=prometheus for the Prometheus text format."
+                    ),
+                    mimeType="application/json"
                 )
             ]
 
         @self.server.read_resource()
-        async def handle_read_resource(uri: types.AnyUrl) -> str:
+        async def handle_read_resource(uri: types.AnyUrl) -> str | bytes:
             uri_str = str(uri)
+
+            if uri_str.startswith("audio://"):
+                split = urlsplit(uri_str)
+                path = self._audio_path(unquote(split.netloc + split.path))
+                self.storage.touch(path)
+                query = dict(parse_qsl(split.query))
+                length = int(query["length"]) if "length" in query else None
+                return await asyncio.to_thread(self._read_range, path, int(query.get("offset", 0)), length)
             
             if uri_str == "voiceover://voices":
                 try:
-                    # Get voices from cache
-                    voices, needs_refresh = await self.db.get_voices()
-                    
-                    # Refresh cache if needed
-                    if needs_refresh:
-                        try:
-                            fresh_voices = await asyncio.to_thread(self.api.get_voices)
-                            await self.db.upsert_voices(fresh_voices)
-                            voices = fresh_voices
-                        except Exception as e:
-                            logging.error(f"Error refreshing voices: {e}")
-                            # Continue with cached data if refresh fails
-                            if not voices:
-                                raise  # Re-raise if we have no data at all
-                    
-                    # Ensure default voice is marked
-                    for voice in voices:
-                        voice["is_default"] = voice["voice_id"] == self.api.voice_id
-                    
-                    return json.dumps(voices, indent=2)
+                    # Served from memory; a stale catalogue is refreshed in the background
+                    return await self.voices.get_json()
                 except Exception as e:
                     return json.dumps({"error": str(e)}, indent=2)
             
+            if uri_str.startswith("voiceover://metrics"):
+                if dict(parse_qsl(urlsplit(uri_str).query)).get("format") == "prometheus":
+                    return REGISTRY.render_prometheus()
+                return json.dumps(REGISTRY.snapshot(), indent=2)
+
             if not uri_str.startswith("voiceover://history"):
                 raise ValueError(f"Invalid resource URI: {uri_str}")
 
             try:
                 # Extract job_id if present
-                parts = uri_str.split("/")
-                logging.info(f"Parts: {parts}")
-                if len(parts) > 3 and unquote(parts[3]) != '{job_id}':
-                    job_id = parts[3]
+                split = urlsplit(uri_str)
+                job_id = unquote(split.path.strip("/")) or None
+                if job_id == "{job_id}":
+                    job_id = None
+                logging.info(f"History resource: job_id={job_id} query={split.query}")
+                if job_id:
                     job = await self.db.get_job(job_id)
                     if not job:
                         return json.dumps({"error": "Job not found"}, indent=2)
-                    jobs = [job]
-                else:
-                    jobs = await self.db.get_all_jobs()
+                    return json.dumps([job.to_dict()], indent=2)
 
-                # Convert jobs to JSON
-                jobs_data = [job.to_dict() for job in jobs]
-                return json.dumps(jobs_data, indent=2)
+                return json.dumps(await self._job_history(dict(parse_qsl(split.query))))
                 
             except Exception as e:
                 return json.dumps({"error": str(e)}, indent=2)
@@ -208,7 +499,7 @@ class ElevenLabsServer:
             return [
                 types.Tool(
                     name="generate_audio_simple",
-                    description="Generate audio from plain text using default voice settings",
+                    description="Generate audio from plain text using default voice settings. Long text is split at sentence and paragraph boundaries and rendered in chunks that are joined into one file",
                     inputSchema={
                         "type": "object",
                         "properties": {
@@ -219,6 +510,37 @@ class ElevenLabsServer:
                             "voice_id": {
                                 "type": "string",
                                 "description": "Optional voice ID to use for generation"
+                            },
+                            "use_cache": {
+                                "type": "boolean",
+                                "description": "Reuse previously rendered identical segments (default: true)"
+                            },
+                            "stream": {
+                                "type": "boolean",
+                                "description": "Use the streaming endpoint and write audio to disk as it arrives (default: true)"
+                            },
+                            "output_format": {
+                                "type": "string",
+                                "enum": list(OUTPUT_FORMATS),
+                                "description": "Audio format requested from the API; pcm_* and ulaw_8000 are saved as WAV (default: ELEVENLABS_OUTPUT_FORMAT or mp3_44100_128)"
+                            },
+                            "verbosity": {
+                                "type": "string",
+                                "enum": ["error", "warning", "info", "debug"],
+                                "description": "How much diagnostic detail to return with the result (default: info)"
+                            },
+                            "profile": {
+                                "type": "boolean",
+                                "description": "Write cProfile and tracemalloc reports for this call to output/profiles (default: false)"
+                            },
+                            "delivery": {
+                                "type": "string",
+                                "enum": ["inline", "reference"],
+                                "description": "'inline' embeds the audio as base64; 'reference' returns an audio:// resource URI with size and duration to read separately (default: inline)"
+                            },
+                            "background": {
+                                "type": "boolean",
+                                "description": "Queue the job and return its job_id immediately instead of waiting for the audio (default: false)"
                             }
                         },
                         "required": ["text"]
@@ -245,11 +567,74 @@ class ElevenLabsServer:
                             "script": {
                                 "type": "string",
                                 "description": "JSON string containing script array or plain text. For JSON format, provide an object with a 'script' array containing objects with 'text' (required), 'voice_id' (optional), and 'actor' (optional) fields."
+                            },
+                            "use_cache": {
+                                "type": "boolean",
+                                "description": "Reuse previously rendered identical segments (default: true)"
+                            },
+                            "parallel": {
+                                "type": "boolean",
+                                "description": "Render all parts concurrently when the model does not use request stitching (default: true)"
+                            },
+                            "output_format": {
+                                "type": "string",
+                                "enum": list(OUTPUT_FORMATS),
+                                "description": "Audio format requested from the API; pcm_* and ulaw_8000 are saved as WAV (default: ELEVENLABS_OUTPUT_FORMAT or mp3_44100_128)"
+                            },
+                            "verbosity": {
+                                "type": "string",
+                                "enum": ["error", "warning", "info", "debug"],
+                                "description": "How much diagnostic detail to return with the result (default: info)"
+                            },
+                            "profile": {
+                                "type": "boolean",
+                                "description": "Write cProfile and tracemalloc reports for this call to output/profiles (default: false)"
+                            },
+                            "delivery": {
+                                "type": "string",
+                                "enum": ["inline", "reference"],
+                                "description": "'inline' embeds the audio as base64; 'reference' returns an audio:// resource URI with size and duration to read separately (default: inline)"
+                            },
+                            "background": {
+                                "type": "boolean",
+                                "description": "Queue the job and return its job_id immediately instead of waiting for the audio (default: false)"
                             }
                         },
                         "required": ["script"]
                     }
                 ),
+                types.Tool(
+                    name="resume_job",
+                    description="Resume an interrupted or partially failed job, re-rendering only the parts that are missing or failed",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "job_id": {
+                                "type": "string",
+                                "description": "ID of the job to resume"
+                            },
+                            "verbosity": {
+                                "type": "string",
+                                "enum": ["error", "warning", "info", "debug"],
+                                "description": "How much diagnostic detail to return with the result (default: info)"
+                            },
+                            "profile": {
+                                "type": "boolean",
+                                "description": "Write cProfile and tracemalloc reports for this call to output/profiles (default: false)"
+                            },
+                            "delivery": {
+                                "type": "string",
+                                "enum": ["inline", "reference"],
+                                "description": "'inline' embeds the audio as base64; 'reference' returns an audio:// resource URI with size and duration to read separately (default: inline)"
+                            },
+                            "background": {
+                                "type": "boolean",
+                                "description": "Queue the job and return immediately instead of waiting for the audio (default: false)"
+                            }
+                        },
+                        "required": ["job_id"]
+                    }
+                ),
                 types.Tool(
                     name="delete_job",
                     description="Delete a voiceover job and its associated files",
@@ -266,13 +651,26 @@ class ElevenLabsServer:
                 ),
                 types.Tool(
                     name="get_audio_file",
-                    description="Get the audio file content for a specific job",
+                    description="Get the audio file content for a specific job, whole, as a byte range, or as a resource reference",
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "job_id": {
                                 "type": "string",
                                 "description": "ID of the job to get audio file for"
+                            },
+                            "delivery": {
+                                "type": "string",
+                                "enum": ["inline", "reference"],
+                                "description": "'inline' embeds the audio as base64; 'reference' returns an audio:// resource URI with size and duration to read separately (default: inline)"
+                            },
+                            "offset": {
+                                "type": "integer",
+                                "description": "Byte offset to start reading from (inline delivery only, default: 0)"
+                            },
+                            "length": {
+                                "type": "integer",
+                                "description": "Number of bytes to return (inline delivery only, default: to the end of the file)"
                             }
                         },
                         "required": ["job_id"]
@@ -289,13 +687,43 @@ class ElevenLabsServer:
                 ),
                 types.Tool(
                     name="get_voiceover_history",
-                    description="Get voiceover job history. Optionally specify a job ID for a specific job.",
+                    description=(
+                        "Get voiceover job history. Optionally specify a job ID for a specific job. Without one, "
+                        "returns a page of job summaries, newest first, as {\"jobs\": [...], \"next_cursor\": ...}; "
+                        "pass next_cursor back as cursor to get the next page."
+                    ),
                     inputSchema={
                         "type": "object",
                         "properties": {
                             "job_id": {
                                 "type": "string",
                                 "description": "Optional job ID to get details for a specific job"
+                            },
+                            "limit": {
+                                "type": "integer",
+                                "description": f"Jobs per page (default {HISTORY_PAGE_SIZE}, max {HISTORY_MAX_PAGE_SIZE})"
+                            },
+                            "cursor": {
+                                "type": "string",
+                                "description": "next_cursor from the previous page"
+                            },
+                            "status": {
+                                "type": "array",
+                                "items": {"type": "string", "enum": ["pending", "processing", "completed", "failed"]},
+                                "description": "Only return jobs in these statuses"
+                            },
+                            "created_after": {
+                                "type": "string",
+                                "description": "Only jobs created at or after this ISO 8601 time (UTC if no offset)"
+                            },
+                            "created_before": {
+                                "type": "string",
+                                "description": "Only jobs created before this ISO 8601 time (UTC if no offset)"
+                            },
+                            "include_script": {
+                                "type": "boolean",
+                                "description": "Include each job's script_parts and options (default: false)",
+                                "default": False
                             }
                         },
                         "required": []
@@ -305,176 +733,131 @@ class ElevenLabsServer:
 
         @self.server.call_tool()
         async def handle_call_tool(name: str, arguments: dict) -> list[types.TextContent | types.EmbeddedResource]:
+            if not arguments.get("profile", self.profile_calls):
+                with REGISTRY.timer("elevenlabs_tool_call_seconds", tool=name):
+                    return await call_tool(name, arguments)
+
+            from .profiling import ToolProfiler
+
+            profiler = ToolProfiler(self.output_dir / "profiles", name)
+            with REGISTRY.timer("elevenlabs_tool_call_seconds", tool=name), profiler:
+                result = await call_tool(name, arguments)
+            path = await asyncio.to_thread(profiler.write, arguments.get("job_id") or current_job_id.get())
+            if path is not None:
+                result.append(types.TextContent(type="text", text=f"Profile written to {path}"))
+            return result
+
+        async def call_tool(name: str, arguments: dict) -> list[types.TextContent | types.EmbeddedResource]:
+            verbosity = arguments.get("verbosity") or "info"
+            trace = Trace(verbosity if verbosity in LEVELS else "info")
             try:
-                debug_info = []
-                
                 if name == "generate_audio_simple":
-                    debug_info.append(f"Processing simple audio request")
-                    debug_info.append(f"Arguments: {arguments}")
+                    trace.debug("Processing simple audio request")
                     
                     text = arguments.get("text", "").strip()
                     voice_id = arguments.get("voice_id")
+                    output_format = get_output_format(arguments.get("output_format") or self.api.output_format).name
                     
                     if not text:
                         raise ValueError("Text cannot be empty")
                     
-                    script_parts = [{
-                        "text": text,
-                        "voice_id": voice_id
-                    }]
-                    
-                    debug_info.append(f"Created script parts: {script_parts}")
+                    # Long text is rendered as sentence-aligned chunks and joined
+                    script_parts = [
+                        {"text": chunk, "voice_id": voice_id}
+                        for chunk in self.api.chunk_text(text)
+                    ]
+                    if len(script_parts) > 1:
+                        trace.info("Split %d chars into %d chunks", len(text), len(script_parts))
                     
                     # Create job record
-                    job_id = str(uuid.uuid4())
                     job = AudioJob(
-                        id=job_id,
+                        id=str(uuid.uuid4()),
                         status="pending",
                         script_parts=script_parts,
-                        total_parts=1
+                        total_parts=len(script_parts),
+                        render_key=self.api.render_key(script_parts, output_format),
+                        options={
+                            "use_cache": arguments.get("use_cache", True),
+                            "stream": arguments.get("stream", True),
+                            "output_format": output_format
+                        }
                     )
-                    await self.db.insert_job(job)
-                    debug_info.append(f"Created job record: {job_id}")
-
-                    try:
-                        job.status = "processing"
-                        await self.db.update_job(job)
-
-                        # # Send progress notification
-                        # if hasattr(self.server, 'session'):
-                        #     await self.server.session.send_notification({
-                        #         "method": "notifications/progress",
-                        #         "params": {
-                        #             "progressToken": str(job.id),
-                        #             "progress": {
-                        #                 "kind": "begin",
-                        #                 "message": "Starting audio generation"
-                        #             }
-                        #         }
-                        #     })
-
-                        output_file, api_debug_info, completed_parts = self.api.generate_full_audio(
-                            script_parts,
-                            self.output_dir
-                        )
-                        debug_info.extend(api_debug_info)
+                    current_job_id.set(job.id)
+                    if arguments.get("background", False):
+                        await self.jobs.submit(job)
+                        return self._job_submitted_response(job)
 
-                        job.status = "completed"
-                        job.output_file = str(output_file)
-                        job.completed_parts = completed_parts
-                        await self.db.update_job(job)
+                    # Stored as processing so no other server process sharing the database queues it
+                    job.status = "processing"
+                    await self.db.insert_job(job)
+                    trace.info("Created job record: %s", job.id)
 
-                        # # Send completion notification
-                        # if hasattr(self.server, 'session'):
-                        #     await self.server.session.send_notification({
-                        #         "method": "notifications/progress",
-                        #         "params": {
-                        #             "progressToken": str(job.id),
-                        #             "progress": {
-                        #                 "kind": "end",
-                        #                 "message": "Audio generation completed"
-                        #             }
-                        #         }
-                        #     })
-                    except Exception as e:
-                        job.status = "failed"
-                        job.error = str(e)
-                        await self.db.update_job(job)
-                        raise
-                    
-                    # Read the generated audio file and encode it as base64
-                    with open(output_file, 'rb') as f:
-                        audio_bytes = f.read()
-                        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                        
-                    # Generate unique URI for the resource
-                    filename = Path(output_file).name
-                    resource_uri = f"audio://{filename}"
-                        
-                    # Return both a status message and the audio file content
-                    return [
-                        types.TextContent(
-                            type="text",
-                            text="\n".join([
-                                "Audio generation successful. Debug info:",
-                                *debug_info
-                            ])
-                        ),
-                        types.EmbeddedResource(
-                            type="resource",
-                            resource=types.BlobResourceContents(
-                                uri=resource_uri,
-                                name=filename,
-                                blob=audio_base64,
-                                mimeType="audio/mpeg"
-                            )
-                        )
-                    ]
+                    output_file = await self.run_job(job, trace)
+                    return await self._audio_response(output_file, trace, arguments.get("delivery", "inline"))
                     
                 elif name == "generate_audio_script":
                     script_json = arguments.get("script", "{}")
-                    script_parts, parse_debug_info = self.parse_script(script_json)
-                    debug_info.extend(parse_debug_info)
+                    output_format = get_output_format(arguments.get("output_format") or self.api.output_format).name
+                    script_parts, _ = self.parse_script(script_json, trace)
+                    script_parts = self.api.split_oversized_parts(script_parts)
 
                     # Create job record
-                    job_id = str(uuid.uuid4())
                     job = AudioJob(
-                        id=job_id,
+                        id=str(uuid.uuid4()),
                         status="pending",
                         script_parts=script_parts,
-                        total_parts=len(script_parts)
+                        total_parts=len(script_parts),
+                        render_key=self.api.render_key(script_parts, output_format),
+                        options={
+                            "use_cache": arguments.get("use_cache", True),
+                            "parallel": arguments.get("parallel", True),
+                            "output_format": output_format
+                        }
                     )
+                    current_job_id.set(job.id)
+                    if arguments.get("background", False):
+                        await self.jobs.submit(job)
+                        return self._job_submitted_response(job)
+
+                    # Stored as processing so no other server process sharing the database queues it
+                    job.status = "processing"
                     await self.db.insert_job(job)
-                    debug_info.append(f"Created job record: {job_id}")
+                    trace.info("Created job record: %s", job.id)
 
-                    try:
-                        job.status = "processing"
-                        await self.db.update_job(job)
+                    output_file = await self.run_job(job, trace)
+                    return await self._audio_response(output_file, trace, arguments.get("delivery", "inline"))
 
-                        output_file, api_debug_info, completed_parts = self.api.generate_full_audio(
-                            script_parts,
-                            self.output_dir
-                        )
-                        debug_info.extend(api_debug_info)
+                elif name == "resume_job":
+                    job_id = arguments.get("job_id")
+                    if not job_id:
+                        raise ValueError("job_id is required")
 
-                        job.status = "completed"
-                        job.output_file = str(output_file)
-                        job.completed_parts = completed_parts
-                        await self.db.update_job(job)
-                    except Exception as e:
-                        job.status = "failed"
-                        job.error = str(e)
-                        await self.db.update_job(job)
-                        raise
-                    
-                    # Read the generated audio file and encode it as base64
-                    with open(output_file, 'rb') as f:
-                        audio_bytes = f.read()
-                        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
-                        
-                    # Generate unique URI for the resource
-                    filename = Path(output_file).name
-                    resource_uri = f"audio://{filename}"
-                        
-                    # Return both a status message and the audio file content
-                    return [
-                        types.TextContent(
+                    job = await self.db.get_job(job_id)
+                    if not job:
+                        return [types.TextContent(
                             type="text",
-                            text="\n".join([
-                                "Audio generation successful. Debug info:",
-                                *debug_info
-                            ])
-                        ),
-                        types.EmbeddedResource(
-                            type="resource",
-                            resource=types.BlobResourceContents(
-                                uri=resource_uri,
-                                name=filename,
-                                blob=audio_base64,
-                                mimeType="audio/mpeg"
-                            )
-                        )
-                    ]
+                            text=f"Job {job_id} not found"
+                        )]
+                    if job.status in ("pending", "processing"):
+                        return [types.TextContent(
+                            type="text",
+                            text=f"Job {job_id} is already {job.status}"
+                        )]
+                    if job.status == "completed" and job.completed_parts >= job.total_parts:
+                        return [types.TextContent(
+                            type="text",
+                            text=f"Job {job_id} already completed all {job.total_parts} parts"
+                        )]
+
+                    trace.info("Resuming job %s (%d/%d parts completed)", job_id, job.completed_parts, job.total_parts)
+                    if arguments.get("background", False):
+                        job.status = "pending"
+                        await self.db.update_job(job)
+                        await self.jobs.enqueue(job.id)
+                        return self._job_submitted_response(job)
+
+                    output_file = await self.run_job(job, trace)
+                    return await self._audio_response(output_file, trace, arguments.get("delivery", "inline"))
 
                 elif name == "delete_job":
                     job_id = arguments.get("job_id")
@@ -489,19 +872,18 @@ class ElevenLabsServer:
                             text=f"Job {job_id} not found"
                         )]
 
-                    # Delete associated audio file if it exists
+                    # Release the audio file; it is deleted once no other job shares it
                     if job.output_file:
                         try:
-                            output_path = Path(job.output_file)
-                            if output_path.exists():
-                                output_path.unlink()
+                            await self._release_output(job.output_file)
                         except Exception as e:
                             return [types.TextContent(
                                 type="text",
                                 text=f"Error deleting audio file: {str(e)}"
                             )]
 
-                    # Delete job from database
+                    # Delete checkpointed parts and the job from database
+                    await JobCheckpoint(self.db, job_id, self.parts_dir).clear()
                     deleted = await self.db.delete_job(job_id)
                     return [types.TextContent(
                         type="text",
@@ -510,28 +892,10 @@ class ElevenLabsServer:
                 
                 elif name == "list_voices":
                     try:
-                        # Get voices from cache
-                        voices, needs_refresh = await self.db.get_voices()
-                        
-                        # Refresh cache if needed
-                        if needs_refresh:
-                            try:
-                                fresh_voices = await asyncio.to_thread(self.api.get_voices)
-                                await self.db.upsert_voices(fresh_voices)
-                                voices = fresh_voices
-                            except Exception as e:
-                                logging.error(f"Error refreshing voices: {e}")
-                                # Continue with cached data if refresh fails
-                                if not voices:
-                                    raise  # Re-raise if we have no data at all
-                        
-                        # Ensure default voice is marked
-                        for voice in voices:
-                            voice["is_default"] = voice["voice_id"] == self.api.voice_id
-                        
+                        # Served from memory; a stale catalogue is refreshed in the background
                         return [types.TextContent(
                             type="text",
-                            text=json.dumps(voices, indent=2)
+                            text=await self.voices.get_json()
                         )]
                     except Exception as e:
                         return [types.TextContent(
@@ -549,15 +913,14 @@ class ElevenLabsServer:
                                     type="text",
                                     text=json.dumps({"error": "Job not found"}, indent=2)
                                 )]
-                            jobs = [job]
-                        else:
-                            jobs = await self.db.get_all_jobs()
+                            return [types.TextContent(
+                                type="text",
+                                text=json.dumps([job.to_dict()], indent=2)
+                            )]
 
-                        # Convert jobs to JSON
-                        jobs_data = [job.to_dict() for job in jobs]
                         return [types.TextContent(
                             type="text",
-                            text=json.dumps(jobs_data, indent=2)
+                            text=json.dumps(await self._job_history(arguments))
                         )]
                         
                     except Exception as e:
@@ -579,6 +942,12 @@ class ElevenLabsServer:
                             text=f"Job {job_id} not found"
                         )]
 
+                    if job.status in ("pending", "processing"):
+                        return [types.TextContent(
+                            type="text",
+                            text=f"Job {job_id} is still {job.status} ({job.completed_parts}/{job.total_parts} parts completed)"
+                        )]
+
                     if not job.output_file:
                         return [types.TextContent(
                             type="text",
@@ -592,11 +961,42 @@ class ElevenLabsServer:
                             type="text",
                             text=f"Output file not found at {job.output_file}"
                         )]
+                    self.storage.touch(output_path)
 
-                    # Read the audio file and encode it as base64
-                    with open(output_path, 'rb') as f:
-                        audio_bytes = f.read()
-                        audio_base64 = base64.b64encode(audio_bytes).decode('utf-8')
+                    if arguments.get("delivery") == "reference":
+                        return [types.TextContent(
+                            type="text",
+                            text=json.dumps(await self._audio_metadata(output_path), indent=2)
+                        )]
+
+                    if "offset" in arguments or "length" in arguments:
+                        offset = int(arguments.get("offset", 0))
+                        chunk = await asyncio.to_thread(self._read_range, output_path, offset, arguments.get("length"))
+                        size = output_path.stat().st_size
+                        next_offset = offset + len(chunk)
+                        return [
+                            types.TextContent(
+                                type="text",
+                                text=json.dumps({
+                                    "offset": offset,
+                                    "length": len(chunk),
+                                    "size_bytes": size,
+                                    "next_offset": next_offset if next_offset < size else None
+                                })
+                            ),
+                            types.EmbeddedResource(
+                                type="resource",
+                                resource=types.BlobResourceContents(
+                                    uri=f"audio://{output_path.name}?offset={offset}&length={len(chunk)}",
+                                    name=output_path.name,
+                                    blob=base64.b64encode(chunk).decode('utf-8'),
+                                    mimeType=mime_type(output_path)
+                                )
+                            )
+                        ]
+
+                    # Encode the audio file as base64 without reading it into memory first
+                    audio_base64 = await asyncio.to_thread(b64encode_file, output_path)
 
                     # Return the audio file content
                     return [
@@ -606,7 +1006,7 @@ class ElevenLabsServer:
                                 uri=f"audio://{output_path.name}",
                                 name=output_path.name,
                                 blob=audio_base64,
-                                mimeType="audio/mpeg"
+                                mimeType=mime_type(output_path)
                             )
                         )
                     ]
@@ -620,7 +1020,7 @@ class ElevenLabsServer:
             except Exception as e:
                 error_msg = "\n".join([
                     "Error generating audio. Debug info:",
-                    *debug_info,
+                    *trace,
                     f"Error: {str(e)}"
                 ])
                 return [types.TextContent(
@@ -649,6 +1049,48 @@ class ElevenLabsServer:
                     }
                 })
 
+    async def serve(self, read_stream, write_stream, initialization_options: InitializationOptions) -> None:
+        """
+        Serve one MCP session, handling each request in its own task.
+
+        Server.run awaits every handler inside its receive loop, so one long
+        generation would hold back every other request. Here responses go out
+        as each handler finishes, in whatever order that is.
+        """
+        async with ServerSession(read_stream, write_stream, initialization_options) as session:
+            async with anyio.create_task_group() as tg:
+                async for message in session.incoming_messages:
+                    match message:
+                        case RequestResponder(request=types.ClientRequest(root=request)):
+                            tg.start_soon(self._dispatch, session, message, request)
+                        case types.ClientNotification(root=notification):
+                            handler = self.server.notification_handlers.get(type(notification))
+                            if handler is None:
+                                continue
+                            try:
+                                await handler(notification)
+                            except Exception as e:
+                                logging.error(f"Uncaught exception in notification handler: {e}")
+                # The client has gone; nobody is left to answer
+                tg.cancel_scope.cancel()
+
+    async def _dispatch(self, session: ServerSession, responder: RequestResponder, request) -> None:
+        """Run the handler for one request and send its response, as Server.run does."""
+        handler = self.server.request_handlers.get(type(request))
+        if handler is None:
+            await responder.respond(types.ErrorData(code=types.METHOD_NOT_FOUND, message="Method not found"))
+            return
+        token = request_ctx.set(RequestContext(responder.request_id, responder.request_meta, session))
+        try:
+            response = await handler(request)
+        except McpError as e:
+            response = e.error
+        except Exception as e:
+            response = types.ErrorData(code=0, message=str(e), data=None)
+        finally:
+            request_ctx.reset(token)
+        await responder.respond(response)
+
     async def run(self):
         """Run the server"""
         try:
@@ -656,22 +1098,53 @@ class ElevenLabsServer:
         except Exception as e:
             print(f"Error initializing server: {e}")
             raise
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="elevenlabs-server",
-                    server_version="0.1.0",
-                    capabilities=self.server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
+        try:
+            async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self.serve(
+                    read_stream,
+                    write_stream,
+                    InitializationOptions(
+                        server_name="elevenlabs-server",
+                        server_version="0.1.0",
+                        capabilities=self.server.get_capabilities(
+                            notification_options=NotificationOptions(),
+                            experimental_capabilities={},
+                        )
                     )
                 )
-            )
+        finally:
+            await self.shutdown()
+
+    async def shutdown(self):
+        """Stop background workers and release pooled connections."""
+        await self.jobs.stop()
+        await self.storage.stop()
+        if self._metrics_http is not None:
+            await asyncio.to_thread(self._metrics_http.shutdown)
+            self._metrics_http.server_close()
+            self._metrics_http = None
+        await self.voices.close()
+        await self.api.aclose()
+        await self.db.close()
+
+def configure_logging() -> None:
+    log_level = os.getenv("ELEVENLABS_LOG_LEVEL", "ERROR").upper()
+    valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
+    if log_level not in valid_levels:
+        print(f"Invalid log level {log_level}. Using ERROR. Valid levels are: {', '.join(valid_levels)}")
+        log_level = "ERROR"
+
+    logging.basicConfig(
+        level=getattr(logging, log_level),
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
 
 def main():
     """Entry point for the server"""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    configure_logging()
     server = ElevenLabsServer()
     asyncio.run(server.run())
 
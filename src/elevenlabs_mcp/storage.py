@@ -0,0 +1,290 @@
+"""Lifecycle management for the generated audio in the output directory."""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from .database import Database
+from .metrics import REGISTRY
+
+REGISTRY.describe_counter("elevenlabs_storage_evictions_total", "Output files removed by the storage manager, by reason")
+
+# Jobs whose output must not be touched while they run
+ACTIVE_STATUSES = ("pending", "processing")
+# Subdirectories of the output directory that count toward the quota
+PARTS_DIR = "parts"
+PROFILES_DIR = "profiles"
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents, read in chunks."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+class StorageManager:
+    """
+    Keeps the output directory within a byte quota and age limit.
+
+    A background task walks the directory incrementally (batch_size entries at
+    a time, each batch in a worker thread), so no request ever waits on a
+    directory scan. After each full pass it reconciles the files with
+    audio_jobs and applies the policy:
+
+    - outputs no job refers to are deleted once older than orphan_grace_seconds;
+    - jobs whose output file has disappeared are detached from it;
+    - checkpointed parts (parts/<job_id>) of jobs that no longer exist are
+      deleted once older than orphan_grace_seconds;
+    - outputs, profiles and checkpointed parts not accessed for
+      max_age_seconds are deleted;
+    - while the total exceeds max_bytes, the least recently accessed of them are deleted.
+
+    Parts and profiles count toward max_bytes alongside the final outputs;
+    nothing belonging to a pending or processing job is removed. The segment
+    cache is not counted: it has its own limit (ELEVENLABS_CACHE_MAX_BYTES).
+
+    Last access is the file's mtime, which touch() bumps whenever an output is
+    served, so the LRU order survives restarts. A job whose output is removed
+    keeps its history; its output_file is cleared and the reason recorded as
+    its error. A job whose parts are removed re-renders them if resumed. A
+    max_bytes or max_age_seconds of 0 disables that limit.
+    """
+
+    OUTPUT_PATTERN = re.compile(r"^full_audio_.+\.(mp3|wav|opus)$")
+
+    def __init__(self, db: Database, output_dir: Path, max_bytes: int = 0, max_age_seconds: float = 0,
+                 interval_seconds: float = 300, batch_size: int = 500, orphan_grace_seconds: float = 3600):
+        self.db = db
+        self.output_dir = Path(output_dir)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.interval_seconds = interval_seconds
+        self.batch_size = max(1, batch_size)
+        self.orphan_grace_seconds = orphan_grace_seconds
+        # Path relative to output_dir -> (size_bytes, last_access as a Unix time); complete after the first pass
+        self._files: Dict[str, Tuple[int, float]] = {}
+        self._total_bytes = 0
+        self._passes = 0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def is_output(self, name: str) -> bool:
+        return bool(self.OUTPUT_PATTERN.match(name))
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "files": len(self._files),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "passes": self._passes,
+        }
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="storage-manager")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def record(self, path: Union[str, Path]) -> None:
+        """Account for a newly written output; wakes the manager if it pushed the total over quota."""
+        path = Path(path)
+        if path.parent.resolve() != self.output_dir.resolve() or not self.is_output(path.name):
+            return
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        self._set(path.name, size, time.time())
+        if self.max_bytes and self._total_bytes > self.max_bytes:
+            self._wake.set()
+
+    def touch(self, path: Union[str, Path]) -> None:
+        """Mark an output as just accessed."""
+        path = Path(path)
+        try:
+            os.utime(path)
+        except OSError:
+            return
+        if path.name in self._files:
+            self._set(path.name, self._files[path.name][0], time.time())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_pass()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Storage pass failed: {e}")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def run_pass(self) -> Dict[str, int]:
+        """Scan the output directory, reconcile it with the jobs table and enforce the limits."""
+        started = time.time()
+        files = await self._scan()
+        # Keep whatever record()/touch() saw during the scan
+        for name, (size, accessed) in list(self._files.items()):
+            if accessed >= started:
+                files[name] = (size, accessed)
+        self._files = files
+        self._total_bytes = sum(size for size, _ in files.values())
+
+        referenced = await self.db.get_output_files()
+        by_path = {os.path.realpath(output_file): output_file for output_file in referenced}
+        # Shared outputs, including any whose jobs are gone, so evicting them also drops their refcount
+        shared = {os.path.realpath(output_file): output_file for output_file in await self.db.get_shared_outputs()}
+        active = {
+            os.path.realpath(output_file)
+            for output_file, (_, status) in referenced.items() if status in ACTIVE_STATUSES
+        }
+        output_dir = os.path.realpath(self.output_dir)
+        now = time.time()
+        result = {"missing": 0, "orphan": 0, "expired": 0, "quota": 0}
+
+        # Jobs pointing at files that no longer exist
+        missing = await asyncio.to_thread(lambda: [
+            output_file for output_file, (_, status) in referenced.items()
+            if status not in ACTIVE_STATUSES and not os.path.exists(output_file)
+        ])
+        result["missing"] = await self.db.detach_output_files(missing, "Output file is missing")
+
+        parts_jobs = await self.db.get_job_statuses([
+            name.split("/", 1)[1] for name in files if name.startswith(f"{PARTS_DIR}/")
+        ])
+
+        def is_active(name: str) -> bool:
+            if name.startswith(f"{PARTS_DIR}/"):
+                return parts_jobs.get(name.split("/", 1)[1]) in ACTIVE_STATUSES
+            return os.path.join(output_dir, name) in active
+
+        evictions: Dict[str, str] = {}  # name -> reason
+        for name, (size, accessed) in files.items():
+            if is_active(name):
+                continue
+            if name.startswith(f"{PARTS_DIR}/"):
+                orphan = name.split("/", 1)[1] not in parts_jobs
+            elif name.startswith(f"{PROFILES_DIR}/"):
+                orphan = False
+            else:
+                orphan = os.path.join(output_dir, name) not in by_path
+            if orphan:
+                if now - accessed > self.orphan_grace_seconds:
+                    evictions[name] = "orphan"
+            elif self.max_age_seconds and now - accessed > self.max_age_seconds:
+                evictions[name] = "expired"
+
+        if self.max_bytes:
+            total = self._total_bytes - sum(files[name][0] for name in evictions)
+            for name, (size, _) in sorted(files.items(), key=lambda item: item[1][1]):
+                if total <= self.max_bytes:
+                    break
+                if name in evictions or is_active(name):
+                    continue
+                evictions[name] = "quota"
+                total -= size
+
+        if evictions:
+            await asyncio.to_thread(self._unlink, list(evictions))
+            detached: Dict[str, List[str]] = {}
+            for name, reason in evictions.items():
+                result[reason] += 1
+                REGISTRY.inc("elevenlabs_storage_evictions_total", reason=reason)
+                self._forget(name)
+                path = os.path.join(output_dir, name)
+                if path in by_path or path in shared:
+                    detached.setdefault(reason, []).append(by_path.get(path) or shared[path])
+                elif name.startswith(f"{PARTS_DIR}/") and name.split("/", 1)[1] in parts_jobs:
+                    # The job re-renders these parts if it is ever resumed
+                    await self.db.delete_job_parts(name.split("/", 1)[1])
+            for reason, output_files in detached.items():
+                await self.db.detach_output_files(output_files, f"Output removed by the storage policy ({reason})")
+
+        self._passes += 1
+        if any(result.values()):
+            logging.info(f"Storage pass: {result}; {self._total_bytes} bytes in {len(self._files)} outputs")
+        return result
+
+    async def _scan(self) -> Dict[str, Tuple[int, float]]:
+        try:
+            entries = await asyncio.to_thread(os.scandir, self.output_dir)
+        except FileNotFoundError:
+            return {}
+        files: Dict[str, Tuple[int, float]] = {}
+        try:
+            while True:
+                batch = await asyncio.to_thread(self._scan_batch, entries)
+                files.update(batch)
+                if len(batch) < self.batch_size:
+                    break
+        finally:
+            entries.close()
+        files.update(await asyncio.to_thread(self._scan_subdirectories))
+        return files
+
+    def _scan_batch(self, entries: Iterator[os.DirEntry]) -> Dict[str, Tuple[int, float]]:
+        batch = {}
+        for entry in entries:
+            if self.is_output(entry.name) and entry.is_file():
+                stat = entry.stat()
+                batch[entry.name] = (stat.st_size, stat.st_mtime)
+                if len(batch) == self.batch_size:
+                    break
+        return batch
+
+    def _scan_subdirectories(self) -> Dict[str, Tuple[int, float]]:
+        """Profiles as one entry per file, checkpointed parts as one entry per job directory."""
+        found = {}
+        for entry in self._list(self.output_dir / PROFILES_DIR):
+            if entry.is_file():
+                stat = entry.stat()
+                found[f"{PROFILES_DIR}/{entry.name}"] = (stat.st_size, stat.st_mtime)
+        for entry in self._list(self.output_dir / PARTS_DIR):
+            if entry.is_dir():
+                stats = [part.stat() for part in self._list(Path(entry.path)) if part.is_file()]
+                # Last written part; the directory's own mtime moves whenever a part is added
+                accessed = max((stat.st_mtime for stat in stats), default=entry.stat().st_mtime)
+                found[f"{PARTS_DIR}/{entry.name}"] = (sum(stat.st_size for stat in stats), accessed)
+        return found
+
+    @staticmethod
+    def _list(directory: Path) -> List[os.DirEntry]:
+        try:
+            with os.scandir(directory) as entries:
+                return list(entries)
+        except FileNotFoundError:
+            return []
+
+    def _unlink(self, names: List[str]) -> None:
+        for name in names:
+            path = self.output_dir / name
+            try:
+                if name.startswith(f"{PARTS_DIR}/"):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    path.unlink(missing_ok=True)
+            except OSError as e:
+                logging.warning(f"Could not remove {name}: {e}")
+
+    def _set(self, name: str, size: int, accessed: float) -> None:
+        self._forget(name)
+        self._files[name] = (size, accessed)
+        self._total_bytes += size
+
+    def _forget(self, name: str) -> None:
+        previous = self._files.pop(name, None)
+        if previous is not None:
+            self._total_bytes -= previous[0]
@@ -0,0 +1,126 @@
+"""Sentence-aware text helpers: request-stitching context windows and splitting long text into chunks."""
+import re
+from typing import List, Optional, Tuple
+
+# End of a sentence: terminal punctuation, optionally closing quotes/brackets, then whitespace
+_SENTENCE_END = re.compile(r"[.!?…][\"'”’)\]]*\s+")
+
+
+def _tail(text: str, budget: int) -> str:
+    """The end of text within budget characters, starting at a sentence (or word) boundary."""
+    if len(text) <= budget:
+        return text
+    window = text[-budget:]
+    match = _SENTENCE_END.search(window)
+    if match and match.end() < len(window):
+        return window[match.end():]
+    space = window.find(" ")
+    return window[space + 1:] if 0 <= space < len(window) - 1 else window
+
+
+def _head(text: str, budget: int) -> str:
+    """The start of text within budget characters, ending at a sentence (or word) boundary."""
+    if len(text) <= budget:
+        return text
+    window = text[:budget + 1]
+    ends = [match.start() + len(match.group().rstrip()) for match in _SENTENCE_END.finditer(window)]
+    if ends:
+        return window[:ends[-1]]
+    space = window.rfind(" ")
+    return window[:space] if space > 0 else window[:budget]
+
+
+def context_windows(texts: List[str], budget: int) -> List[Tuple[Optional[str], Optional[str]]]:
+    """
+    (previous_text, next_text) for every part of a script.
+
+    Each side holds at most budget characters of the neighbouring parts, cut at
+    the nearest sentence boundary (falling back to a word boundary). Windows are
+    built by rolling a bounded prefix forwards and a bounded suffix backwards,
+    so the work per part is independent of the script length. The first part
+    has no previous_text and the last no next_text; a budget of 0 disables
+    context altogether.
+    """
+    count = len(texts)
+    if budget <= 0:
+        return [(None, None)] * count
+
+    # One character over budget is all the boundary search needs to see
+    keep = budget + 1
+    previous: List[Optional[str]] = [None] * count
+    rolling = ""
+    for i in range(1, count):
+        if texts[i - 1]:
+            rolling = f"{rolling} {texts[i - 1]}" if rolling else texts[i - 1]
+            rolling = rolling[-keep:]
+        previous[i] = _tail(rolling, budget).strip() or None
+
+    following: List[Optional[str]] = [None] * count
+    rolling = ""
+    for i in range(count - 2, -1, -1):
+        if texts[i + 1]:
+            rolling = f"{texts[i + 1]} {rolling}" if rolling else texts[i + 1]
+            rolling = rolling[:keep]
+        following[i] = _head(rolling, budget).strip() or None
+
+    return list(zip(previous, following))
+
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def _split_long(text: str, max_chars: int) -> List[str]:
+    """Split a single over-long sentence at word boundaries (or hard, for a giant word)."""
+    pieces = []
+    while len(text) > max_chars:
+        cut = text.rfind(" ", 0, max_chars + 1)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        pieces.append(text)
+    return pieces
+
+
+def split_text(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars for separate TTS requests.
+
+    Chunks end at paragraph or sentence boundaries: sentences are packed greedily
+    into a chunk, and a new chunk always starts at a paragraph break once the
+    current one is half full, so chunks follow the text's own structure. Only a
+    sentence longer than max_chars is split mid-sentence, at a word boundary.
+    """
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    current = ""
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if current and len(current) >= max_chars // 2:
+            chunks.append(current)
+            current = ""
+        separator = "\n\n"
+        start = 0
+        sentences = []
+        for match in _SENTENCE_END.finditer(paragraph):
+            sentences.append(paragraph[start:match.end()].strip())
+            start = match.end()
+        if start < len(paragraph):
+            sentences.append(paragraph[start:].strip())
+
+        for sentence in sentences:
+            for piece in _split_long(sentence, max_chars):
+                if current and len(current) + len(separator) + len(piece) > max_chars:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current}{separator}{piece}" if current else piece
+                separator = " "
+    if current:
+        chunks.append(current)
+    return chunks
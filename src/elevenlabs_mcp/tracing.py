@@ -0,0 +1,91 @@
+"""Bounded diagnostics collected while handling a tool call and returned with its result."""
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Tuple
+
+LEVELS = {"debug": 10, "info": 20, "warning": 30, "error": 40}
+
+
+class Trace:
+    """
+    Leveled trace of one request, replacing the old free-form debug_info lists.
+
+    Entries below the trace's level are dropped on the spot, and messages use
+    %-style arguments that are only formatted when the trace is rendered, so a
+    filtered-out debug entry never stringifies its arguments. At most
+    max_entries are kept (the most recent ones), every rendered line is cut to
+    max_line_chars, and rendering stops at max_chars in total.
+
+    Iterating yields the rendered lines, so a trace can be joined or unpacked
+    wherever a list of strings was used before.
+    """
+
+    def __init__(self, level: str = "info", max_entries: int = 50, max_line_chars: int = 300,
+                 max_chars: int = 4000):
+        if level not in LEVELS:
+            raise ValueError(f"Invalid verbosity {level!r}; expected one of {', '.join(LEVELS)}")
+        self.level = level
+        self.max_line_chars = max_line_chars
+        self.max_chars = max_chars
+        self._threshold = LEVELS[level]
+        self._started = time.perf_counter()
+        self._entries: Deque[Tuple[float, str, str, tuple]] = deque(maxlen=max_entries)
+        self.dropped = 0
+
+    def log(self, level: str, message: str, *args: Any) -> None:
+        if LEVELS[level] < self._threshold:
+            return
+        if len(self._entries) == self._entries.maxlen:
+            self.dropped += 1
+        self._entries.append((time.perf_counter() - self._started, level, message, args))
+
+    def debug(self, message: str, *args: Any) -> None:
+        self.log("debug", message, *args)
+
+    def info(self, message: str, *args: Any) -> None:
+        self.log("info", message, *args)
+
+    def warning(self, message: str, *args: Any) -> None:
+        self.log("warning", message, *args)
+
+    def error(self, message: str, *args: Any) -> None:
+        self.log("error", message, *args)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """The kept entries as dicts with elapsed_ms, level and the formatted message."""
+        return [
+            {"elapsed_ms": round(elapsed * 1000, 1), "level": level, "message": self._format(message, args)}
+            for elapsed, level, message, args in self._entries
+        ]
+
+    def lines(self) -> List[str]:
+        """Render the kept entries, truncated to the size limits."""
+        lines = []
+        total = 0
+        if self.dropped:
+            lines.append(f"... {self.dropped} earlier entries dropped")
+        for i, entry in enumerate(self.entries()):
+            line = f"[{entry['elapsed_ms']:.0f}ms] {entry['level'].upper()}: {entry['message']}"
+            if len(line) > self.max_line_chars:
+                line = line[:self.max_line_chars - 3] + "..."
+            if total + len(line) > self.max_chars:
+                lines.append(f"... {len(self._entries) - i} more entries truncated")
+                break
+            lines.append(line)
+            total += len(line) + 1
+        return lines
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.lines())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _format(self, message: str, args: tuple) -> str:
+        if not args:
+            return message
+        try:
+            return message % args
+        except (TypeError, ValueError):
+            return f"{message} {args!r}"
+
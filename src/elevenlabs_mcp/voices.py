@@ -0,0 +1,115 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from .database import Database
+from .elevenlabs_api import ElevenLabsAPI
+
+
+class VoiceCatalogue:
+    """
+    In-memory copy of the voice catalogue, backed by the voices table.
+
+    Reads are served from memory. Once the catalogue is older than ttl_seconds
+    the stale copy keeps being served while a single background refresh runs
+    (stale-while-revalidate); only a cold start with nothing stored waits for
+    ElevenLabs. Concurrent refreshes share one upstream call.
+    """
+
+    def __init__(self, db: Database, api: ElevenLabsAPI, ttl_seconds: float = Database.CACHE_DURATION_SECONDS):
+        self.db = db
+        self.api = api
+        self.ttl_seconds = ttl_seconds
+        self._voices: Optional[List[dict]] = None
+        self._json: Optional[str] = None
+        self._fetched_at = 0.0  # time.monotonic() of the data's sync with ElevenLabs
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._prefetch_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self._voices is None or time.monotonic() - self._fetched_at > self.ttl_seconds
+
+    async def get(self) -> List[dict]:
+        """Return the voices, marked with is_default. Raises only if none are available at all."""
+        if not self._loaded:
+            await self._load()
+        if self._voices is None:
+            return await self.refresh()
+        if self.is_stale:
+            self._refresh_in_background()
+        return self._voices
+
+    async def get_json(self) -> str:
+        """The voices serialized as JSON; re-rendered only when the catalogue changes."""
+        voices = await self.get()
+        if self._json is None:
+            self._json = json.dumps(voices, indent=2)
+        return self._json
+
+    async def refresh(self) -> List[dict]:
+        """Fetch the catalogue from ElevenLabs, joining a refresh already in flight."""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+        # Shielded so a cancelled waiter doesn't cancel the fetch for everyone else
+        return await asyncio.shield(self._refresh_task)
+
+    def prefetch(self) -> None:
+        """Load (and if needed fetch) the catalogue in the background, e.g. at startup."""
+        if self._prefetch_task is None:
+            self._prefetch_task = asyncio.create_task(self.get())
+            self._prefetch_task.add_done_callback(self._log_background_failure)
+
+    def _refresh_in_background(self) -> None:
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._fetch())
+        self._refresh_task.add_done_callback(self._log_background_failure)
+
+    @staticmethod
+    def _log_background_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Error refreshing voices: {task.exception()}")
+
+    async def close(self) -> None:
+        """Cancel a prefetch or refresh still in flight."""
+        for task in (self._prefetch_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+    async def _load(self) -> None:
+        """Seed the catalogue from the database once per process."""
+        async with self._load_lock:
+            if self._loaded:
+                return
+            voices, _ = await self.db.get_voices()
+            synced_at = await self.db.get_voices_synced_at()
+            if voices:
+                if synced_at is None:
+                    # Stored before sync times were recorded: usable, but refreshed on first read
+                    self._set(voices, float("-inf"))
+                else:
+                    age = max(0.0, (datetime.utcnow() - synced_at).total_seconds())
+                    self._set(voices, time.monotonic() - age)
+            self._loaded = True
+
+    async def _fetch(self) -> List[dict]:
+        voices = [dict(voice) for voice in await self.api.get_voices()]
+        changes = await self.db.upsert_voices(voices)
+        logging.info(f"Refreshed {len(voices)} voices ({changes})")
+        self._set(voices, time.monotonic())
+        return voices
+
+    def _set(self, voices: List[dict], fetched_at: float) -> None:
+        for voice in voices:
+            voice["is_default"] = voice["voice_id"] == self.api.voice_id
+        # Replace rather than mutate so readers holding the old list are unaffected
+        self._voices = voices
+        self._json = None
+        self._fetched_at = fetched_at
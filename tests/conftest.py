@@ -0,0 +1,84 @@
+from pathlib import Path
+
+import mcp.types as types
+import pytest
+import pytest_asyncio
+
+from elevenlabs_mcp.database import Database
+from elevenlabs_mcp.server import ElevenLabsServer
+
+
+class FakeRenderer:
+    """Stands in for ElevenLabsAPI.generate_full_audio: writes `audio` to a new output file and records each script."""
+
+    def __init__(self, audio: bytes = b"audio"):
+        self.audio = audio
+        self.scripts = []
+
+    async def __call__(self, script_parts, output_dir, **kwargs):
+        self.scripts.append(script_parts)
+        output_file = Path(output_dir) / f"full_audio_render_{len(self.scripts)}.mp3"
+        output_file.write_bytes(self.audio)
+        return str(output_file), None, len(script_parts)
+
+
+@pytest_asyncio.fixture
+async def db(tmp_path):
+    """An initialized history database in tmp_path, closed after the test even if it fails."""
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+    yield db
+    await db.close()
+
+
+@pytest_asyncio.fixture
+async def server(tmp_path, monkeypatch):
+    """An initialized server whose database, job queue, storage manager and caches all live in tmp_path/output."""
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setenv("ELEVENLABS_OUTPUT_DIR", str(tmp_path / "output"))
+    monkeypatch.delenv("ELEVENLABS_CACHE_DIR", raising=False)
+    server = ElevenLabsServer()
+
+    async def no_voices():
+        return []
+
+    # Keep the startup voice prefetch off the network
+    server.api.get_voices = no_voices
+    await server.initialize()
+    yield server
+    await server.shutdown()
+
+
+@pytest.fixture
+def renderer(server):
+    renderer = FakeRenderer()
+    server.api.generate_full_audio = renderer
+    return renderer
+
+
+@pytest.fixture
+def call_tool(server):
+    handler = server.server.request_handlers[types.CallToolRequest]
+
+    async def call_tool(name, arguments):
+        result = await handler(types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name=name, arguments=arguments)
+        ))
+        return result.root.content
+
+    return call_tool
+
+
+@pytest.fixture
+def read_resource(server):
+    handler = server.server.request_handlers[types.ReadResourceRequest]
+
+    async def read_resource(uri):
+        result = await handler(types.ReadResourceRequest(
+            method="resources/read",
+            params=types.ReadResourceRequestParams(uri=uri)
+        ))
+        return result.root.contents[0]
+
+    return read_resource
@@ -0,0 +1,77 @@
+import io
+import pytest
+from elevenlabs_mcp.audio import concat_mp3, find_audio_frames, mp3_duration, mp3_file_duration, parse_frame_header
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo: 417 byte frames
+FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0x44])
+FRAME_LENGTH = 417
+
+
+def make_frame(fill: int) -> bytes:
+    return FRAME_HEADER + bytes([fill]) * (FRAME_LENGTH - 4)
+
+
+def make_mp3(fill: int, frames: int = 3, id3: bool = False, xing: bool = False) -> bytes:
+    data = b""
+    if id3:
+        data += b"ID3\x04\x00\x00\x00\x00\x00\x0a" + b"\x00" * 10
+    if xing:
+        info = bytearray(make_frame(0))
+        info[36:40] = b"Xing"
+        data += bytes(info)
+    return data + b"".join(make_frame(fill) for _ in range(frames))
+
+
+def test_parse_frame_header():
+    header = parse_frame_header(FRAME_HEADER)
+
+    assert header.sample_rate == 44100
+    assert header.bitrate == 128
+    assert header.frame_length == FRAME_LENGTH
+    assert parse_frame_header(b"\x00\x00\x00\x00") is None
+
+
+def test_find_audio_frames_skips_tags_and_info_frame():
+    data = make_mp3(1, id3=True, xing=True) + b"TAG" + b"\x00" * 125
+
+    start, end, _ = find_audio_frames(data)
+
+    assert data[start:end] == make_mp3(1)
+
+
+def test_concat_mp3_joins_frames_in_order():
+    output = io.BytesIO()
+
+    written = concat_mp3([make_mp3(1, id3=True), make_mp3(2, xing=True), make_mp3(3)], output)
+
+    assert output.getvalue() == make_mp3(1) + make_mp3(2) + make_mp3(3)
+    assert written == len(output.getvalue())
+
+
+def test_concat_mp3_rejects_mismatched_sample_rates():
+    # Same frame at 48 kHz
+    other_rate = bytes([0xFF, 0xFB, 0x94, 0x44]) + b"\x00" * 380
+
+    with pytest.raises(ValueError):
+        concat_mp3([make_mp3(1), other_rate], io.BytesIO())
+
+
+def test_concat_mp3_rejects_non_mp3():
+    with pytest.raises(ValueError):
+        concat_mp3([b"not audio at all"], io.BytesIO())
+
+
+def test_mp3_duration_counts_frames_and_reads_xing_header(tmp_path):
+    frame_seconds = 1152 / 44100
+    data = make_mp3(1, frames=10, id3=True, xing=True)
+    assert mp3_duration(data) == pytest.approx(10 * frame_seconds)
+
+    with_count = bytearray(make_mp3(1, frames=10, xing=True))
+    with_count[36:48] = b"Xing" + (1).to_bytes(4, "big") + (100).to_bytes(4, "big")
+    assert mp3_duration(bytes(with_count)) == pytest.approx(100 * frame_seconds)
+
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(data)
+    assert mp3_file_duration(path) == pytest.approx(10 * frame_seconds)
+    with pytest.raises(ValueError):
+        mp3_duration(b"not audio" * 10)
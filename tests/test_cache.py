@@ -0,0 +1,78 @@
+import httpx
+import pytest
+from elevenlabs_mcp.cache import SegmentCache, segment_cache_key
+from elevenlabs_mcp.elevenlabs_api import ElevenLabsAPI
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+
+    def __init__(self, content: bytes, request_id: str):
+        self.content = content
+        self.headers = {"request-id": request_id}
+
+
+def test_cache_key_ignores_previous_request_ids():
+    data = {"text": "Hello", "model_id": "eleven_multilingual_v2", "previous_text": "Intro"}
+    with_ids = dict(data, previous_request_ids=["a", "b"])
+
+    assert segment_cache_key("voice1", data) == segment_cache_key("voice1", with_ids)
+    assert segment_cache_key("voice1", data) != segment_cache_key("voice2", data)
+    assert segment_cache_key("voice1", data) != segment_cache_key("voice1", dict(data, previous_text="Other"))
+
+
+def test_cache_round_trip_and_counters(tmp_path):
+    cache = SegmentCache(tmp_path, max_bytes=1024)
+
+    assert cache.get("missing") is None
+    cache.put("key", b"audio", "req-1")
+
+    assert cache.get("key") == (b"audio", "req-1")
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SegmentCache(tmp_path, max_bytes=250)
+    cache.put("a", b"x" * 100, "req-a")
+    cache.put("b", b"x" * 100, "req-b")
+    cache.get("a")
+    cache.put("c", b"x" * 100, "req-c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_cache_index_survives_restart(tmp_path):
+    SegmentCache(tmp_path, max_bytes=1024).put("key", b"audio", "req-1")
+
+    assert SegmentCache(tmp_path, max_bytes=1024).get("key") == (b"audio", "req-1")
+
+
+@pytest.mark.asyncio
+async def test_generate_audio_segment_uses_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setenv("ELEVENLABS_CACHE_DIR", str(tmp_path))
+    calls = []
+    formats = []
+
+    async def fake_post(client, url, json, headers, params=None):
+        calls.append(json)
+        formats.append(params["output_format"])
+        return FakeResponse(b"audio-bytes", f"req-{len(calls)}")
+
+    monkeypatch.setattr(httpx.AsyncClient, "post", fake_post)
+    api = ElevenLabsAPI()
+
+    first = await api.generate_audio_segment("Hello", "voice1")
+    second = await api.generate_audio_segment("Hello", "voice1", previous_request_ids=["other"])
+    uncached = await api.generate_audio_segment("Hello", "voice1", use_cache=False)
+
+    other_format = await api.generate_audio_segment("Hello", "voice1", output_format="pcm_16000")
+
+    assert first == second == (b"audio-bytes", "req-1")
+    assert uncached == (b"audio-bytes", "req-2")
+    assert other_format == (b"audio-bytes", "req-3")
+    assert formats == ["mp3_44100_128", "mp3_44100_128", "pcm_16000"]
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from elevenlabs_mcp.database import Database
+from elevenlabs_mcp.models import AudioJob
+
+
+@pytest.mark.asyncio
+async def test_shared_connection_is_tuned_and_reopens(tmp_path):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+
+    conn = await db._connection()
+    assert await db._connection() is conn
+    async with conn.execute("PRAGMA journal_mode") as cursor:
+        assert (await cursor.fetchone())[0] == "wal"
+
+    await db.insert_job(AudioJob(id="job-1", status="pending", script_parts=[]))
+    await db.close()
+
+    assert (await db.get_job("job-1")).status == "pending"
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_all_committed(tmp_path):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+
+    await asyncio.gather(*(
+        db.insert_job(AudioJob(id=f"job-{i}", status="pending", script_parts=[]))
+        for i in range(20)
+    ))
+    with pytest.raises(Exception):
+        await db.insert_job(AudioJob(id="job-0", status="pending", script_parts=[]))
+    await db.update_job(AudioJob(id="job-1", status="completed", script_parts=[]))
+
+    assert len(await db.get_all_jobs()) == 20
+    assert (await db.get_job("job-1")).status == "completed"
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_list_jobs_pages_with_cursor_and_filters(tmp_path):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+    created = datetime(2024, 1, 1)
+    for i in range(5):
+        await db.insert_job(AudioJob(
+            id=f"job-{i}",
+            status="completed" if i % 2 else "failed",
+            script_parts=[{"text": f"Part {i}"}],
+            # job-3 and job-4 share a timestamp so the id breaks the tie
+            created_at=created + timedelta(minutes=min(i, 3)),
+        ))
+
+    first, cursor = await db.list_jobs(limit=2)
+    second, cursor = await db.list_jobs(limit=2, cursor=cursor)
+    third, last_cursor = await db.list_jobs(limit=2, cursor=cursor)
+
+    assert [job["id"] for job in first + second + third] == ["job-4", "job-3", "job-2", "job-1", "job-0"]
+    assert last_cursor is None
+    assert "script_parts" not in first[0]
+
+    completed, _ = await db.list_jobs(statuses=["completed"], created_after=created + timedelta(minutes=2))
+    assert [job["id"] for job in completed] == ["job-3"]
+    full, _ = await db.list_jobs(limit=1, include_script=True, created_before=created + timedelta(minutes=1))
+    assert full[0]["script_parts"] == [{"text": "Part 0"}]
+
+    with pytest.raises(ValueError):
+        await db.list_jobs(cursor="not-a-cursor")
+    await db.close()
+
+
+def make_voice(voice_id: str, name: str) -> dict:
+    return {
+        "voice_id": voice_id,
+        "name": name,
+        "category": "cloned",
+        "labels": {"accent": "british"},
+        "description": "",
+        "preview_url": "",
+        "high_quality_base_model_ids": [],
+    }
+
+
+@pytest.mark.asyncio
+async def test_upsert_voices_only_touches_changed_rows(tmp_path):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+
+    voices, needs_refresh = await db.get_voices()
+    assert voices == [] and needs_refresh
+
+    first = await db.upsert_voices([make_voice("a", "Alice"), make_voice("b", "Bob"), make_voice("c", "Carol")])
+    assert first == {"added": 3, "changed": 0, "removed": 0, "unchanged": 0}
+    conn = await db._connection()
+    async with conn.execute("SELECT last_updated FROM voices WHERE voice_id = 'a'") as cursor:
+        (alice_updated,) = await cursor.fetchone()
+
+    second = await db.upsert_voices([make_voice("a", "Alice"), make_voice("b", "Robert"), make_voice("d", "Dan")])
+    assert second == {"added": 1, "changed": 1, "removed": 1, "unchanged": 1}
+
+    voices, needs_refresh = await db.get_voices()
+    assert [voice["name"] for voice in voices] == ["Alice", "Dan", "Robert"]
+    assert not needs_refresh
+    async with conn.execute("SELECT last_updated FROM voices WHERE voice_id = 'a'") as cursor:
+        assert (await cursor.fetchone())[0] == alice_updated
+    await db.close()
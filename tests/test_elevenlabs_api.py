@@ -0,0 +1,248 @@
+import asyncio
+import httpx
+import json
+import pytest
+from pathlib import Path
+from elevenlabs_mcp.checkpoints import JobCheckpoint
+from elevenlabs_mcp.database import Database
+from elevenlabs_mcp.elevenlabs_api import ElevenLabsAPI
+from elevenlabs_mcp.models import AudioJob
+from elevenlabs_mcp.tracing import Trace
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "test-key")
+    monkeypatch.setenv("ELEVENLABS_CACHE_DIR", str(tmp_path / "cache"))
+    return ElevenLabsAPI()
+
+
+@pytest.mark.asyncio
+async def test_calls_share_one_pooled_client_until_closed(api, monkeypatch):
+    clients = []
+    real_client = httpx.AsyncClient
+
+    def make_client(**kwargs):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json={"voices": []}))
+        clients.append(real_client(transport=transport, **kwargs))
+        return clients[-1]
+
+    monkeypatch.setattr(httpx, "AsyncClient", make_client)
+
+    await api.get_voices()
+    await api.get_voices()
+    assert len(clients) == 1
+
+    await api.aclose()
+    assert clients[0].is_closed
+    await api.aclose()
+
+    # A call after aclose() opens a fresh client instead of failing on the closed one
+    assert await api.get_voices() == []
+    assert len(clients) == 2 and not clients[1].is_closed
+    await api.aclose()
+
+
+@pytest.mark.asyncio
+async def test_parallel_rendering_keeps_script_order(api, tmp_path, monkeypatch):
+    api.model_id = "eleven_flash_v2_5"
+    in_flight = 0
+    max_in_flight = 0
+
+    async def fake_segment(text, voice_id, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later parts finish first
+        await asyncio.sleep(0.01 * (5 - int(text)))
+        in_flight -= 1
+        return text.encode(), f"req-{text}"
+
+    combined = []
+    monkeypatch.setattr(api, "generate_audio_segment", fake_segment)
+    monkeypatch.setattr(api, "_combine_segments", lambda segments, output_file, fmt=None: combined.extend(segments))
+
+    script_parts = [{"text": str(i)} for i in range(5)]
+    _, _, completed_parts = await api.generate_full_audio(script_parts, tmp_path, max_concurrency=3)
+
+    assert completed_parts == 5
+    assert combined == [b"0", b"1", b"2", b"3", b"4"]
+    assert max_in_flight == 3
+
+
+@pytest.mark.asyncio
+async def test_stitching_model_renders_sequentially(api, tmp_path, monkeypatch):
+    api.model_id = "eleven_multilingual_v2"
+    seen_request_ids = []
+
+    async def fake_segment(text, voice_id, previous_request_ids=None, **kwargs):
+        seen_request_ids.append(list(previous_request_ids))
+        return text.encode(), f"req-{text}"
+
+    monkeypatch.setattr(api, "generate_audio_segment", fake_segment)
+    monkeypatch.setattr(api, "_combine_segments", lambda segments, output_file, fmt=None: None)
+
+    await api.generate_full_audio([{"text": "a"}, {"text": "b"}, {"text": "c"}], tmp_path)
+
+    assert seen_request_ids == [[], ["req-a"], ["req-a", "req-b"]]
+
+
+@pytest.mark.asyncio
+async def test_streamed_segment_written_to_file(api, tmp_path):
+    requested_paths = []
+
+    def handler(request):
+        requested_paths.append(request.url.path)
+        return httpx.Response(200, content=b"streamed-audio", headers={"request-id": "req-1"})
+
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    output_file = tmp_path / "out.mp3"
+    trace = Trace("debug")
+
+    audio, request_id = await api.generate_audio_segment(
+        "Hello", "voice1", output_file=str(output_file), trace=trace, stream=True, use_cache=False
+    )
+
+    assert requested_paths == ["/v1/text-to-speech/voice1/stream"]
+    assert (audio, request_id) == (b"streamed-audio", "req-1")
+    assert output_file.read_bytes() == b"streamed-audio"
+    assert any("ttfb=" in line for line in trace)
+
+
+@pytest.mark.asyncio
+async def test_streamed_parts_without_request_id_are_not_stitched(api, tmp_path, monkeypatch):
+    api.model_id = "eleven_multilingual_v2"
+    monkeypatch.setattr(api, "_combine_segments", lambda segments, output_file, fmt=None: None)
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, content=b"audio")
+
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await api.generate_audio_segment("Hello", "voice1", stream=True, use_cache=True)
+    await api.generate_full_audio([{"text": "a"}, {"text": "b"}], tmp_path, stream=True)
+    # A cached segment without a request-id must not feed an empty id either
+    _, request_id = await api.generate_audio_segment("Hello", "voice1", stream=True, use_cache=True)
+
+    assert request_id is None
+    assert len(bodies) == 3
+    assert all("previous_request_ids" not in body for body in bodies)
+
+
+@pytest.mark.asyncio
+async def test_buffered_segment_reports_response_time(api, tmp_path):
+    def handler(request):
+        return httpx.Response(200, content=b"audio", headers={"request-id": "req-1"})
+
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    trace = Trace("debug")
+
+    await api.generate_audio_segment("Hello", "voice1", trace=trace, use_cache=False)
+
+    assert any("response_time=" in line for line in trace)
+    assert not any("ttfb=" in line for line in trace)
+
+
+@pytest.mark.asyncio
+async def test_pcm_output_format_written_as_wav(api, tmp_path):
+    api.model_id = "eleven_flash_v2_5"
+    requested_formats = []
+
+    def handler(request):
+        requested_formats.append(request.url.params["output_format"])
+        return httpx.Response(200, content=b"\x00\x01" * 8000, headers={"request-id": "req-1"})
+
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    output_file, _, _ = await api.generate_full_audio(
+        [{"text": "a"}, {"text": "b"}], tmp_path, use_cache=False, stream=True, output_format="pcm_16000"
+    )
+
+    data = Path(output_file).read_bytes()
+    assert Path(output_file).suffix == ".wav"
+    assert requested_formats == ["pcm_16000", "pcm_16000"]
+    assert data[:4] == b"RIFF" and len(data) == 44 + 32000
+
+
+@pytest.mark.asyncio
+async def test_resume_rerenders_only_failed_parts(api, tmp_path, monkeypatch):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+    await db.insert_job(AudioJob(id="job-1", status="processing", script_parts=[], total_parts=3))
+    checkpoint = JobCheckpoint(db, "job-1", tmp_path / "parts")
+    api.model_id = "eleven_multilingual_v2"
+    rendered = []
+    fail_texts = {"b"}
+
+    async def fake_segment(text, voice_id, previous_request_ids=None, **kwargs):
+        if text in fail_texts:
+            raise Exception("boom")
+        rendered.append((text, list(previous_request_ids)))
+        return text.encode(), f"req-{text}-{len(rendered)}"
+
+    combined = []
+    monkeypatch.setattr(api, "generate_audio_segment", fake_segment)
+    monkeypatch.setattr(api, "_combine_segments", lambda segments, output_file, fmt=None: combined.append(segments))
+    script_parts = [{"text": "a"}, {"text": "b"}, {"text": "c"}]
+
+    _, _, completed_parts = await api.generate_full_audio(script_parts, tmp_path, checkpoint=checkpoint)
+    assert completed_parts == 2
+    parts = await db.get_job_parts("job-1")
+    assert [part["status"] for part in parts] == ["completed", "failed", "completed"]
+
+    fail_texts.clear()
+    rendered.clear()
+    _, _, completed_parts = await api.generate_full_audio(script_parts, tmp_path, checkpoint=checkpoint)
+
+    assert completed_parts == 3
+    assert rendered == [("b", ["req-a-1"])]
+    assert combined[-1] == [b"a", b"b", b"c"]
+    assert (await db.get_job("job-1")).completed_parts == 3
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_parts_keep_the_codec_suffix(tmp_path):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+    await db.insert_job(AudioJob(id="job-1", status="processing", script_parts=[], total_parts=1))
+    checkpoint = JobCheckpoint(db, "job-1", tmp_path / "parts", "pcm_16000")
+
+    await checkpoint.save_part(0, b"\x00\x01", "req-1")
+
+    assert [path.name for path in (tmp_path / "parts" / "job-1").iterdir()] == ["0.pcm"]
+    assert await checkpoint.load() == {0: (b"\x00\x01", "req-1")}
+    await db.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_checkpoint_save_fails_only_its_part(api, tmp_path, monkeypatch):
+    db = Database(str(tmp_path / "history.db"))
+    await db.initialize()
+    await db.insert_job(AudioJob(id="job-1", status="processing", script_parts=[], total_parts=3))
+    checkpoint = JobCheckpoint(db, "job-1", tmp_path / "parts")
+    api.model_id = "eleven_flash_v2_5"
+    save_part = checkpoint.save_part
+
+    async def flaky_save_part(index, audio, request_id):
+        if index == 1:
+            raise OSError("disk full")
+        await save_part(index, audio, request_id)
+
+    async def fake_segment(text, voice_id, **kwargs):
+        return text.encode(), f"req-{text}"
+
+    monkeypatch.setattr(checkpoint, "save_part", flaky_save_part)
+    monkeypatch.setattr(api, "generate_audio_segment", fake_segment)
+    monkeypatch.setattr(api, "_combine_segments", lambda segments, output_file, fmt=None: None)
+
+    _, _, completed_parts = await api.generate_full_audio(
+        [{"text": "a"}, {"text": "b"}, {"text": "c"}], tmp_path, checkpoint=checkpoint
+    )
+
+    assert completed_parts == 2
+    parts = await db.get_job_parts("job-1")
+    assert [part["status"] for part in parts] == ["completed", "failed", "completed"]
+    await db.close()
@@ -0,0 +1,21 @@
+import base64
+import pytest
+from elevenlabs_mcp.encoding import b64encode_file
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 4, 11, 12, 13, 1000])
+def test_b64encode_file_matches_base64_module(tmp_path, size):
+    path = tmp_path / "audio.mp3"
+    data = bytes(range(256)) * (size // 256) + bytes(range(size % 256))
+    path.write_bytes(data)
+
+    assert b64encode_file(path, chunk_size=6) == base64.b64encode(data).decode("utf-8")
+    assert b64encode_file(path) == base64.b64encode(data).decode("utf-8")
+
+
+def test_b64encode_file_rejects_unaligned_chunks(tmp_path):
+    path = tmp_path / "audio.mp3"
+    path.write_bytes(b"audio")
+
+    with pytest.raises(ValueError):
+        b64encode_file(path, chunk_size=4)
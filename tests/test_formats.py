@@ -0,0 +1,46 @@
+import struct
+import pytest
+from elevenlabs_mcp.formats import (
+    DEFAULT_OUTPUT_FORMAT, audio_file_duration, get_output_format, mime_type, wav_duration, write_wav
+)
+
+
+def test_get_output_format():
+    assert get_output_format(None).name == DEFAULT_OUTPUT_FORMAT
+    assert get_output_format("pcm_24000").extension == ".wav"
+    assert get_output_format("opus_48000_64").mime_type == "audio/ogg"
+    assert not get_output_format("ulaw_8000").streamable
+
+    with pytest.raises(ValueError, match="Unsupported output_format"):
+        get_output_format("flac_48000")
+
+
+def test_write_wav_wraps_pcm_segments(tmp_path):
+    path = tmp_path / "full_audio_x.wav"
+    # One second of 16-bit mono PCM at 8 kHz, in two segments
+    written = write_wav([b"\x01\x00" * 4000, b"\x02\x00" * 4000], path, 8000)
+
+    data = path.read_bytes()
+    assert written == len(data) == 44 + 16000
+    assert data[:4] == b"RIFF" and data[8:16] == b"WAVEfmt "
+    assert struct.unpack_from("<HHI", data, 20) == (1, 1, 8000)
+    assert data[44:] == b"\x01\x00" * 4000 + b"\x02\x00" * 4000
+    assert wav_duration(path) == 1.0
+    assert audio_file_duration(path) == 1.0
+    assert mime_type(path) == "audio/wav"
+
+
+def test_write_wav_mulaw(tmp_path):
+    path = tmp_path / "out.wav"
+    write_wav([b"\xff" * 4000], path, 8000, codec="ulaw")
+
+    assert struct.unpack_from("<HHIIHH", path.read_bytes(), 20) == (7, 1, 8000, 8000, 1, 8)
+    assert wav_duration(path) == 0.5
+
+
+def test_opus_duration_unknown(tmp_path):
+    path = tmp_path / "out.opus"
+    path.write_bytes(b"OggS")
+
+    assert audio_file_duration(path) is None
+    assert mime_type(path) == "audio/ogg"
@@ -0,0 +1,118 @@
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from elevenlabs_mcp.jobs import JobQueue
+from elevenlabs_mcp.models import AudioJob
+
+
+def make_job(job_id: str, status: str = "pending") -> AudioJob:
+    return AudioJob(id=job_id, status=status, script_parts=[{"text": job_id}])
+
+
+async def wait_for_status(db, job_id, status):
+    for _ in range(100):
+        job = await db.get_job(job_id)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} never reached {status}")
+
+
+@pytest.mark.asyncio
+async def test_submitted_job_is_processed_in_background(db):
+    async def runner(job):
+        job.status = "completed"
+        job.output_file = f"{job.id}.mp3"
+        await db.update_job(job)
+
+    queue = JobQueue(db, runner, workers=2)
+    await queue.start()
+    job = make_job("job-1")
+    await queue.submit(job)
+
+    assert (await db.get_job("job-1")) is not None
+    completed = await wait_for_status(db, "job-1", "completed")
+    assert completed.output_file == "job-1.mp3"
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_start_recovers_interrupted_jobs(db):
+    interrupted = make_job("interrupted", status="processing")
+    # Last heartbeat long ago: the process running it is gone
+    interrupted.updated_at = datetime.utcnow() - timedelta(hours=1)
+    await db.insert_job(interrupted)
+    # Still being rendered by another live process sharing the database
+    await db.insert_job(make_job("running-elsewhere", status="processing"))
+    await db.insert_job(make_job("queued", status="pending"))
+    await db.insert_job(make_job("done", status="completed"))
+    processed = []
+
+    async def runner(job):
+        processed.append(job.id)
+        job.status = "completed"
+        await db.update_job(job)
+
+    queue = JobQueue(db, runner, workers=1, stale_after_seconds=60)
+    await queue.start()
+    await wait_for_status(db, "queued", "completed")
+    await queue.stop()
+
+    assert processed == ["interrupted", "queued"]
+    assert (await db.get_job("running-elsewhere")).status == "processing"
+
+
+@pytest.mark.asyncio
+async def test_queues_sharing_a_database_run_each_job_once(db):
+    processed = []
+
+    async def runner(job):
+        processed.append(job.id)
+        await asyncio.sleep(0.01)
+        job.status = "completed"
+        await db.update_job(job)
+
+    # Two server processes: both queue every pending job found on start
+    for i in range(4):
+        await db.insert_job(make_job(f"job-{i}"))
+    queues = [JobQueue(db, runner, workers=2) for _ in range(2)]
+    for queue in queues:
+        await queue.start()
+    for i in range(4):
+        await wait_for_status(db, f"job-{i}", "completed")
+    for queue in queues:
+        await queue.stop()
+
+    assert sorted(processed) == [f"job-{i}" for i in range(4)]
+
+
+@pytest.mark.asyncio
+async def test_running_jobs_keep_a_heartbeat(db):
+    await db.insert_job(make_job("long", status="processing"))
+    inserted = (await db.get_job("long")).updated_at
+
+    queue = JobQueue(db, lambda job: asyncio.sleep(0), stale_after_seconds=0.2)
+    await queue.start()
+    with queue.owned("long"):
+        await asyncio.sleep(0.12)
+    await queue.stop()
+
+    job = await db.get_job("long")
+    assert job.status == "processing" and job.updated_at > inserted
+
+
+@pytest.mark.asyncio
+async def test_stop_puts_the_running_job_back_to_pending(db):
+    started = asyncio.Event()
+
+    async def runner(job):
+        started.set()
+        await asyncio.Event().wait()
+
+    queue = JobQueue(db, runner, workers=1)
+    await queue.start()
+    await queue.submit(make_job("job-1"))
+    await asyncio.wait_for(started.wait(), timeout=5)
+    await queue.stop()
+
+    assert (await db.get_job("job-1")).status == "pending"
@@ -0,0 +1,61 @@
+import json
+import urllib.request
+
+import pytest
+from elevenlabs_mcp.metrics import MetricsRegistry, start_http_server
+
+
+def test_histograms_are_cumulative_per_label_set():
+    registry = MetricsRegistry()
+    registry.describe_histogram("latency_seconds", "Request latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        registry.observe("latency_seconds", value, model="m1", status="200")
+    registry.observe("latency_seconds", 0.05, model="m1", status="429")
+
+    series = registry.snapshot()["latency_seconds"]["series"]
+    assert [s["labels"]["status"] for s in series] == ["200", "429"]
+    assert series[0]["buckets"] == {"0.1": 1, "1.0": 2, "+Inf": 3}
+    assert series[0]["count"] == 3 and series[0]["sum"] == pytest.approx(5.55)
+
+
+@pytest.mark.asyncio
+async def test_timed_records_failures_too():
+    registry = MetricsRegistry()
+
+    @registry.timed("op_seconds", operation="boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await boom()
+    assert registry.snapshot()["op_seconds"]["series"][0]["count"] == 1
+
+
+def test_prometheus_rendering_and_failing_gauges():
+    registry = MetricsRegistry()
+    registry.describe_counter("lookups_total", "Cache lookups")
+    registry.inc("lookups_total", result="hit")
+    registry.inc("lookups_total", result="hit")
+    registry.observe("size_bytes", 10, path='a"b')
+    registry.gauge("queued", "Queued jobs", lambda: 3)
+    registry.gauge("broken", "Raises", lambda: 1 / 0)
+
+    text = registry.render_prometheus()
+    assert "# TYPE lookups_total counter" in text
+    assert 'lookups_total{result="hit"} 2' in text
+    assert 'size_bytes_bucket{path="a\\"b",le="+Inf"} 1' in text
+    assert "queued 3.0" in text
+    assert "broken" not in text
+
+
+def test_http_endpoint_serves_both_formats():
+    httpd = start_http_server(0)
+    try:
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            assert isinstance(json.loads(response.read()), dict)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
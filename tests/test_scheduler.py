@@ -0,0 +1,110 @@
+import asyncio
+import time
+import httpx
+import pytest
+from elevenlabs_mcp import elevenlabs_api
+from elevenlabs_mcp.elevenlabs_api import ElevenLabsAPI
+from elevenlabs_mcp.scheduler import ElevenLabsAPIError, RequestScheduler, parse_retry_after
+from elevenlabs_mcp.tracing import Trace
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("garbage") is None
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_concurrency_and_reports_queue_depth():
+    scheduler = RequestScheduler(max_concurrent=2)
+    in_flight = 0
+    max_in_flight = 0
+    depths = []
+
+    async def call():
+        nonlocal in_flight, max_in_flight
+        async with scheduler.slot():
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            depths.append(scheduler.queue_depth)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+    await asyncio.gather(*(call() for _ in range(6)))
+
+    assert max_in_flight == 2
+    assert max(depths) > 0
+    assert scheduler.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_defer_pauses_new_requests():
+    scheduler = RequestScheduler(max_concurrent=4)
+    started = time.monotonic()
+    scheduler.defer(0.05)
+
+    async with scheduler.slot():
+        pass
+
+    assert time.monotonic() - started >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_segment_is_retried_after_retry_after(tmp_path, monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "scheduler-test-key")
+    api = ElevenLabsAPI()
+    responses = [
+        httpx.Response(429, text="too many", headers={"retry-after": "0"}),
+        httpx.Response(200, content=b"audio", headers={"request-id": "req-1"}),
+    ]
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+
+    result = await api.generate_audio_segment("Hello", "voice1", trace=Trace(), use_cache=False)
+
+    assert result == (b"audio", "req-1")
+
+
+@pytest.mark.asyncio
+async def test_long_retry_after_is_capped(monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "retry-cap-test-key")
+    monkeypatch.setattr(elevenlabs_api, "MAX_RETRY_WAIT_SECONDS", 0.05)
+    api = ElevenLabsAPI()
+    responses = [
+        httpx.Response(429, text="too many", headers={"retry-after": "3600"}),
+        httpx.Response(200, content=b"audio", headers={"request-id": "req-1"}),
+    ]
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+
+    result = await asyncio.wait_for(
+        api.generate_audio_segment("Hello", "voice1", trace=Trace(), use_cache=False), timeout=5
+    )
+
+    assert result == (b"audio", "req-1")
+
+
+def test_part_concurrency_defaults_to_the_request_budget(monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "scheduler-test-key")
+    monkeypatch.setenv("ELEVENLABS_MAX_CONCURRENT_REQUESTS", "3")
+    monkeypatch.delenv("ELEVENLABS_MAX_CONCURRENCY", raising=False)
+
+    assert ElevenLabsAPI().max_concurrency == 3
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(monkeypatch):
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "scheduler-test-key")
+    api = ElevenLabsAPI()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, text="invalid voice")
+
+    api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    with pytest.raises(ElevenLabsAPIError) as exc_info:
+        await api.generate_audio_segment("Hello", "voice1", trace=Trace(), use_cache=False)
+
+    assert exc_info.value.status_code == 400
+    assert len(calls) == 1
@@ -1,6 +1,17 @@
+import anyio
+import asyncio
+import base64
+import hashlib
+import httpx
+import mcp.types as types
 import pytest
+from mcp.server import NotificationOptions
+from mcp.server.models import InitializationOptions
+from elevenlabs_mcp.models import AudioJob
 from elevenlabs_mcp.server import ElevenLabsServer
 import json
+import pstats
+from pathlib import Path
 
 
 def test_parse_script_valid_input():
@@ -175,3 +186,276 @@ def test_parse_mixed_input():
     assert script_parts[1] == {"text": "Part 2", "voice_id": "voice1", "actor": None}
     assert script_parts[2] == {"text": "Part 3", "voice_id": None, "actor": "Bob"}
     assert script_parts[3] == {"text": "Part 4", "voice_id": "voice2", "actor": "Alice"}
+
+
+@pytest.mark.asyncio
+async def test_history_lookup_while_generation_in_flight(server):
+    # The real render path runs against a mocked API whose response is held back
+    request_started = asyncio.Event()
+    release_response = asyncio.Event()
+    responses_sent = 0
+
+    async def handler(request):
+        nonlocal responses_sent
+        request_started.set()
+        await release_response.wait()
+        responses_sent += 1
+        # Ten frames of MPEG-1 Layer III, 128 kbps, 44.1 kHz
+        return httpx.Response(200, content=(bytes([0xFF, 0xFB, 0x90, 0x44]) + bytes(413)) * 10,
+                              headers={"request-id": "req-1"})
+
+    server.api._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    # Drive a whole session through serve(), as stdio would
+    client_send, server_read = anyio.create_memory_object_stream(16)
+    server_send, client_read = anyio.create_memory_object_stream(16)
+    options = InitializationOptions(
+        server_name="test", server_version="0",
+        capabilities=server.server.get_capabilities(NotificationOptions(), {})
+    )
+    session = asyncio.create_task(server.serve(server_read, server_send, options))
+
+    async def request(request_id, method, params):
+        await client_send.send(types.JSONRPCMessage(
+            types.JSONRPCRequest(jsonrpc="2.0", id=request_id, method=method, params=params)
+        ))
+
+    async def response():
+        return (await asyncio.wait_for(client_read.receive(), timeout=5)).root
+
+    await request(1, "initialize", {
+        "protocolVersion": types.LATEST_PROTOCOL_VERSION, "capabilities": {},
+        "clientInfo": {"name": "test", "version": "0"}
+    })
+    assert (await response()).id == 1
+    await client_send.send(types.JSONRPCMessage(
+        types.JSONRPCNotification(jsonrpc="2.0", method="notifications/initialized")
+    ))
+
+    await request(2, "tools/call", {"name": "generate_audio_simple", "arguments": {"text": "Hello", "use_cache": False}})
+    await asyncio.wait_for(request_started.wait(), timeout=5)
+    await request(3, "tools/call", {"name": "get_voiceover_history", "arguments": {}})
+
+    history = await response()
+    assert history.id == 3 and responses_sent == 0
+    assert json.loads(history.result["content"][0]["text"])["jobs"][0]["status"] == "processing"
+
+    release_response.set()
+    result = await response()
+    assert result.id == 2
+    assert "Audio generation successful" in result.result["content"][0]["text"]
+    assert responses_sent == 1
+
+    client_send.close()
+    await asyncio.wait_for(session, timeout=5)
+
+
+@pytest.mark.asyncio
+async def test_history_resource_accepts_query_filters(server, read_resource):
+    for i, status in enumerate(["completed", "failed", "completed"]):
+        await server.db.insert_job(AudioJob(id=f"job-{i}", status=status, script_parts=[{"text": "Hi"}]))
+
+    page = json.loads((await read_resource("voiceover://history?status=completed&limit=1")).text)
+    assert len(page["jobs"]) == 1 and page["jobs"][0]["status"] == "completed"
+    assert "script_parts" not in page["jobs"][0]
+
+    rest = json.loads((await read_resource(f"voiceover://history?status=completed&cursor={page['next_cursor']}")).text)
+    assert len(rest["jobs"]) == 1 and rest["next_cursor"] is None
+
+    job = json.loads((await read_resource("voiceover://history/job-1")).text)
+    assert job[0]["script_parts"] == [{"text": "Hi"}]
+
+
+@pytest.mark.asyncio
+async def test_reference_delivery_and_ranged_audio_reads(server, renderer, call_tool, read_resource, tmp_path):
+    (tmp_path / "secret.txt").write_text("secret")
+    # Ten frames of MPEG-1 Layer III, 128 kbps, 44.1 kHz
+    audio = (bytes([0xFF, 0xFB, 0x90, 0x44]) + bytes(413)) * 10
+    renderer.audio = audio
+
+    content = await call_tool("generate_audio_simple", {"text": "Hello", "delivery": "reference"})
+    assert all(block.type == "text" for block in content)
+    metadata = json.loads(content[1].text)
+    assert metadata["uri"] == f"audio://full_audio_{hashlib.sha256(audio).hexdigest()}.mp3"
+    assert metadata["size_bytes"] == len(audio)
+    assert metadata["duration_seconds"] == pytest.approx(10 * 1152 / 44100, abs=0.001)
+
+    chunk = await read_resource(f"{metadata['uri']}?offset=100&length=50")
+    assert base64.urlsafe_b64decode(chunk.blob) == audio[100:150]
+
+    with pytest.raises(ValueError):
+        await read_resource("audio://..%2Fsecret.txt")
+
+    job_id = (await server.db.list_jobs())[0][0]["id"]
+    ranged = await call_tool("get_audio_file", {"job_id": job_id, "offset": 4000, "length": 1000})
+    info = json.loads(ranged[0].text)
+    assert info == {"offset": 4000, "length": 170, "size_bytes": 4170, "next_offset": None}
+    assert base64.b64decode(ranged[1].resource.blob) == audio[4000:]
+
+
+@pytest.mark.asyncio
+async def test_long_simple_text_is_rendered_in_chunks(server, renderer, call_tool):
+    server.api.chunk_chars = 100
+    text = "A sentence that is about forty chars. " * 10
+
+    await call_tool("generate_audio_simple", {"text": text, "voice_id": "v1"})
+
+    rendered = renderer.scripts[0]
+    assert len(rendered) == 5
+    assert all(len(part["text"]) <= 100 and part["voice_id"] == "v1" for part in rendered)
+    assert (await server.db.list_jobs())[0][0]["total_parts"] == 5
+
+
+@pytest.mark.asyncio
+async def test_metrics_resource_reports_tool_and_db_activity(server, call_tool, read_resource):
+    await call_tool("get_voiceover_history", {})
+
+    metrics = json.loads((await read_resource("voiceover://metrics")).text)
+    tools = {s["labels"]["tool"] for s in metrics["elevenlabs_tool_call_seconds"]["series"]}
+    assert "get_voiceover_history" in tools
+    operations = {s["labels"]["operation"] for s in metrics["elevenlabs_db_operation_seconds"]["series"]}
+    assert "list_jobs" in operations
+    assert metrics["elevenlabs_jobs_in_flight"]["series"][0]["value"] == 0
+
+    text = (await read_resource("voiceover://metrics?format=prometheus")).text
+    assert "# TYPE elevenlabs_tool_call_seconds histogram" in text
+
+
+@pytest.mark.asyncio
+async def test_inline_generation_counts_as_a_job_in_flight(server, renderer, call_tool, read_resource):
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def held_render(script_parts, output_dir, **kwargs):
+        started.set()
+        await release.wait()
+        return await renderer(script_parts, output_dir, **kwargs)
+
+    server.api.generate_full_audio = held_render
+
+    def jobs_in_flight(metrics):
+        return metrics["elevenlabs_jobs_in_flight"]["series"][0]["value"]
+
+    generation = asyncio.create_task(call_tool("generate_audio_simple", {"text": "Hello"}))
+    await asyncio.wait_for(started.wait(), timeout=5)
+    assert jobs_in_flight(json.loads((await read_resource("voiceover://metrics")).text)) == 1
+
+    release.set()
+    await asyncio.wait_for(generation, timeout=5)
+    assert jobs_in_flight(json.loads((await read_resource("voiceover://metrics")).text)) == 0
+
+
+@pytest.mark.asyncio
+async def test_profile_argument_writes_reports_named_after_the_job(server, renderer, call_tool):
+    profiles_dir = server.output_dir / "profiles"
+
+    await call_tool("generate_audio_simple", {"text": "Hello", "delivery": "reference"})
+    assert not profiles_dir.exists()
+
+    content = await call_tool("generate_audio_simple", {"text": "Hello", "delivery": "reference", "profile": True})
+    assert content[-1].text.startswith("Profile written to")
+    job_id = (await server.db.list_jobs())[0][0]["id"]
+    profiles = sorted(p.name for p in profiles_dir.iterdir())
+    assert [name.split("_", 1)[1] for name in profiles] == [
+        f"generate_audio_simple_{job_id}.prof",
+        f"generate_audio_simple_{job_id}.txt",
+    ]
+    pstats.Stats(str(profiles_dir / profiles[0]))
+    assert "== CPU (cumulative) ==" in (profiles_dir / profiles[1]).read_text()
+
+
+@pytest.mark.asyncio
+async def test_startup_does_not_wait_for_voices_or_touch_the_filesystem(tmp_path, monkeypatch):
+    output_dir = tmp_path / "out"
+    monkeypatch.setenv("ELEVENLABS_OUTPUT_DIR", str(output_dir))
+    server = ElevenLabsServer()
+    assert server.output_dir == output_dir and not output_dir.exists()
+
+    fetch_started = asyncio.Event()
+
+    async def slow_get_voices():
+        fetch_started.set()
+        await asyncio.sleep(3600)
+
+    server.api.get_voices = slow_get_voices
+    await asyncio.wait_for(server.initialize(), timeout=5)
+    assert (output_dir / "voiceover_history.db").exists()
+    await asyncio.wait_for(fetch_started.wait(), timeout=5)
+    await server.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_identical_jobs_share_one_refcounted_output(server, renderer, call_tool):
+    renderer.audio = b"same audio"
+
+    first = await call_tool("generate_audio_simple", {"text": "Hello", "delivery": "reference"})
+    second = await call_tool("generate_audio_simple", {"text": "Hello", "delivery": "reference"})
+    assert len(renderer.scripts) == 1
+    assert "Reused the stored output" in second[0].text
+    # A forced re-render producing the same bytes still lands on the same file
+    await call_tool("generate_audio_simple", {"text": "Hello", "use_cache": False, "delivery": "reference"})
+    assert len(renderer.scripts) == 2
+
+    jobs, _ = await server.db.list_jobs()
+    output_files = {job["output_file"] for job in jobs}
+    assert len(output_files) == 1
+    stored = Path(output_files.pop())
+    assert sorted(path.name for path in server.output_dir.glob("full_audio_*")) == [stored.name]
+    assert json.loads(first[1].text)["name"] == stored.name
+
+    for job in jobs[:2]:
+        await call_tool("delete_job", {"job_id": job["id"]})
+        assert stored.exists()
+    await call_tool("delete_job", {"job_id": jobs[2]["id"]})
+    assert not stored.exists()
+
+
+@pytest.mark.asyncio
+async def test_job_deleted_while_rendering_releases_its_output(server, renderer):
+    job = AudioJob(id="deleted-mid-render", status="pending", script_parts=[{"text": "Hello"}])
+    await server.db.insert_job(job)
+    render = renderer.__call__
+
+    async def delete_then_render(script_parts, output_dir, **kwargs):
+        await server.db.delete_job(job.id)
+        return await render(script_parts, output_dir, **kwargs)
+
+    server.api.generate_full_audio = delete_then_render
+
+    with pytest.raises(ValueError, match="deleted while it was being rendered"):
+        await server.run_job(job)
+
+    assert await server.db.get_shared_outputs() == []
+    assert list(server.output_dir.glob("full_audio_*")) == []
+
+
+@pytest.mark.asyncio
+async def test_cancelled_inline_generation_marks_the_job_failed(server, call_tool):
+    started = asyncio.Event()
+
+    async def never_finishes(script_parts, output_dir, **kwargs):
+        started.set()
+        await asyncio.Event().wait()
+
+    server.api.generate_full_audio = never_finishes
+    generation = asyncio.create_task(call_tool("generate_audio_simple", {"text": "Hello"}))
+    await asyncio.wait_for(started.wait(), timeout=5)
+    generation.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await generation
+
+    jobs, _ = await server.db.list_jobs()
+    assert jobs[0]["status"] == "failed"
+    assert "resume_job" in jobs[0]["error"]
+
+
+@pytest.mark.asyncio
+async def test_audio_resources_only_serve_generated_outputs(server, read_resource):
+    # The history database lives in the output directory next to the audio
+    await server.db.list_jobs()
+    (server.output_dir / "notes.txt").write_text("notes")
+    assert (server.output_dir / "voiceover_history.db").is_file()
+
+    for name in ("voiceover_history.db", "voiceover_history.db-wal", "notes.txt"):
+        with pytest.raises(ValueError, match="Audio file not found"):
+            await read_resource(f"audio://{name}")
@@ -0,0 +1,101 @@
+import os
+import time
+import pytest
+from elevenlabs_mcp.models import AudioJob
+from elevenlabs_mcp.storage import StorageManager
+
+
+def write_output(output_dir, name, size, age_seconds):
+    path = output_dir / name
+    path.write_bytes(bytes(size))
+    accessed = time.time() - age_seconds
+    os.utime(path, (accessed, accessed))
+    return path
+
+
+async def add_job(db, job_id, output_file, status="completed"):
+    await db.insert_job(AudioJob(id=job_id, status=status, script_parts=[],
+                                 output_file=str(output_file) if output_file else None))
+
+
+@pytest.mark.asyncio
+async def test_pass_reconciles_files_and_jobs_both_ways(db, tmp_path):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    kept = write_output(output_dir, "full_audio_kept.mp3", 100, 10)
+    old_orphan = write_output(output_dir, "full_audio_old_orphan.mp3", 100, 7200)
+    new_orphan = write_output(output_dir, "full_audio_new_orphan.mp3", 100, 10)
+    notes = write_output(output_dir, "notes.txt", 100, 7200)
+    await add_job(db, "kept", kept)
+    await add_job(db, "missing", output_dir / "full_audio_gone.mp3")
+
+    storage = StorageManager(db, output_dir, batch_size=2)
+    result = await storage.run_pass()
+
+    assert result == {"missing": 1, "orphan": 1, "expired": 0, "quota": 0}
+    assert kept.exists() and new_orphan.exists() and notes.exists()
+    assert not old_orphan.exists()
+    missing = await db.get_job("missing")
+    assert missing.output_file is None and missing.error == "Output file is missing"
+    assert storage.stats()["bytes"] == 200
+
+
+@pytest.mark.asyncio
+async def test_quota_evicts_least_recently_accessed_and_age_limit_expires(db, tmp_path):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    paths = {name: write_output(output_dir, f"full_audio_{name}.mp3", 100, age)
+             for name, age in [("oldest", 300), ("older", 200), ("recent", 100), ("ancient", 10 * 86400)]}
+    for name, path in paths.items():
+        await add_job(db, name, path)
+    # Reading an output makes it the most recently used
+    storage = StorageManager(db, output_dir, max_bytes=200, max_age_seconds=86400)
+    storage.touch(paths["oldest"])
+
+    result = await storage.run_pass()
+
+    assert result == {"missing": 0, "orphan": 0, "expired": 1, "quota": 1}
+    assert sorted(path.name for path in output_dir.iterdir()) == ["full_audio_oldest.mp3", "full_audio_recent.mp3"]
+    assert (await db.get_job("older")).error == "Output removed by the storage policy (quota)"
+    assert (await db.get_job("ancient")).output_file is None
+    assert (await db.get_job("oldest")).output_file == str(paths["oldest"])
+
+
+@pytest.mark.asyncio
+async def test_parts_and_profiles_count_toward_the_quota(db, tmp_path):
+    output_dir = tmp_path / "output"
+    for directory in ("parts/failed", "parts/running", "parts/deleted", "profiles"):
+        (output_dir / directory).mkdir(parents=True)
+    output = write_output(output_dir, "full_audio_kept.mp3", 100, 10)
+    await add_job(db, "kept", output)
+    await add_job(db, "failed", None, status="failed")
+    await add_job(db, "running", None, status="processing")
+    await db.upsert_job_part("failed", 0, "completed", request_id="r", audio_file=str(output_dir / "parts/failed/0.mp3"))
+    write_output(output_dir, "parts/failed/0.mp3", 100, 300)
+    write_output(output_dir, "parts/running/0.mp3", 100, 400)
+    write_output(output_dir, "parts/deleted/0.mp3", 100, 7200)
+    write_output(output_dir, "profiles/old.prof", 100, 200)
+
+    storage = StorageManager(db, output_dir, max_bytes=250)
+    result = await storage.run_pass()
+
+    # The deleted job's parts are orphaned; then the failed job's parts and the profile are least recently used
+    assert result == {"missing": 0, "orphan": 1, "expired": 0, "quota": 2}
+    assert sorted(path.name for path in (output_dir / "parts").iterdir()) == ["running"]
+    assert not (output_dir / "profiles/old.prof").exists() and output.exists()
+    assert await db.get_job_parts("failed") == []
+    assert storage.stats()["bytes"] == 200
+
+
+@pytest.mark.asyncio
+async def test_evicting_an_unowned_shared_output_forgets_it(db, tmp_path):
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+    orphan = write_output(output_dir, "full_audio_abc.mp3", 100, 7200)
+    await db.acquire_output("abc", str(orphan), 100)
+
+    result = await StorageManager(db, output_dir).run_pass()
+
+    assert result["orphan"] == 1
+    assert not orphan.exists()
+    assert await db.get_shared_outputs() == []
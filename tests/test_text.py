@@ -0,0 +1,52 @@
+from elevenlabs_mcp.text import context_windows, split_text
+
+
+def test_short_scripts_get_full_neighbouring_text():
+    texts = ["One.", "Two.", "", "Three."]
+
+    assert context_windows(texts, budget=1000) == [
+        (None, "Two. Three."),
+        ("One.", "Three."),
+        ("One. Two.", "Three."),
+        ("One. Two.", None),
+    ]
+
+
+def test_windows_respect_budget_and_sentence_boundaries():
+    sentence = "The quick brown fox jumps over the lazy dog. "
+    texts = [sentence * 3] * 200
+
+    windows = context_windows(texts, budget=100)
+
+    for previous_text, next_text in windows[1:-1]:
+        assert 0 < len(previous_text) <= 100 and 0 < len(next_text) <= 100
+        assert previous_text.startswith("The quick") and previous_text.endswith("dog.")
+        assert next_text.startswith("The quick") and next_text.endswith("dog.")
+
+
+def test_windows_fall_back_to_word_boundaries():
+    texts = ["alpha beta gamma delta epsilon", "middle", "zeta eta theta iota kappa"]
+
+    previous_text, next_text = context_windows(texts, budget=12)[1]
+
+    assert previous_text == "epsilon"
+    assert next_text == "zeta eta"
+    assert context_windows(texts, budget=0) == [(None, None)] * 3
+
+
+def test_split_text_packs_sentences_under_the_limit():
+    text = "First sentence here. Second one follows! Third? " * 20 + "\n\n" + "Closing paragraph."
+
+    chunks = split_text(text, max_chars=120)
+
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert all(chunk.endswith((".", "!", "?")) for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+    assert split_text("Short text.", max_chars=120) == ["Short text."]
+
+
+def test_split_text_breaks_overlong_sentences_at_words():
+    chunks = split_text("word " * 100, max_chars=42)
+
+    assert all(len(chunk) <= 42 for chunk in chunks)
+    assert sum(chunk.count("word") for chunk in chunks) == 100
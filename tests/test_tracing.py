@@ -0,0 +1,34 @@
+import pytest
+from elevenlabs_mcp.tracing import Trace
+
+
+class Exploding:
+    def __str__(self):
+        raise AssertionError("formatted a filtered-out entry")
+
+
+def test_entries_below_level_are_never_formatted():
+    trace = Trace("info")
+    trace.debug("script parts: %s", Exploding())
+    trace.info("Parsed %d script parts", 3)
+
+    assert len(trace) == 1
+    assert trace.lines()[0].endswith("INFO: Parsed 3 script parts")
+
+
+def test_trace_is_capped_by_entries_and_size():
+    trace = Trace("debug", max_entries=5, max_line_chars=40, max_chars=100)
+    for i in range(20):
+        trace.debug("part %d: %s", i, "x" * 1000)
+
+    lines = trace.lines()
+    assert len(trace) == 5
+    assert lines[0] == "... 15 earlier entries dropped"
+    assert all(len(line) <= 40 for line in lines[1:])
+    assert sum(len(line) for line in lines[1:-1]) <= 100
+    assert lines[-1].endswith("more entries truncated")
+
+
+def test_invalid_level_is_rejected():
+    with pytest.raises(ValueError):
+        Trace("verbose")
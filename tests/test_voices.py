@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from elevenlabs_mcp.voices import VoiceCatalogue
+
+
+class FakeAPI:
+    voice_id = "voice1"
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def get_voices(self):
+        self.calls += 1
+        await self.release.wait()
+        return [
+            {
+                "voice_id": f"voice{n}",
+                "name": f"Voice {n} v{self.calls}",
+                "category": "premade",
+                "labels": {},
+                "description": "",
+                "preview_url": "",
+                "high_quality_base_model_ids": [],
+            }
+            for n in (1, 2)
+        ]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_cold_reads_share_one_fetch(db):
+    api = FakeAPI()
+    api.release.clear()
+    catalogue = VoiceCatalogue(db, api)
+
+    readers = [asyncio.create_task(catalogue.get()) for _ in range(10)]
+    await asyncio.sleep(0.01)
+    api.release.set()
+    results = await asyncio.gather(*readers)
+
+    assert api.calls == 1
+    assert all(result is results[0] for result in results)
+    assert [voice["is_default"] for voice in results[0]] == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_stale_catalogue_is_served_while_refreshing(db):
+    api = FakeAPI()
+    catalogue = VoiceCatalogue(db, api, ttl_seconds=0)
+    first = await catalogue.get()
+
+    api.release.clear()
+    stale = await asyncio.wait_for(catalogue.get(), timeout=1)
+    assert stale is first
+    await catalogue.get()
+    assert api.calls == 2
+
+    api.release.set()
+    await catalogue._refresh_task
+    assert (await catalogue.get())[0]["name"] == "Voice 1 v2"
+    await catalogue.close()
+
+
+@pytest.mark.asyncio
+async def test_fresh_catalogue_is_loaded_from_database(db):
+    await VoiceCatalogue(db, FakeAPI()).get()
+
+    api = FakeAPI()
+    catalogue = VoiceCatalogue(db, api)
+    voices = await catalogue.get()
+
+    assert api.calls == 0
+    assert [voice["voice_id"] for voice in voices] == ["voice1", "voice2"]
+    assert await catalogue.get_json() is await catalogue.get_json()
+
+
+@pytest.mark.asyncio
+async def test_voices_stored_without_sync_time_are_served_when_refresh_fails(db):
+    await VoiceCatalogue(db, FakeAPI()).get()
+    # Databases written before the sync time was recorded have voices but no metadata row
+    conn = await db._connection()
+    await conn.execute("DELETE FROM metadata")
+    await conn.commit()
+
+    class FailingAPI(FakeAPI):
+        async def get_voices(self):
+            self.calls += 1
+            raise Exception("ElevenLabs unavailable")
+
+    api = FailingAPI()
+    catalogue = VoiceCatalogue(db, api)
+    voices = await catalogue.get()
+
+    assert [voice["voice_id"] for voice in voices] == ["voice1", "voice2"]
+    assert catalogue.is_stale
+    await asyncio.gather(catalogue._refresh_task, return_exceptions=True)
+    assert api.calls == 1
+    await catalogue.close()